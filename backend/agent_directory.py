@@ -0,0 +1,294 @@
+"""
+Registry of Agent B candidates and transfer routing.
+
+Agents register with their skills and how many transfers they can handle at
+once, then keep the registration alive with heartbeats. Registrations, the
+last heartbeat and the sessions counted against each agent's load live in the
+state store ("agents" records, plus "agent_sessions" mapping a session to its
+agent), so with a shared backend every worker routes among the same agents and
+counts the same load. Load changes are conditional on the record's version, so
+two workers assigning to one agent at once cannot lose either write.
+
+With a process-local store, AgentDirectory also keeps one heap per skill
+ordered by current load, so picking the least-loaded available agent for a
+skill costs O(log n) instead of a scan over every agent. Heap entries are never
+updated in place: a change in load or status bumps the agent's version and
+pushes a fresh entry, and outdated entries are discarded when they reach the
+top. Agents are also kept in last-heartbeat order, so expiry only touches
+agents that have actually gone quiet. A shared store is written by other
+workers too, which would leave such an index stale, so there selection and
+expiry read the agents from the store instead.
+
+Heartbeat times are wall-clock epoch seconds, as they are compared across
+processes.
+"""
+
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from state_store import ConflictError, InMemoryStateStore, StateStore
+
+# Bucket every agent is indexed under, used when a transfer asks for no particular skill
+ANY_SKILL = "*"
+STATUSES = ("available", "busy", "away")
+
+
+class Agent:
+    """Read-only view of an agent's record"""
+    __slots__ = ("agent_id", "record")
+
+    def __init__(self, agent_id: str, record: dict):
+        self.agent_id = agent_id
+        self.record = record
+
+    @property
+    def skills(self) -> List[str]:
+        return self.record["skills"]
+
+    @property
+    def capacity(self) -> int:
+        return self.record["capacity"]
+
+    @property
+    def status(self) -> str:
+        return self.record["status"]
+
+    @property
+    def sessions(self) -> List[str]:
+        return self.record["sessions"]
+
+    @property
+    def last_seen(self) -> float:
+        return self.record["last_seen"]
+
+    @property
+    def version(self) -> int:
+        return self.record["version"]
+
+    @property
+    def load(self) -> int:
+        return len(self.record["sessions"])
+
+    @property
+    def available(self) -> bool:
+        return _available(self.record)
+
+    def to_dict(self) -> dict:
+        return {
+            "agent_id": self.agent_id,
+            "skills": list(self.skills),
+            "capacity": self.capacity,
+            "status": self.status,
+            "load": self.load,
+            "available": self.available,
+        }
+
+
+def _available(record: dict) -> bool:
+    return record["status"] == "available" and len(record["sessions"]) < record["capacity"]
+
+
+class AgentDirectory:
+    def __init__(self, heartbeat_ttl: float, store: Optional[StateStore] = None):
+        self.heartbeat_ttl = heartbeat_ttl
+        self.store = store or InMemoryStateStore()
+        self._records = self.store.records("agents")
+        self._assignments = self.store.records("agent_sessions")
+        # Only this process writes a local store, so the index below stays in step with it
+        self._indexed = not self.store.shared
+        # skill -> heap of (load, order, version, agent_id)
+        self._buckets: Dict[str, list] = {}
+        # agent_id -> last heartbeat, oldest first
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        # Breaks load ties in favour of the agent whose load changed longest ago
+        self._order = itertools.count()
+        if self._indexed:
+            # Agents restored by a persistent store
+            for agent_id, record in sorted(self._records.items(), key=lambda item: item[1]["last_seen"]):
+                self._seen[agent_id] = record["last_seen"]
+                self._index(agent_id, record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def agents(self) -> Dict[str, Agent]:
+        """Every registered agent by id"""
+        return {agent_id: Agent(agent_id, record) for agent_id, record in self._records.items()}
+
+    def get(self, agent_id: str) -> Optional[Agent]:
+        record = self._records.get(agent_id)
+        return Agent(agent_id, record) if record is not None else None
+
+    def register(self, agent_id: str, skills: Iterable[str] = (), capacity: int = 1,
+                 now: Optional[float] = None) -> Agent:
+        """Add an agent, or replace the skills and capacity of a registered one (keeping its sessions)"""
+        fields = {"skills": sorted(set(skills)), "capacity": capacity, "last_seen": now or time.time()}
+        record = self._write(agent_id, lambda record: fields)
+        if record is None:
+            record = {**fields, "status": "available", "sessions": [], "version": 0}
+            self.store.put("agents", agent_id, record)
+            self._index(agent_id, record)
+        self._touch(agent_id, record["last_seen"])
+        return Agent(agent_id, record)
+
+    def heartbeat(self, agent_id: str, status: Optional[str] = None, now: Optional[float] = None) -> Optional[Agent]:
+        """Refresh an agent's presence and optionally its status; None if it is not registered"""
+        last_seen = now or time.time()
+        record = self._records.get(agent_id)
+        if record is None:
+            return None
+        if status and status != record["status"]:
+            record = self._write(agent_id, lambda record: {"status": status, "last_seen": last_seen})
+        else:
+            # Presence alone does not change routing, so it is written without a new version
+            record = self.store.update("agents", agent_id, {"last_seen": last_seen})
+        if record is None:
+            return None
+        self._touch(agent_id, last_seen)
+        return Agent(agent_id, record)
+
+    def unregister(self, agent_id: str) -> bool:
+        record = self._records.get(agent_id)
+        if record is None:
+            return False
+        self.store.delete("agents", agent_id)
+        self._seen.pop(agent_id, None)
+        for session_id in record["sessions"]:
+            self.store.delete("agent_sessions", session_id)
+        return True
+
+    def select(self, skill: Optional[str] = None, now: Optional[float] = None) -> Optional[Agent]:
+        """Least-loaded available agent with the skill, or None"""
+        now = now or time.time()
+        if not self._indexed:
+            return self._scan(skill, now)
+        heap = self._buckets.get(skill or ANY_SKILL)
+        while heap:
+            _, _, version, agent_id = heap[0]
+            record = self._records.get(agent_id)
+            if record is None or record["version"] != version or not _available(record):
+                heapq.heappop(heap)
+            elif now - record["last_seen"] > self.heartbeat_ttl:
+                self.unregister(agent_id)
+            else:
+                return Agent(agent_id, record)
+        return None
+
+    def _scan(self, skill: Optional[str], now: float) -> Optional[Agent]:
+        best = None
+        for agent_id, record in self._records.items():
+            if skill and skill not in record["skills"]:
+                continue
+            if not _available(record) or now - record["last_seen"] > self.heartbeat_ttl:
+                continue
+            if best is None or len(record["sessions"]) < best.load:
+                best = Agent(agent_id, record)
+        return best
+
+    def assign(self, agent_id: str, session_id: str):
+        """Count a transfer against an agent's load; unregistered agents are ignored"""
+        current = self._assignments.get(session_id)
+        if current and current["agent_id"] == agent_id:
+            return
+        if current:
+            self.release(session_id)
+        record = self._write(
+            agent_id,
+            lambda record: None if session_id in record["sessions"] else {"sessions": record["sessions"] + [session_id]}
+        )
+        if record is not None:
+            self.store.put("agent_sessions", session_id, {"agent_id": agent_id})
+
+    def release(self, session_id: str):
+        """Free the load taken by a session, e.g. when the call ends"""
+        current = self._assignments.get(session_id)
+        if current is None:
+            return
+        self.store.delete("agent_sessions", session_id)
+        self._write(
+            current["agent_id"],
+            lambda record: {"sessions": [s for s in record["sessions"] if s != session_id]}
+            if session_id in record["sessions"] else None
+        )
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """Unregister agents whose last heartbeat is older than the TTL; returns their ids"""
+        now = now or time.time()
+        if not self._indexed:
+            expired = [
+                agent_id for agent_id, record in self._records.items()
+                if now - record["last_seen"] > self.heartbeat_ttl
+            ]
+            for agent_id in expired:
+                self.unregister(agent_id)
+            return expired
+        expired = []
+        while self._seen:
+            agent_id, last_seen = next(iter(self._seen.items()))
+            if now - last_seen <= self.heartbeat_ttl:
+                break
+            self.unregister(agent_id)
+            expired.append(agent_id)
+        return expired
+
+    def stats(self) -> dict:
+        records = list(self._records.values())
+        return {
+            "registered": len(records),
+            "available": sum(1 for record in records if _available(record)),
+            "assigned_sessions": len(self._assignments),
+        }
+
+    def _write(self, agent_id: str, change: Callable[[dict], Optional[dict]]) -> Optional[dict]:
+        """Merge change(record) into an agent's record under a new version; None if it is not registered.
+
+        The write is conditional on the version it was computed from and is
+        recomputed if another worker got there first. A change of None leaves
+        the record as it is.
+        """
+        while True:
+            record = self._records.get(agent_id)
+            if record is None:
+                return None
+            fields = change(record)
+            if fields is None:
+                return record
+            version = record["version"]
+            try:
+                updated = self.store.update(
+                    "agents", agent_id, {**fields, "version": version + 1}, expect={"version": version}
+                )
+            except ConflictError:
+                continue
+            if updated is not None:
+                self._index(agent_id, updated)
+            return updated
+
+    def _touch(self, agent_id: str, last_seen: float):
+        if self._indexed:
+            self._seen[agent_id] = last_seen
+            self._seen.move_to_end(agent_id)
+
+    def _index(self, agent_id: str, record: dict):
+        if not self._indexed or not _available(record):
+            return
+        entry = (len(record["sessions"]), next(self._order), record["version"], agent_id)
+        for skill in (*record["skills"], ANY_SKILL):
+            heap = self._buckets.setdefault(skill, [])
+            heapq.heappush(heap, entry)
+            if len(heap) > 2 * len(self._records) + 64:
+                self._compact(skill)
+
+    def _compact(self, skill: str):
+        """Drop outdated entries once they outnumber live ones"""
+        live = []
+        for entry in self._buckets[skill]:
+            record = self._records.get(entry[3])
+            if record is not None and record["version"] == entry[2] and _available(record):
+                live.append(entry)
+        heapq.heapify(live)
+        self._buckets[skill] = live
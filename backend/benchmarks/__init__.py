@@ -0,0 +1,6 @@
+"""
+Benchmarks and load tests for the warm transfer backend.
+
+Each module is a standalone script; run them from the backend directory, e.g.
+    python -m benchmarks.summary_load
+"""
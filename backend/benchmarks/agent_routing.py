@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: picking Agent B from a directory of --agents registered agents.
+
+Registers agents with 1-3 of --skills skills and a capacity of 1-3 transfers,
+then runs --transfers routing decisions for random skills while earlier
+transfers end at random, keeping the floor busy. Compares:
+
+- scan: a linear pass over every agent for the least-loaded available one with
+  the skill (what a plain dict of agents needs)
+- directory: agent_directory.AgentDirectory's per-skill heaps
+
+Also reports heartbeat throughput and the cost of an expiry sweep.
+
+    python -m benchmarks.agent_routing --agents 10000 --transfers 20000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from agent_directory import AgentDirectory
+
+
+def build(agent_count: int, skill_count: int, seed: int) -> AgentDirectory:
+    rng = random.Random(seed)
+    skills = [f"skill{index}" for index in range(skill_count)]
+    directory = AgentDirectory(heartbeat_ttl=30)
+    for index in range(agent_count):
+        directory.register(f"agent{index}", rng.sample(skills, rng.randint(1, 3)), rng.randint(1, 3))
+    return directory
+
+
+def scan_select(directory: AgentDirectory, skill: str):
+    best, best_load = None, 0
+    for agent_id, record in directory.store.records("agents").items():
+        load = len(record["sessions"])
+        if skill in record["skills"] and record["status"] == "available" and load < record["capacity"]:
+            if best is None or load < best_load:
+                best, best_load = agent_id, load
+    return directory.get(best) if best else None
+
+
+def route(directory: AgentDirectory, select, transfers: int, skill_count: int, busy: float, seed: int) -> dict:
+    """Route transfers, ending a random active one whenever more than `busy` of capacity is in use"""
+    rng = random.Random(seed)
+    capacity = sum(agent.capacity for agent in directory.agents.values())
+    active, misses, select_seconds = [], 0, 0.0
+    start = time.perf_counter()
+    for index in range(transfers):
+        while len(active) > capacity * busy:
+            directory.release(active.pop(rng.randrange(len(active))))
+        skill = f"skill{rng.randrange(skill_count)}"
+        selected = time.perf_counter()
+        agent = select(directory, skill)
+        select_seconds += time.perf_counter() - selected
+        if agent is None:
+            misses += 1
+            continue
+        session_id = f"session{index}"
+        directory.assign(agent.agent_id, session_id)
+        active.append(session_id)
+    elapsed = time.perf_counter() - start
+    return {
+        "routed": transfers - misses,
+        "no_agent_available": misses,
+        "select_us": round(select_seconds / transfers * 1e6, 2),
+        "transfers_per_s": round(transfers / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=10000)
+    parser.add_argument("--skills", type=int, default=20)
+    parser.add_argument("--transfers", type=int, default=20000)
+    parser.add_argument("--busy", type=float, default=0.8, help="share of total capacity kept in use")
+    args = parser.parse_args()
+
+    report = {"benchmark": "agent_routing", "agents": args.agents, "skills": args.skills, "transfers": args.transfers}
+    for name, select in (("scan", scan_select), ("directory", lambda directory, skill: directory.select(skill))):
+        directory = build(args.agents, args.skills, seed=1)
+        report[name] = route(directory, select, args.transfers, args.skills, args.busy, seed=2)
+    report["select_speedup"] = round(report["scan"]["select_us"] / report["directory"]["select_us"], 1)
+
+    directory = build(args.agents, args.skills, seed=1)
+    agent_ids = list(directory.agents)
+    start = time.perf_counter()
+    for agent_id in agent_ids * 10:
+        directory.heartbeat(agent_id)
+    report["heartbeats_per_s"] = round(len(agent_ids) * 10 / (time.perf_counter() - start))
+
+    # Sweep a directory where 10% of agents went quiet
+    now = time.time()
+    for agent_id in agent_ids[len(agent_ids) // 10:]:
+        directory.heartbeat(agent_id, now=now + 60)
+    start = time.perf_counter()
+    expired = directory.expire(now=now + 60)
+    report["expiry_sweep"] = {"expired": len(expired), "ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
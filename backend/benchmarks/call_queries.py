@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: supervisor dashboard queries over --calls call sessions.
+
+Fills a state store with calls spread over statuses, agents and rooms, then
+times the three dashboard lookups (calls in a status, calls for an agent,
+session for a room) by scanning every record versus the store's call indexes,
+for both state backends. Also reports what keeping the indexes costs on writes.
+
+    python -m benchmarks.call_queries --calls 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from state_store import create_state_store
+
+INDEXED = ("status", "agent_a", "agent_b", "room_name", "transfer_room")
+STATUSES = ("active", "transferring", "transferred", "ended")
+
+
+def fill(store, calls: int, agents: int, seed: int) -> float:
+    """Create calls and walk them through the transfer flow; returns seconds spent writing"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for index in range(calls):
+        session_id = f"session{index}"
+        store.put("calls", session_id, {
+            "caller_id": f"caller{index}", "room_name": f"call_{index}", "agent_a": None, "agent_b": None,
+            "status": "active", "transfer_room": None,
+        })
+        store.update("calls", session_id, {"agent_a": f"agent{rng.randrange(agents)}"})
+        status = rng.choice(STATUSES)
+        if status != "active":
+            store.update("calls", session_id, {
+                "agent_b": f"agent{rng.randrange(agents)}", "transfer_room": f"transfer_{index}", "status": "transferring"
+            })
+            store.update("calls", session_id, {"status": status})
+    return time.perf_counter() - start
+
+
+def scan(store, field: str, value) -> list:
+    calls = store.records("calls")
+    return [key for key, call in calls.items() if call.get(field) == value]
+
+
+def time_queries(find, queries: list) -> float:
+    start = time.perf_counter()
+    for field, value in queries:
+        find(field, value)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def run_backend(backend: str, calls: int, agents: int, query_count: int) -> dict:
+    result = {}
+    for indexed in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ["STATE_SQLITE_PATH"] = os.path.join(directory, "state.db")
+            store = create_state_store(backend)
+            if indexed:
+                for field in INDEXED:
+                    store.add_index("calls", field)
+            write_seconds = fill(store, calls, agents, seed=1)
+            rng = random.Random(2)
+            queries = {
+                "status": [("status", "transferring")] * query_count,
+                "agent": [("agent_b", f"agent{rng.randrange(agents)}") for _ in range(query_count)],
+                "room": [("transfer_room", f"transfer_{rng.randrange(calls)}") for _ in range(query_count)],
+            }
+            find = (lambda field, value: store.lookup("calls", field, value)) if indexed else (
+                lambda field, value: scan(store, field, value))
+            result["indexed" if indexed else "scan"] = {
+                "write_us_per_call": round(write_seconds / calls * 1e6, 1),
+                **{f"{name}_query_ms": round(time_queries(find, batch) * 1000, 3) for name, batch in queries.items()},
+            }
+            store.close()
+    for name in ("status", "agent", "room"):
+        result[f"{name}_speedup"] = round(result["scan"][f"{name}_query_ms"] / result["indexed"][f"{name}_query_ms"], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=20, help="queries of each kind per backend")
+    args = parser.parse_args()
+
+    report = {"benchmark": "call_queries", "calls": args.calls, "agents": args.agents}
+    for backend in ("memory", "sqlite"):
+        report[backend] = run_backend(backend, args.calls, args.agents, args.queries)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
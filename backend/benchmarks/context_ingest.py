@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: context ingestion throughput for live transcription feeds.
+
+Pushes the same number of transcript segments, spread over --sessions calls,
+through each ingestion path and reports segments per second:
+
+- single:    one POST /api/add-context per segment (--concurrency in flight)
+- batch:     POST /api/add-context/batch with --batch-size segments across sessions
+- websocket: one /ws/calls/{session_id}/context stream per session, one frame
+             per segment, frames pipelined and acknowledged by the server
+
+    python -m benchmarks.context_ingest --segments 20000 --sessions 50 --batch-size 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+
+from benchmarks.stubs import free_port, run_api
+
+
+def segments(sessions, count: int):
+    for index in range(count):
+        yield {
+            "session_id": sessions[index % len(sessions)],
+            "speaker": "Customer" if index % 2 else "Agent",
+            "message": f"segment {index} of the live transcript",
+            "timestamp": time.time(),
+        }
+
+
+async def ingest_single(client: httpx.AsyncClient, items: list, concurrency: int):
+    queue = iter(items)
+
+    async def worker():
+        for item in queue:
+            response = await client.post("/api/add-context", json=item)
+            response.raise_for_status()
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+
+async def ingest_batch(client: httpx.AsyncClient, items: list, batch_size: int, concurrency: int):
+    batches = iter([items[start:start + batch_size] for start in range(0, len(items), batch_size)])
+
+    async def worker():
+        for batch in batches:
+            response = await client.post("/api/add-context/batch", json={"items": batch})
+            response.raise_for_status()
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+
+async def ingest_websocket(ws_url: str, items: list):
+    by_session = {}
+    for item in items:
+        by_session.setdefault(item["session_id"], []).append(
+            {key: item[key] for key in ("speaker", "message", "timestamp")}
+        )
+
+    async def stream(session_id: str, frames: list):
+        async with websockets.connect(f"{ws_url}/ws/calls/{session_id}/context") as socket:
+
+            async def send():
+                for frame in frames:
+                    await socket.send(json.dumps(frame))
+
+            sender = asyncio.create_task(send())
+            accepted = 0
+            while accepted < len(frames):
+                ack = json.loads(await socket.recv())
+                if "error" in ack:
+                    raise RuntimeError(ack["error"])
+                accepted += ack["accepted"]
+            await sender
+
+    await asyncio.gather(*[stream(session_id, frames) for session_id, frames in by_session.items()])
+
+
+async def run(base_url: str, count: int, session_count: int, batch_size: int, concurrency: int) -> dict:
+    ws_url = base_url.replace("http", "ws", 1)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        sessions = [
+            (await client.post("/api/create-call", json={})).json()["session_id"] for _ in range(session_count)
+        ]
+        modes = {
+            "single": lambda items: ingest_single(client, items, concurrency),
+            "batch": lambda items: ingest_batch(client, items, batch_size, concurrency),
+            "websocket": lambda items: ingest_websocket(ws_url, items),
+        }
+        report = {}
+        for name, ingest in modes.items():
+            items = list(segments(sessions, count))
+            start = time.perf_counter()
+            await ingest(items)
+            elapsed = time.perf_counter() - start
+            report[name] = {"elapsed_s": round(elapsed, 3), "segments_per_s": round(count / elapsed)}
+    for name in ("batch", "websocket"):
+        report[name]["speedup_vs_single"] = round(report[name]["segments_per_s"] / report["single"]["segments_per_s"], 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20, help="HTTP requests in flight")
+    args = parser.parse_args()
+
+    # Segments are spread over --sessions calls; keep them all so nothing is trimmed mid-run
+    env = {"MAX_CONTEXT_MESSAGES": str(args.segments)}
+    with run_api(free_port(), env) as base_url:
+        report = asyncio.run(run(base_url, args.segments, args.sessions, args.batch_size, args.concurrency))
+
+    print(json.dumps({
+        "benchmark": "context_ingest",
+        "segments": args.segments,
+        "sessions": args.sessions,
+        "batch_size": args.batch_size,
+        **report,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark: speed and recall of the local extractive summary.
+
+- offline: extract_summary over synthetic calls of --sizes utterances. Each
+  call is small talk, hold music apologies and troubleshooting chatter with
+  five facts planted at random points (order number, amount, product, problem,
+  what the customer wants), some of them mentioned twice. Reports milliseconds
+  per summary and the share of planted facts the summary contains.
+- llm_unreachable: /api/initiate-transfer with no LLM reachable, where the
+  caller used to get "Failed to generate summary" and now gets the extractive
+  summary.
+- streaming: how soon /api/initiate-transfer/stream delivers the draft vs. the
+  first LLM text from a stub that answers after --llm-delay.
+
+    python -m benchmarks.extractive_summary --sizes 100 500 2000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks.stubs import create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+from extractive_summary import extract_summary
+
+FILLER = [
+    ("Agent", "Thanks for calling, how can I help you today?"),
+    ("Agent", "Let me check that for you."),
+    ("Agent", "Bear with me a moment while the system loads."),
+    ("Agent", "Sorry about the wait, it's running slowly this {day}."),
+    ("Agent", "Can you confirm the email address on the account?"),
+    ("Agent", "Thanks, I've verified your identity."),
+    ("Agent", "I'm just going to put you on a short hold."),
+    ("Agent", "Thanks for holding."),
+    ("Agent", "Is there anything else I can help with today?"),
+    ("Agent", "Can you try restarting it and tell me what you see?"),
+    ("Agent", "I'm noting that on the account now."),
+    ("Customer", "Sure, no problem."),
+    ("Customer", "Okay."),
+    ("Customer", "Yes, that's the right email."),
+    ("Customer", "Sorry, can you repeat that?"),
+    ("Customer", "I'm calling from my car so it might be noisy."),
+    ("Customer", "The weather has been awful this {day}."),
+    ("Customer", "I tried that already, it didn't change anything."),
+    ("Customer", "Hold on, let me find my glasses."),
+    ("Customer", "I've been a customer for about {years} years."),
+    ("Customer", "Okay, it's restarting now."),
+    ("Customer", "It shows the same screen as before."),
+]
+DAYS = ["morning", "afternoon", "week", "Monday", "Friday"]
+PRODUCTS = ["AeroBlend 500 blender", "Lumen X2 desk lamp", "TrailPro 40L backpack", "Nimbus smart thermostat"]
+PROBLEMS = ["arrived with a cracked housing", "stops working after ten minutes", "was missing the power adapter",
+            "shows error code E{code} on startup"]
+WANTS = ["a full refund to my card", "a replacement shipped express", "store credit instead of a refund"]
+
+
+def make_call(utterances: int, rng: random.Random) -> tuple:
+    """(items, facts): facts maps each planted fact to a token the summary must contain to count it"""
+    order, amount = str(rng.randint(100000, 999999)), f"${rng.randint(20, 400)}.{rng.randint(10, 99)}"
+    product = rng.choice(PRODUCTS)
+    problem = rng.choice(PROBLEMS).format(code=rng.randint(10, 99))
+    want = rng.choice(WANTS)
+    planted = [
+        [("Customer", f"I'm calling about order {order}, the {product} I bought last month.")],
+        [("Customer", f"I paid {amount} for it and it {problem}."),
+         ("Agent", f"So the {product.split()[-1]} {problem}, is that right?")],
+        [("Customer", f"What I'd like is {want}."),
+         ("Customer", f"Honestly I just want {want}.")],
+        [("Agent", f"I can see order {order} was charged {amount} on the {rng.randint(2, 28)}th.")],
+    ]
+    facts = {"order": order, "amount": amount, "product": product.split()[0], "problem": problem.split()[-1],
+             "want": want.split()[-1]}
+
+    items = []
+    for _ in range(utterances):
+        speaker, text = rng.choice(FILLER)
+        items.append([time.time(), speaker, text.format(day=rng.choice(DAYS), years=rng.randint(2, 15))])
+    for mentions in planted:
+        for speaker, text in mentions:
+            items[rng.randrange(len(items))] = [time.time(), speaker, text]
+    return [tuple(item) for item in items], facts
+
+
+def recall(summary: str, facts: dict) -> float:
+    return sum(token in summary for token in facts.values()) / len(facts)
+
+
+def offline(sizes: list, calls: int) -> dict:
+    rng = random.Random(7)
+    report = {}
+    for size in sizes:
+        timings, recalls = [], []
+        for _ in range(calls):
+            items, facts = make_call(size, rng)
+            start = time.perf_counter()
+            summary = extract_summary(items)
+            timings.append(time.perf_counter() - start)
+            recalls.append(recall(summary, facts))
+        report[str(size)] = {
+            "p50_ms": round(percentile(timings, 50) * 1000, 2),
+            "p99_ms": round(percentile(timings, 99) * 1000, 2),
+            "fact_recall": round(sum(recalls) / len(recalls), 2),
+        }
+    report["example"] = extract_summary(make_call(500, random.Random(1))[0]).splitlines()
+    return report
+
+
+async def new_session(client: httpx.AsyncClient, utterances: int, rng: random.Random) -> tuple:
+    session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+    items, facts = make_call(utterances, rng)
+    batch = [{"session_id": session_id, "speaker": speaker, "message": text} for _, speaker, text in items]
+    for start in range(0, len(batch), 1000):
+        await client.post("/api/add-context/batch", json={"items": batch[start:start + 1000]})
+    return session_id, facts
+
+
+async def fallback(base_url: str, transfers: int, utterances: int) -> dict:
+    rng = random.Random(3)
+    timings, recalls, failed = [], [], 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for _ in range(transfers):
+            session_id, facts = await new_session(client, utterances, rng)
+            start = time.perf_counter()
+            transfer = {"session_id": session_id, "agent_b_id": "bench_agent"}
+            summary = (await client.post("/api/initiate-transfer", json=transfer)).json()["call_summary"]
+            timings.append(time.perf_counter() - start)
+            failed += summary.startswith("Failed")
+            recalls.append(recall(summary, facts))
+    return {
+        "transfer_p50_ms": round(percentile(timings, 50) * 1000, 1),
+        "error_summaries": failed,
+        "fact_recall": round(sum(recalls) / len(recalls), 2),
+    }
+
+
+async def draft_vs_llm(base_url: str, transfers: int, utterances: int) -> dict:
+    rng = random.Random(5)
+    to_draft, to_llm = [], []
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for _ in range(transfers):
+            session_id, _ = await new_session(client, utterances, rng)
+            start = time.perf_counter()
+            transfer = {"session_id": session_id, "agent_b_id": "bench_agent"}
+            async with client.stream("POST", "/api/initiate-transfer/stream", json=transfer) as response:
+                async for line in response.aiter_lines():
+                    event = json.loads(line)
+                    if event["event"] == "transfer" and event.get("summary_draft"):
+                        to_draft.append(time.perf_counter() - start)
+                    elif event["event"] == "summary_delta":
+                        to_llm.append(time.perf_counter() - start)
+                        break
+    return {
+        "draft_p50_ms": round(percentile(to_draft, 50) * 1000, 1),
+        "first_llm_text_p50_ms": round(percentile(to_llm, 50) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000, 10000], help="utterances per call")
+    parser.add_argument("--calls", type=int, default=50, help="synthetic calls per size")
+    parser.add_argument("--transfers", type=int, default=20)
+    parser.add_argument("--utterances", type=int, default=500, help="utterances per call in the API tests")
+    parser.add_argument("--llm-delay", type=float, default=1.0, help="stub LLM time to first word in seconds")
+    args = parser.parse_args()
+
+    report = {"benchmark": "extractive_summary", "offline": offline(args.sizes, args.calls)}
+    base_env = {"ROLLING_SUMMARY_ENABLED": "false", "MAX_CONTEXT_MESSAGES": str(max(args.utterances, 2000))}
+    # Nothing listens on this port, so every LLM request fails
+    unreachable = {"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": f"http://127.0.0.1:{free_port()}/v1"}
+    with run_api(free_port(), {**base_env, **unreachable}) as base_url:
+        report["llm_unreachable"] = asyncio.run(fallback(base_url, args.transfers, args.utterances))
+    llm_port = free_port()
+    with serve_in_thread(create_stub_llm_app(delay=args.llm_delay), llm_port):
+        env = {**base_env, "OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1"}
+        with run_api(free_port(), env) as base_url:
+            report["streaming"] = asyncio.run(draft_vs_llm(base_url, args.transfers, args.utterances))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LiveKit room operations on the transfer critical path.
+
+Runs the API against a stub LiveKit RoomService and a stub LLM, both with
+injected latency, and measures initiate-transfer and end-call latency with and
+without the pre-created transfer room pool. The rolling summary is given time to
+become ready, so without the pool initiate-transfer costs about one LiveKit round
+trip and with the pool close to none. end-call deletes both rooms concurrently,
+so it costs about one round trip rather than two.
+
+    python -m benchmarks.livekit_ops --livekit-delay 0.2 --llm-delay 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.stubs import (
+    create_stub_livekit_app, create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+)
+
+
+async def run(base_url: str, calls: int, pool_size: int, llm_delay: float) -> dict:
+    latencies = {"initiate-transfer": [], "end-call": []}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        if pool_size:
+            # Let the pool fill before measuring
+            for _ in range(100):
+                health = (await client.get("/api/health")).json()
+                if health["transfer_room_pool"]["ready"] >= pool_size:
+                    break
+                await asyncio.sleep(0.1)
+
+        for _ in range(calls):
+            session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+            await client.post("/api/add-context", json={"session_id": session_id, "message": "Need a refund."})
+            # Let the rolling summary catch up so the LiveKit work is what remains on the critical path
+            await asyncio.sleep(llm_delay + 0.1)
+
+            start = time.perf_counter()
+            await client.post("/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"})
+            latencies["initiate-transfer"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await client.post("/api/end-call", json={"session_id": session_id})
+            latencies["end-call"].append(time.perf_counter() - start)
+
+        # Failed room deletions are reported per room instead of failing the request
+        session_id = (await client.post("/api/create-call", json={"room_name": "fail_room"})).json()["session_id"]
+        await client.post("/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"})
+        failed_end = (await client.post("/api/end-call", json={"session_id": session_id})).json()
+
+        pool = (await client.get("/api/health")).json()["transfer_room_pool"]
+
+    return {
+        "pool_size": pool_size,
+        **{
+            endpoint: {
+                "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                "p99_ms": round(percentile(samples, 99) * 1000, 1),
+            }
+            for endpoint, samples in latencies.items()
+        },
+        "pool": pool,
+        "failed_cleanup_example": failed_end.get("room_cleanup"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--livekit-delay", type=float, default=0.2)
+    parser.add_argument("--llm-delay", type=float, default=0.3)
+    parser.add_argument("--pool-size", type=int, default=5)
+    args = parser.parse_args()
+
+    livekit_port, llm_port = free_port(), free_port()
+    report = {
+        "benchmark": "livekit_ops",
+        "livekit_delay_ms": args.livekit_delay * 1000,
+        "llm_delay_ms": args.llm_delay * 1000,
+        "runs": [],
+    }
+    livekit_stub = create_stub_livekit_app(delay=args.livekit_delay, fail_prefix="fail_")
+    with serve_in_thread(livekit_stub, livekit_port), \
+            serve_in_thread(create_stub_llm_app(delay=args.llm_delay), llm_port):
+        for pool_size in (0, args.pool_size):
+            env = {
+                "LIVEKIT_API_KEY": "stub",
+                "LIVEKIT_API_SECRET": "stub_secret_stub_secret_stub_secret",
+                "LIVEKIT_HTTP_URL": f"http://127.0.0.1:{livekit_port}",
+                "OPENAI_API_KEY": "stub",
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+                "TRANSFER_ROOM_POOL_SIZE": str(pool_size),
+            }
+            with run_api(free_port(), env) as base_url:
+                report["runs"].append(asyncio.run(run(base_url, args.calls, pool_size, args.llm_delay)))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
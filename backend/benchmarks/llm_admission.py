@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a spike of transfers against a rate-limited LLM provider.
+
+The stub provider takes --rate-limit requests per second and answers 429 beyond
+that. --calls calls each get --lines transcript lines, which start background
+rolling-summary refreshes, and then all of them transfer at once. Every summary
+is classed as llm (the provider's text), extractive (the local fallback) or
+failed, and transfer latency and the 429s the provider sent are reported for:
+
+- unscheduled: no rate limit configured, so requests only wait for one of
+  LLM_MAX_CONCURRENCY slots and run into the provider's limit
+- scheduled: OPENAI_REQUESTS_PER_MINUTE set to the provider's limit, so
+  transfers queue ahead of background refreshes, within the rate limit, and
+  the ones that could not start within LLM_QUEUE_MAX_WAIT_SECONDS get the
+  extractive summary straight away
+
+    python -m benchmarks.llm_admission --calls 60 --rate-limit 5 --llm-delay 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.stubs import create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+
+LLM_TEXT = "Customer needs help with billing."
+
+
+def kind(summary: str) -> str:
+    if summary.startswith("Key points from the call"):
+        return "extractive"
+    if summary.startswith("Failed") or summary.startswith("LLM service"):
+        return "failed"
+    return "llm"
+
+
+async def spike(base_url: str, calls: int, lines: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=httpx.Limits(max_connections=calls)) as client:
+        sessions = []
+        for _ in range(calls):
+            session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+            for line in range(lines):
+                await client.post("/api/add-context", json={
+                    "session_id": session_id, "speaker": "Customer",
+                    "message": f"I was charged twice for order {line}, please refund one of the charges.",
+                })
+            sessions.append(session_id)
+
+        async def transfer(session_id: str) -> tuple:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"}
+            )
+            elapsed = time.perf_counter() - start
+            return elapsed, kind(response.json()["call_summary"]) if response.status_code == 200 else "http_error"
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[transfer(session_id) for session_id in sessions])
+        elapsed = time.perf_counter() - start
+        health = (await client.get("/api/health")).json()
+    latencies = [latency for latency, _ in results]
+    return {
+        "summaries": dict(Counter(result for _, result in results)),
+        "transfer_p50_ms": round(percentile(latencies, 50) * 1000),
+        "transfer_p99_ms": round(percentile(latencies, 99) * 1000),
+        "spike_s": round(elapsed, 2),
+        "llm_queue": health.get("llm_queue", {}).get("openai"),
+        "circuit": health["llm_providers"]["openai"]["circuit"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=60, help="calls transferring at once")
+    parser.add_argument("--lines", type=int, default=3, help="transcript lines per call before the spike")
+    parser.add_argument("--rate-limit", type=float, default=5, help="provider requests per second")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="stub LLM response time in seconds")
+    args = parser.parse_args()
+
+    report = {"benchmark": "llm_admission", "calls": args.calls, "rate_limit_per_s": args.rate_limit}
+    scenarios = {
+        "unscheduled": {},
+        "scheduled": {"OPENAI_REQUESTS_PER_MINUTE": str(args.rate_limit * 60), "LLM_RATE_BURST": str(int(args.rate_limit))},
+    }
+    for name, scenario_env in scenarios.items():
+        llm_port = free_port()
+        stub = create_stub_llm_app(delay=args.llm_delay, text=LLM_TEXT, rate_limit=args.rate_limit)
+        with serve_in_thread(stub, llm_port):
+            env = {
+                "OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+                "SUMMARY_MAX_STALE_MESSAGES": "0", **scenario_env,
+            }
+            with run_api(free_port(), env) as base_url:
+                report[name] = asyncio.run(spike(base_url, args.calls, args.lines))
+            report[name]["provider_429s"] = stub.state.rate_limited
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: provider routing, hedging and circuit breaking between Groq and OpenAI.
+
+Starts two stub LLM servers, one standing in for Groq and one for OpenAI, with
+configurable delays, and runs transfers through the API in several scenarios:
+
+- groq_failing_no_fallback: only Groq configured and every request fails (what
+  agents saw before routing)
+- groq_failing: Groq fails, OpenAI is healthy; requests fail over and the
+  breaker stops sending traffic to Groq
+- groq_slow: Groq is slow; the router learns OpenAI is faster and prefers it
+- groq_slow_hedged: as above, with hedged requests racing OpenAI after
+  --hedge-after seconds
+
+Rolling summaries are turned off so each transfer makes exactly one summary request.
+
+    python -m benchmarks.llm_routing --transfers 30 --slow-delay 1.5 --fast-delay 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.stubs import create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+
+
+async def run(base_url: str, transfers: int, concurrency: int) -> dict:
+    latencies, failures = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+
+        async def transfer(index: int):
+            nonlocal failures
+            async with semaphore:
+                session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+                await client.post("/api/add-context", json={
+                    "session_id": session_id, "message": f"Customer {index} was double charged."
+                })
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"}
+                )
+                latencies.append(time.perf_counter() - start)
+                # The extractive fallback counts as a failure here: the LLM did not produce the summary
+                summary = response.json()["call_summary"] if response.status_code == 200 else "Failed"
+                if summary.startswith(("Failed", "Key points from the call")):
+                    failures += 1
+
+        await asyncio.gather(*[transfer(index) for index in range(transfers)])
+        providers = (await client.get("/api/health")).json()["llm_providers"]
+
+    return {
+        "failed_summaries": failures,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "providers": providers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transfers", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--slow-delay", type=float, default=1.5, help="delay of the slow/failing Groq stub in seconds")
+    parser.add_argument("--fast-delay", type=float, default=0.2, help="delay of the OpenAI stub in seconds")
+    parser.add_argument("--hedge-after", type=float, default=0.4)
+    args = parser.parse_args()
+
+    groq_stub = create_stub_llm_app(delay=args.slow_delay)
+    openai_stub = create_stub_llm_app(delay=args.fast_delay)
+    groq_port, openai_port = free_port(), free_port()
+    scenarios = [
+        ("groq_failing_no_fallback", 500, False, 0),
+        ("groq_failing", 500, True, 0),
+        ("groq_slow", 0, True, 0),
+        ("groq_slow_hedged", 0, True, args.hedge_after),
+    ]
+    report = {
+        "benchmark": "llm_routing",
+        "transfers": args.transfers,
+        "slow_delay_ms": args.slow_delay * 1000,
+        "fast_delay_ms": args.fast_delay * 1000,
+        "scenarios": {},
+    }
+
+    with serve_in_thread(groq_stub, groq_port), serve_in_thread(openai_stub, openai_port):
+        for name, groq_status, with_openai, hedge_after in scenarios:
+            groq_stub.state.fail_status = groq_status
+            groq_stub.state.delay = 0.05 if groq_status else args.slow_delay
+            groq_stub.state.requests = openai_stub.state.requests = 0
+            env = {
+                "GROQ_API_KEY": "stub",
+                "GROQ_BASE_URL": f"http://127.0.0.1:{groq_port}",
+                "ROLLING_SUMMARY_ENABLED": "false",
+                "LLM_HEDGE_AFTER_SECONDS": str(hedge_after),
+            }
+            if with_openai:
+                env.update({
+                    "OPENAI_API_KEY": "stub",
+                    "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+                })
+            with run_api(free_port(), env) as base_url:
+                result = asyncio.run(run(base_url, args.transfers, args.concurrency))
+            result["stub_requests"] = {"groq": groq_stub.state.requests, "openai": openai_stub.state.requests}
+            report["scenarios"][name] = result
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
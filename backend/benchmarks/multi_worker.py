@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Multi-worker test: full call flows against `uvicorn --workers N` with a shared state store.
+
+Every request opens a fresh connection, so consecutive steps of one flow land on
+different workers. The run fails if any step returns an error (e.g. a 404 because
+the session was created on another worker), and reports flows/sec per worker count.
+
+    python -m benchmarks.multi_worker --flows 500 --concurrency 50 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.stubs import free_port, run_api
+
+
+async def call_flow(base_url: str, errors: list):
+    # No keep-alive: each step gets its own connection and so (usually) its own worker
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=httpx.Limits(max_keepalive_connections=0)) as client:
+        steps = []
+        created = await client.post("/api/create-call", json={})
+        steps.append(created)
+        if created.status_code != 200:
+            errors.append(("create-call", created.status_code))
+            return
+        session_id = created.json()["session_id"]
+        steps.append(await client.post("/api/add-context", json={
+            "session_id": session_id, "speaker": "Customer", "message": "My order never arrived."
+        }))
+        steps.append(await client.post(
+            "/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"}
+        ))
+        steps.append(await client.post("/api/complete-transfer", json={"session_id": session_id}))
+        steps.append(await client.post("/api/end-call", json={"session_id": session_id}))
+        status = await client.get(f"/api/call-status/{session_id}")
+        steps.append(status)
+
+        for response in steps:
+            if response.status_code != 200:
+                errors.append((response.url.path, response.status_code))
+        if status.status_code == 200 and status.json()["status"] != "ended":
+            errors.append(("call-status", status.json()["status"]))
+
+
+async def run(base_url: str, flows: int, concurrency: int) -> dict:
+    errors = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            await call_flow(base_url, errors)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[limited() for _ in range(flows)])
+    elapsed = time.perf_counter() - start
+    return {
+        "flows": flows,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_s": round(elapsed, 3),
+        "flows_per_s": round(flows / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--backend", default="sqlite", help="STATE_BACKEND for the API workers")
+    args = parser.parse_args()
+
+    report = {"benchmark": "multi_worker", "backend": args.backend, "cpu_count": os.cpu_count(), "runs": []}
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {"STATE_BACKEND": args.backend, "STATE_SQLITE_PATH": os.path.join(tmp, "state.db")}
+            with run_api(free_port(), env, workers=workers) as base_url:
+                result = asyncio.run(run(base_url, args.flows, args.concurrency))
+        report["runs"].append({"workers": workers, **result})
+    print(json.dumps(report, indent=2))
+
+    if any(run["errors"] for run in report["runs"]):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: WebSocket push vs. 2s polling vs. long-polling for Agent B notifications.
+
+Registers N standby agents, publishes transfer notifications at random times
+through /api/notify-agent-b and measures how many requests each delivery mode
+costs and how long notifications take to arrive. Receivers read with a `since`
+cursor and acknowledge what they got, as the web client does; acks are counted
+as requests.
+
+    python -m benchmarks.notification_delivery --agents 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import websockets
+
+from benchmarks.stubs import free_port, percentile, run_api
+
+
+def notification_payload(agent_id: str) -> dict:
+    # The publish time rides along in session_id so receivers can compute delivery latency
+    return {
+        "session_id": repr(time.time()),
+        "agent_b_id": agent_id,
+        "transfer_room": "bench_room",
+        "agent_b_token": "bench_token",
+    }
+
+
+async def publisher(client: httpx.AsyncClient, agents: list, notifications: int, duration: float):
+    for _ in range(notifications):
+        await asyncio.sleep(random.uniform(0, duration / notifications * 2))
+        await client.post("/api/notify-agent-b", json=notification_payload(random.choice(agents)))
+
+
+async def poll_agent(client: httpx.AsyncClient, agent_id: str, interval: float, wait: float, stop: asyncio.Event, stats: dict):
+    # interval > 0: fixed-interval polling; wait > 0: long-polling, re-issued as soon as it returns
+    await asyncio.sleep(random.uniform(0, interval or 0.1))
+    cursor = 0
+    while not stop.is_set():
+        # Counted when issued: long-polls still parked at the end are cancelled, not answered
+        stats["requests"] += 1
+        response = await client.get(f"/api/notifications/{agent_id}", params={"since": cursor, "wait": wait})
+        now = time.time()
+        body = response.json()
+        for notification in body["notifications"]:
+            stats["latencies"].append(now - float(notification["session_id"]))
+        if body["notifications"]:
+            cursor = body["cursor"]
+            await client.post(f"/api/notifications/{agent_id}/ack", json={"seq": cursor})
+            stats["requests"] += 1
+        await asyncio.sleep(interval)
+
+
+async def listen_agent(ws_url: str, agent_id: str, stop: asyncio.Event, stats: dict, ready: asyncio.Event):
+    async with websockets.connect(f"{ws_url}/ws/agents/{agent_id}") as socket:
+        stats["requests"] += 1
+        stats["connected"] += 1
+        if stats["connected"] == stats["agents"]:
+            ready.set()
+        while not stop.is_set():
+            try:
+                message = await asyncio.wait_for(socket.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            notification = json.loads(message)
+            stats["latencies"].append(time.time() - float(notification["session_id"]))
+            await socket.send(json.dumps({"ack": notification["seq"]}))
+
+
+async def run_mode(mode: str, base_url: str, agents: int, notifications: int, duration: float, interval: float,
+                   wait: float) -> dict:
+    agent_ids = [f"bench_{mode}_{i}" for i in range(agents)]
+    stats = {"requests": 0, "latencies": [], "connected": 0, "agents": agents}
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=agents + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        if mode == "poll":
+            receivers = [asyncio.create_task(poll_agent(client, a, interval, 0, stop, stats)) for a in agent_ids]
+        elif mode == "long_poll":
+            receivers = [asyncio.create_task(poll_agent(client, a, 0, wait, stop, stats)) for a in agent_ids]
+        else:
+            ready = asyncio.Event()
+            ws_url = base_url.replace("http", "ws", 1)
+            receivers = [asyncio.create_task(listen_agent(ws_url, a, stop, stats, ready)) for a in agent_ids]
+            await ready.wait()
+
+        await publisher(client, agent_ids, notifications, duration)
+        # Give the slowest poller one more cycle to pick up the tail
+        await asyncio.sleep(interval + 0.5 if mode == "poll" else 0.5)
+        stop.set()
+        if mode == "long_poll":
+            # Parked long-polls would otherwise hold the run open until they time out
+            for receiver in receivers:
+                receiver.cancel()
+        await asyncio.gather(*receivers, return_exceptions=True)
+
+    latencies = stats["latencies"]
+    return {
+        "receiver_requests": stats["requests"],
+        "delivered": len(latencies),
+        "published": notifications,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=200, help="standby Agent B clients")
+    parser.add_argument("--notifications", type=int, default=100, help="notifications to publish")
+    parser.add_argument("--duration", type=float, default=10.0, help="publish window in seconds")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="poll loop interval (matches the web client)")
+    parser.add_argument("--long-poll-wait", type=float, default=25.0, help="?wait= for long-polls in seconds")
+    args = parser.parse_args()
+
+    report = {"benchmark": "notification_delivery", "agents": args.agents, "duration_s": args.duration}
+    with run_api(free_port()) as base_url:
+        for mode in ("poll", "long_poll", "push"):
+            report[mode] = asyncio.run(run_mode(
+                mode, base_url, args.agents, args.notifications, args.duration, args.poll_interval,
+                args.long_poll_wait,
+            ))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
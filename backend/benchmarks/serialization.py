@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response encoding for the most polled routes, call-status and notifications.
+
+- encode: microseconds to turn one payload into a response, for a call-status
+  record (with its datetimes and a summary) and a page of --notifications
+  queued notifications, three ways:
+    json_encoder:   jsonable_encoder + JSONResponse (FastAPI's default for a
+                    returned dict, which these routes used before)
+    response_model: validation against the route's response model, then
+                    ORJSONResponse (what the other routes now do)
+    orjson:         ORJSONResponse on the stored dict directly (what the
+                    polled routes now do)
+- http: p50/p99 latency and requests per second of GET /api/call-status and
+  GET /api/notifications, --concurrency requests at a time, against a fresh
+  API or an already running one given with --base-url (e.g. an older revision)
+
+    python -m benchmarks.serialization --requests 5000 --notifications 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from benchmarks.stubs import free_port, percentile, run_api
+from schemas import CallSession, NotificationsResponse
+
+SUMMARY = ("Customer was charged twice for the annual plan renewed on the 3rd. Agent confirmed both charges; "
+           "billing should refund one and check the renewal date.")
+
+
+def call_record() -> dict:
+    return {
+        "caller_id": "caller_1a2b3c4d", "room_name": "call_1a2b3c4d", "agent_a": "agent_a_5e6f7a8b",
+        "agent_b": "agent_b_billing_7", "status": "transferring", "created_at": datetime.now(),
+        "call_summary": SUMMARY, "transfer_room": "transfer_5b1d2c9e-8f0a-4c3b-9d7e-1a2b3c4d5e6f_0a1b2c3d",
+        "agent_a_exited": False, "updated_at": datetime.now(), "version": 1, "transfer_ready": True,
+    }
+
+
+def notifications_page(count: int) -> dict:
+    notifications = []
+    for seq in range(1, count + 1):
+        session_id = f"5b1d2c9e-8f0a-4c3b-9d7e-{seq:012d}"
+        if seq % 3 == 1:
+            notifications.append({
+                "type": "transfer_request", "session_id": session_id, "agent_b_id": "agent_b_billing_7",
+                "transfer_room": f"transfer_{session_id}_0a1b2c3d", "agent_b_token": "eyJhbGciOiJIUzI1NiJ9." + "x" * 300,
+                "timestamp": datetime.now().isoformat(), "summary_streaming": True,
+                "summary_draft": "Key points from the call (extracted automatically):\n- Customer: " + SUMMARY,
+                "message": f"Incoming warm transfer from Agent A. Join transfer room: transfer_{session_id}_0a1b2c3d",
+                "seq": seq,
+            })
+        elif seq % 3 == 2:
+            notifications.append({"type": "summary_delta", "session_id": session_id, "text": SUMMARY[:40], "seq": seq})
+        else:
+            notifications.append({
+                "type": "summary_complete", "session_id": session_id, "call_summary": SUMMARY,
+                "timestamp": datetime.now().isoformat(), "seq": seq,
+            })
+    return {"notifications": notifications, "cursor": count}
+
+
+def per_call_us(encode, payload, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(payload)
+    return round((time.perf_counter() - start) / rounds * 1e6, 2)
+
+
+def encode(notifications: int, rounds: int) -> dict:
+    report = {}
+    for name, model, payload in (
+        ("call_status", CallSession, call_record()),
+        ("notifications", NotificationsResponse, notifications_page(notifications)),
+    ):
+        adapter = TypeAdapter(model)
+        encoders = {
+            "json_encoder": lambda data: JSONResponse(jsonable_encoder(data)),
+            # FastAPI's serialize_response: validate, dump in JSON mode, then render
+            "response_model": lambda data: ORJSONResponse(
+                adapter.dump_python(adapter.validate_python(data), mode="json")
+            ),
+            "orjson": lambda data: ORJSONResponse(data),
+        }
+        bodies = {encoder: fn(payload).body for encoder, fn in encoders.items()}
+        report[name] = {
+            "bytes": len(bodies["orjson"]),
+            **{f"{encoder}_us": per_call_us(fn, payload, rounds) for encoder, fn in encoders.items()},
+            "same_body": bodies["orjson"] == bodies["json_encoder"],
+        }
+        report[name]["speedup"] = round(report[name]["json_encoder_us"] / report[name]["orjson_us"], 1)
+    return report
+
+
+async def poll(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> dict:
+    latencies = []
+
+    async def worker(count: int):
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(requests // concurrency) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "requests_per_s": round(len(latencies) / elapsed),
+    }
+
+
+async def http(base_url: str, requests: int, concurrency: int, notifications: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+        await client.post("/api/add-context", json={"session_id": session_id, "message": SUMMARY})
+        await client.post("/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"})
+        for _ in range(notifications - 1):
+            await client.post("/api/notify-agent-b", json={
+                "session_id": session_id, "agent_b_id": "bench_agent", "transfer_room": "transfer_bench",
+                "agent_b_token": "x" * 300, "summary_streaming": True, "summary_draft": SUMMARY,
+            })
+        return {
+            "call_status": await poll(client, f"/api/call-status/{session_id}", requests, concurrency),
+            "notifications": await poll(client, "/api/notifications/bench_agent", requests, concurrency),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20000, help="encodes per payload and encoder")
+    parser.add_argument("--notifications", type=int, default=20, help="notifications per page")
+    parser.add_argument("--requests", type=int, default=5000, help="HTTP requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--base-url", help="benchmark this running API instead of starting one")
+    args = parser.parse_args()
+
+    report = {"benchmark": "serialization", "encode": encode(args.notifications, args.rounds)}
+    if args.base_url:
+        report["http"] = asyncio.run(http(args.base_url, args.requests, args.concurrency, args.notifications))
+    else:
+        with run_api(free_port(), {"ROLLING_SUMMARY_ENABLED": "false"}) as base_url:
+            report["http"] = asyncio.run(http(base_url, args.requests, args.concurrency, args.notifications))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
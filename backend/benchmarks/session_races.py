@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Stress test: conflicting operations fired at the same call session.
+
+Runs the API against a stub LiveKit server (which tracks the rooms that exist)
+and a slow stub LLM. For each of --sessions calls it fires, with random jitter
+and all at once: two initiate-transfers to different agents, a
+complete-transfer and an end-call. Afterwards it checks:
+
+- no request failed with a 5xx
+- no ended call still has a live transfer room
+- no transferring/transferred call points at a room that was deleted
+- once every call is ended, no LiveKit room is left behind
+
+It then runs --sessions independent transfer flows side by side, which must
+never conflict with each other (no 409s).
+
+    python -m benchmarks.session_races --sessions 100 --jitter 0.4
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks.stubs import (
+    create_stub_livekit_app, create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+)
+
+OPERATIONS = ("initiate_1", "initiate_2", "complete", "end")
+
+
+async def new_call(client: httpx.AsyncClient) -> str:
+    session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+    await client.post("/api/add-context", json={"session_id": session_id, "message": "Customer was double charged."})
+    return session_id
+
+
+async def conflicting(client: httpx.AsyncClient, session_id: str, jitter: float, rng: random.Random) -> dict:
+    requests = {
+        "initiate_1": ("/api/initiate-transfer", {"session_id": session_id, "agent_b_id": f"{session_id}_b1"}),
+        "initiate_2": ("/api/initiate-transfer", {"session_id": session_id, "agent_b_id": f"{session_id}_b2"}),
+        "complete": ("/api/complete-transfer", {"session_id": session_id}),
+        "end": ("/api/end-call", {"session_id": session_id}),
+    }
+
+    async def fire(name: str) -> int:
+        await asyncio.sleep(rng.uniform(0, jitter))
+        path, body = requests[name]
+        return (await client.post(path, json=body)).status_code
+
+    codes = await asyncio.gather(*[fire(name) for name in OPERATIONS])
+    return dict(zip(OPERATIONS, codes))
+
+
+async def independent_flow(client: httpx.AsyncClient) -> tuple:
+    session_id = await new_call(client)
+    start = time.perf_counter()
+    codes = [
+        (await client.post(
+            "/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"}
+        )).status_code,
+        (await client.post("/api/complete-transfer", json={"session_id": session_id})).status_code,
+        (await client.post("/api/end-call", json={"session_id": session_id})).status_code,
+    ]
+    return codes, time.perf_counter() - start
+
+
+async def run(base_url: str, livekit_rooms: set, sessions: int, jitter: float) -> dict:
+    rng = random.Random(1)
+    limits = httpx.Limits(max_connections=sessions * len(OPERATIONS) + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        session_ids = [await new_call(client) for _ in range(sessions)]
+        results = await asyncio.gather(*[conflicting(client, s, jitter, rng) for s in session_ids])
+
+        outcomes = {name: {} for name in OPERATIONS}
+        for result in results:
+            for name, code in result.items():
+                outcomes[name][str(code)] = outcomes[name].get(str(code), 0) + 1
+        server_errors = sum(count for codes in outcomes.values() for code, count in codes.items() if code >= "500")
+
+        final_status, ended_with_live_room, pointing_at_deleted_room = {}, 0, 0
+        for session_id in session_ids:
+            call = (await client.get(f"/api/call-status/{session_id}")).json()
+            final_status[call["status"]] = final_status.get(call["status"], 0) + 1
+            room = call.get("transfer_room")
+            if call["status"] == "ended" and room in livekit_rooms:
+                ended_with_live_room += 1
+            if call["status"] in ("transferring", "transferred") and room not in livekit_rooms:
+                pointing_at_deleted_room += 1
+
+        for session_id in session_ids:
+            await client.post("/api/end-call", json={"session_id": session_id})
+        await asyncio.sleep(0.5)
+        leaked_rooms = len(livekit_rooms)
+
+        flows = await asyncio.gather(*[independent_flow(client) for _ in range(sessions)])
+        independent_conflicts = sum(code == 409 for codes, _ in flows for code in codes)
+        independent_errors = sum(code >= 500 for codes, _ in flows for code in codes)
+
+    return {
+        "conflicting": {
+            "responses": outcomes,
+            "server_errors": server_errors,
+            "final_status": final_status,
+            "ended_with_live_transfer_room": ended_with_live_room,
+            "active_transfer_with_deleted_room": pointing_at_deleted_room,
+            "leaked_rooms_after_all_ended": leaked_rooms,
+        },
+        "independent": {
+            "flows": sessions,
+            "conflicts": independent_conflicts,
+            "server_errors": independent_errors,
+            "flow_p50_ms": round(percentile([seconds for _, seconds in flows], 50) * 1000, 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--jitter", type=float, default=0.4, help="spread of the conflicting requests in seconds")
+    parser.add_argument("--llm-delay", type=float, default=0.3, help="stub LLM summary latency in seconds")
+    parser.add_argument("--livekit-delay", type=float, default=0.05)
+    parser.add_argument("--backend", choices=("memory", "sqlite"), default="memory")
+    args = parser.parse_args()
+
+    livekit_stub = create_stub_livekit_app(delay=args.livekit_delay)
+    llm_stub = create_stub_llm_app(delay=args.llm_delay)
+    livekit_port, llm_port = free_port(), free_port()
+    with serve_in_thread(livekit_stub, livekit_port), serve_in_thread(llm_stub, llm_port):
+        env = {
+            "LIVEKIT_API_KEY": "stub",
+            "LIVEKIT_API_SECRET": "stub_secret_stub_secret_stub_secret",
+            "LIVEKIT_HTTP_URL": f"http://127.0.0.1:{livekit_port}",
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+            "ROLLING_SUMMARY_ENABLED": "false",
+            "STATE_BACKEND": args.backend,
+        }
+        if args.backend == "sqlite":
+            env["STATE_SQLITE_PATH"] = f"/tmp/session_races_{livekit_port}.db"
+        with run_api(free_port(), env) as base_url:
+            report = asyncio.run(run(base_url, livekit_stub.state.rooms, args.sessions, args.jitter))
+
+    print(json.dumps({"benchmark": "session_races", "sessions": args.sessions, "backend": args.backend, **report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start of an API worker, the time and memory a new pod pays before it can take traffic.
+
+For each integration set (nothing configured, one LLM provider, everything:
+LiveKit, Groq, OpenAI and Twilio), --runs fresh processes are started and the
+medians reported:
+
+- import: `import main` in a new interpreter, its time and the process RSS
+  afterwards, and which provider SDKs it loaded
+- worker: a single uvicorn worker from spawn until /api/health answers
+  (interpreter start, imports, startup hooks), and the worker's RSS then
+
+Credentials are fake and every upstream URL points at a closed local port with
+pre-warming off, so only imports and client construction are measured. Pass
+--backend-dir to measure another checkout, e.g. an older revision:
+
+    git worktree add /tmp/before HEAD~1
+    python -m benchmarks.startup --runs 10 --backend-dir /tmp/before/backend
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.stubs import BACKEND_DIR, free_port, percentile
+
+SDKS = ("livekit.api", "groq", "openai", "twilio.rest", "aiohttp", "httpx")
+
+MEASURE_IMPORT = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+rss_kb = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS:"))
+print(json.dumps({{"ms": elapsed * 1000, "rss_kb": rss_kb, "sdks": [m for m in {SDKS!r} if m in sys.modules]}}))
+"""
+
+
+def configs(closed_url: str) -> dict:
+    llm = {"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": f"{closed_url}/v1"}
+    return {
+        "none": {},
+        "one_llm": llm,
+        "all": {
+            **llm,
+            "GROQ_API_KEY": "stub", "GROQ_BASE_URL": closed_url,
+            "LIVEKIT_API_KEY": "stub", "LIVEKIT_API_SECRET": "stub-secret-" + "x" * 20, "LIVEKIT_HTTP_URL": closed_url,
+            "TWILIO_ACCOUNT_SID": "ACstub", "TWILIO_AUTH_TOKEN": "stub", "TWILIO_API_BASE_URL": closed_url,
+        },
+    }
+
+
+def child_env(env: dict) -> dict:
+    inherited = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith(("LIVEKIT_", "OPENAI_", "GROQ_", "TWILIO_"))
+    }
+    return {**inherited, "UPSTREAM_PREWARM_CONNECTIONS": "0", "TRANSFER_ROOM_POOL_SIZE": "0", **env}
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        return next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+
+
+def measure_import(backend_dir: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORT], cwd=backend_dir, env=child_env(env),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure_worker(backend_dir: str, env: dict) -> dict:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=backend_dir, env=child_env(env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/api/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None or time.perf_counter() - start > 60:
+                raise RuntimeError("API server failed to start")
+            time.sleep(0.005)
+        return {"ms": (time.perf_counter() - start) * 1000, "rss_kb": rss_kb(process.pid)}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def summarize(samples: list) -> dict:
+    return {
+        "p50_ms": round(percentile([s["ms"] for s in samples], 50), 1),
+        "max_ms": round(max(s["ms"] for s in samples), 1),
+        "rss_mb": round(percentile([s["rss_kb"] for s in samples], 50) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="fresh processes per integration set and measurement")
+    parser.add_argument("--backend-dir", default=BACKEND_DIR, help="backend directory of the checkout to measure")
+    args = parser.parse_args()
+
+    backend_dir = os.path.abspath(args.backend_dir)
+    report = {"benchmark": "startup", "backend_dir": backend_dir}
+    for name, env in configs(f"http://127.0.0.1:{free_port()}").items():
+        imports = [measure_import(backend_dir, env) for _ in range(args.runs)]
+        workers = [measure_worker(backend_dir, env) for _ in range(args.runs)]
+        report[name] = {
+            "import": {**summarize(imports), "sdks_loaded": imports[-1]["sdks"]},
+            "worker_ready": summarize(workers),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost and recovery time of the journaled state store.
+
+- write_overhead: the store writes of one call's lifecycle (create, Agent A,
+  transcript, transfer, notification, ack, completion) against the plain
+  in-memory store vs. JournaledStateStore, in microseconds per call
+- http_overhead: p50 latency of create-call and add-context against an API
+  running with STATE_BACKEND=memory vs. journal
+- crash: runs --crash-flows transfer flows against the journaled API, kills it
+  with SIGKILL, restarts it on the same journal and checks every call and
+  Agent B notification came back
+- recovery: startup time with --sessions live sessions on disk, replaying the
+  whole journal vs. loading a snapshot plus the journal tail
+
+    python -m benchmarks.state_recovery --sessions 100000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+from benchmarks.stubs import free_port, percentile, run_api, start_api
+from state_store import InMemoryStateStore, JournaledStateStore
+from transcript import Transcript
+
+UTTERANCES = [
+    (0.0, "Customer", "Hi, I was charged twice for my subscription this month."),
+    (0.0, "Agent", "Sorry about that, let me pull up your account."),
+    (0.0, "Customer", "It's the annual plan, renewed on the 3rd."),
+    (0.0, "Agent", "I can see both charges. I'll bring in billing to refund one."),
+]
+
+
+def call_lifecycle(store, index: int):
+    """The writes the API makes for one call, up to a completed transfer"""
+    session_id, agent_b = f"session{index}", f"agent_b{index % 500}"
+    store.put("calls", session_id, {
+        "caller_id": f"caller{index}", "room_name": f"call_{index}", "agent_a": None, "agent_b": None,
+        "status": "active", "created_at": datetime.now(), "transfer_room": None, "version": 0,
+    })
+    store.update("calls", session_id, {"agent_a": f"agent_a{index % 500}", "updated_at": datetime.now()})
+    for utterance in UTTERANCES:
+        store.extend("contexts", session_id, [(time.time(), *utterance[1:])], max_len=2000)
+    store.update("calls", session_id, {
+        "agent_b": agent_b, "transfer_room": f"transfer_{index}", "transfer_ready": False,
+        "status": "transferring", "version": 1, "updated_at": datetime.now(),
+    }, expect={"version": 0})
+    store.update("calls", session_id, {
+        "transfer_ready": True, "call_summary": "Customer was double charged for the annual plan; refund one.",
+        "updated_at": datetime.now(),
+    }, expect={"version": 1})
+    notification = store.push("notifications", agent_b, {
+        "type": "transfer_request", "session_id": session_id, "transfer_room": f"transfer_{index}",
+        "timestamp": datetime.now().isoformat(),
+    }, max_len=100)
+    store.ack("notifications", agent_b, notification["seq"])
+    store.update("calls", session_id, {"status": "transferred", "version": 2, "updated_at": datetime.now()},
+                 expect={"version": 1})
+
+
+def make_store(kind: str, directory: str, snapshot_every: int):
+    store = InMemoryStateStore() if kind == "memory" else JournaledStateStore(directory, snapshot_every=snapshot_every)
+    store.use_list_type("contexts", Transcript)
+    return store
+
+
+def write_overhead(calls: int) -> dict:
+    report = {}
+    for kind in ("memory", "journal"):
+        with tempfile.TemporaryDirectory() as directory:
+            store = make_store(kind, directory, snapshot_every=10 ** 9)
+            start = time.perf_counter()
+            for index in range(calls):
+                call_lifecycle(store, index)
+            elapsed = time.perf_counter() - start
+            store.flush()
+            store.close()
+            journal_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        report[kind] = {"us_per_call": round(elapsed / calls * 1e6, 1)}
+        if kind == "journal":
+            report[kind]["journal_bytes_per_call"] = round(journal_bytes / calls)
+    report["overhead_us_per_call"] = round(report["journal"]["us_per_call"] - report["memory"]["us_per_call"], 1)
+    return report
+
+
+async def create_with_context(client: httpx.AsyncClient, timings: dict) -> str:
+    start = time.perf_counter()
+    session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+    timings["create_call"].append(time.perf_counter() - start)
+    for _, speaker, message in UTTERANCES:
+        start = time.perf_counter()
+        response = await client.post("/api/add-context", json={
+            "session_id": session_id, "speaker": speaker, "message": message
+        })
+        response.raise_for_status()
+        timings["add_context"].append(time.perf_counter() - start)
+    return session_id
+
+
+async def request_latency(base_url: str, calls: int) -> dict:
+    timings = {"create_call": [], "add_context": []}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        for _ in range(calls):
+            await create_with_context(client, timings)
+    return {name: round(percentile(values, 50) * 1000, 2) for name, values in timings.items()}
+
+
+def http_overhead(calls: int, directory: str) -> dict:
+    report = {}
+    for kind in ("memory", "journal"):
+        env = {"STATE_BACKEND": kind, "STATE_JOURNAL_DIR": os.path.join(directory, "http"),
+               "ROLLING_SUMMARY_ENABLED": "false"}
+        with run_api(free_port(), env) as base_url:
+            report[kind] = {f"{name}_p50_ms": ms for name, ms in asyncio.run(request_latency(base_url, calls)).items()}
+    return report
+
+
+async def transfer_flows(base_url: str, flows: int) -> dict:
+    """Calls with a pending transfer; returns session -> (status, agent_b)"""
+    timings = {"create_call": [], "add_context": []}
+    calls = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        for index in range(flows):
+            session_id = await create_with_context(client, timings)
+            transfer = (await client.post(
+                "/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": f"bench_b_{index}"}
+            )).json()
+            if index % 2:
+                await client.post("/api/complete-transfer", json={"session_id": session_id})
+            status = (await client.get(f"/api/call-status/{session_id}")).json()["status"]
+            calls[session_id] = (status, transfer["agent_b_id"])
+    return calls
+
+
+async def check_recovered(base_url: str, calls: dict) -> dict:
+    missing_calls = wrong_status = missing_notifications = 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        for session_id, (status, agent_b) in calls.items():
+            response = await client.get(f"/api/call-status/{session_id}")
+            if response.status_code != 200:
+                missing_calls += 1
+                continue
+            if response.json()["status"] != status:
+                wrong_status += 1
+            notifications = (await client.get(f"/api/notifications/{agent_b}")).json()["notifications"]
+            if not any(n.get("session_id") == session_id for n in notifications):
+                missing_notifications += 1
+    return {"missing_calls": missing_calls, "wrong_status": wrong_status, "missing_notifications": missing_notifications}
+
+
+def crash(flows: int, directory: str) -> dict:
+    env = {"STATE_BACKEND": "journal", "STATE_JOURNAL_DIR": os.path.join(directory, "crash"),
+           "ROLLING_SUMMARY_ENABLED": "false"}
+    port = free_port()
+    process = start_api(port, env)
+    try:
+        calls = asyncio.run(transfer_flows(f"http://127.0.0.1:{port}", flows))
+        # Responses are sent before the group commit; allow one flush interval
+        time.sleep(0.05)
+    finally:
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+    started = time.perf_counter()
+    with run_api(port, env) as base_url:
+        restart_seconds = time.perf_counter() - started
+        report = asyncio.run(check_recovered(base_url, calls))
+    return {"flows": flows, **report, "restart_s": round(restart_seconds, 2)}
+
+
+def timed_open(directory: str, snapshot_every: int) -> tuple:
+    start = time.perf_counter()
+    store = make_store("journal", directory, snapshot_every)
+    elapsed = time.perf_counter() - start
+    stats = store.stats()
+    store.close()
+    return elapsed, stats
+
+
+def recovery(sessions: int, directory: str, snapshot_every: int) -> dict:
+    report = {}
+    for name, every in (("journal_only", 10 ** 9), ("snapshot_plus_tail", snapshot_every)):
+        path = os.path.join(directory, name)
+        store = make_store("journal", path, every)
+        snapshot_ms = []
+        for index in range(sessions):
+            generation = store.stats()["journal_generation"]
+            start = time.perf_counter()
+            call_lifecycle(store, index)
+            if store.stats()["journal_generation"] != generation:
+                # This call's writes triggered a snapshot; its copy is the part requests wait on
+                snapshot_ms.append((time.perf_counter() - start) * 1000)
+        store.flush()
+        store.close()
+        elapsed, stats = timed_open(path, every)
+        report[name] = {
+            "recovery_s": round(elapsed, 2),
+            "replayed_entries": stats["recovered_entries"],
+            "disk_mb": round(sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6, 1),
+        }
+        if snapshot_ms:
+            report[name]["snapshot_pause_ms_max"] = round(max(snapshot_ms), 1)
+        shutil.rmtree(path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100000, help="live sessions on disk for the recovery test")
+    parser.add_argument("--calls", type=int, default=20000, help="call lifecycles for the write overhead test")
+    parser.add_argument("--http-calls", type=int, default=300)
+    parser.add_argument("--crash-flows", type=int, default=100)
+    parser.add_argument("--snapshot-every", type=int, default=100000, help="journal entries between snapshots")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        report = {
+            "benchmark": "state_recovery",
+            "write_overhead": write_overhead(args.calls),
+            "http_overhead": http_overhead(args.http_calls, directory),
+            "crash": crash(args.crash_flows, directory),
+            "recovery": {"sessions": args.sessions, **recovery(args.sessions, directory, args.snapshot_every)},
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Local stand-ins for the upstream services used by the benchmarks.
+
+The stub LLM server speaks just enough of the OpenAI chat completions API for
+both the OpenAI and Groq SDKs (Groq mounts the same API under /openai/v1).
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def create_stub_llm_app(delay: float = 1.0, text: str = "Customer needs help with billing.",
+                        fail_status: int = 0, chunk_delay: float = 0.0, rate_limit: float = 0.0) -> FastAPI:
+    """Build an OpenAI-compatible chat completions server that answers after `delay` seconds.
+
+    Streaming requests get the first word after `delay` and each following word
+    `chunk_delay` seconds later; non-streaming requests wait for all the words.
+    With `fail_status` set, every request gets that HTTP error after the delay instead.
+    With `rate_limit` set, requests get a 429 straight away once more than that many
+    per second arrive (a bucket of `rate_limit` requests, refilled continuously, as
+    providers enforce their limits); they are counted in `stub.state.rate_limited`.
+    Both can be changed while the server runs through `stub.state.delay` / `stub.state.fail_status`.
+    """
+    stub = FastAPI()
+    stub.state.requests = 0
+    stub.state.delay = delay
+    stub.state.fail_status = fail_status
+    stub.state.rate_limited = 0
+    bucket = {"tokens": rate_limit, "updated": time.monotonic()}
+
+    async def stream_words(number: int, model: str):
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(chunk_delay)
+            chunk = {
+                "id": f"stub-{number}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if not index else f" {word}"},
+                    "finish_reason": None,
+                }],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if rate_limit:
+            now = time.monotonic()
+            bucket["tokens"] = min(rate_limit, bucket["tokens"] + (now - bucket["updated"]) * rate_limit)
+            bucket["updated"] = now
+            if bucket["tokens"] < 1:
+                stub.state.rate_limited += 1
+                return JSONResponse(
+                    {"error": {"message": "Rate limit reached for requests", "type": "requests"}},
+                    status_code=429,
+                    headers={"retry-after": "1"},
+                )
+            bucket["tokens"] -= 1
+        stub.state.requests += 1
+        await asyncio.sleep(stub.state.delay)
+        if stub.state.fail_status:
+            return JSONResponse(
+                {"error": {"message": "injected failure", "type": "server_error"}},
+                status_code=stub.state.fail_status,
+            )
+        if body.get("stream"):
+            return StreamingResponse(stream_words(stub.state.requests, body.get("model", "stub")),
+                                     media_type="text/event-stream")
+        await asyncio.sleep(chunk_delay * (len(text.split(" ")) - 1))
+        return {
+            "id": f"stub-{stub.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    stub.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    stub.add_api_route("/openai/v1/chat/completions", chat_completions, methods=["POST"])
+    return stub
+
+
+def create_stub_livekit_app(delay: float = 0.1, fail_prefix: Optional[str] = None) -> FastAPI:
+    """Build a LiveKit RoomService (Twirp/protobuf) stand-in that answers after `delay` seconds.
+
+    Requests for rooms whose name starts with `fail_prefix` get a Twirp error.
+    Rooms that were created and not yet deleted are kept in `stub.state.rooms`.
+    """
+    from fastapi.responses import Response
+    from livekit.protocol import models as proto_models
+    from livekit.protocol import room as proto_room
+
+    stub = FastAPI()
+    stub.state.calls = {}
+    stub.state.rooms = set()
+    request_types = {
+        "CreateRoom": (proto_room.CreateRoomRequest, lambda req: proto_models.Room(name=req.name, sid=f"RM_{req.name}")),
+        "DeleteRoom": (proto_room.DeleteRoomRequest, lambda req: proto_room.DeleteRoomResponse()),
+        "RemoveParticipant": (proto_room.RoomParticipantIdentity, lambda req: proto_room.RemoveParticipantResponse()),
+    }
+
+    @stub.post("/twirp/livekit.RoomService/{method}")
+    async def room_service(method: str, request: Request):
+        if method not in request_types:
+            return JSONResponse({"code": "bad_route", "msg": method}, status_code=404)
+        request_class, respond = request_types[method]
+        message = request_class.FromString(await request.body())
+        stub.state.calls[method] = stub.state.calls.get(method, 0) + 1
+        await asyncio.sleep(delay)
+        room_name = getattr(message, "name", "") or getattr(message, "room", "")
+        if fail_prefix and room_name.startswith(fail_prefix):
+            return JSONResponse({"code": "internal", "msg": "injected failure"}, status_code=500)
+        if method == "CreateRoom":
+            stub.state.rooms.add(room_name)
+        elif method == "DeleteRoom":
+            stub.state.rooms.discard(room_name)
+        return Response(respond(message).SerializeToString(), media_type="application/protobuf")
+
+    return stub
+
+
+def create_stub_twilio_app(delay: float = 1.0, unavailable_every: int = 0) -> FastAPI:
+    """Build a fake Twilio Calls API that answers after `delay` seconds.
+
+    With `unavailable_every=k`, every k-th request gets a 503 so client retries can be observed.
+    """
+    stub = FastAPI()
+    stub.state.requests = 0
+    stub.state.in_flight = 0
+    stub.state.max_in_flight = 0
+
+    @stub.post("/2010-04-01/Accounts/{account_sid}/Calls.json")
+    async def create_call(account_sid: str, request: Request):
+        form = await request.form()
+        stub.state.requests += 1
+        number = stub.state.requests
+        stub.state.in_flight += 1
+        stub.state.max_in_flight = max(stub.state.max_in_flight, stub.state.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            stub.state.in_flight -= 1
+        if unavailable_every and number % unavailable_every == 0:
+            return JSONResponse({"code": 20503, "message": "Service unavailable", "status": 503}, status_code=503)
+        return JSONResponse({
+            "sid": f"CA{number:032d}",
+            "account_sid": account_sid,
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "status": "queued",
+        }, status_code=201)
+
+    return stub
+
+
+@contextlib.contextmanager
+def serve_in_thread(app: FastAPI, port: int, keep_alive: int = 5):
+    """Run an ASGI app on 127.0.0.1:port in a background thread, closing connections idle for keep_alive seconds"""
+    server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", timeout_keep_alive=keep_alive
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield server
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+@contextlib.contextmanager
+def connect_delay_proxy(target_port: int, port: int, delay: float):
+    """Forward 127.0.0.1:port to target_port, holding each new connection for `delay` seconds first.
+
+    Stands in for the TCP and TLS handshakes of a remote upstream, so connection
+    reuse shows up in latency the way it does in production. Yields a counter
+    of the connections opened so far under "connections".
+    """
+    stats = {"connections": 0}
+    loop = asyncio.new_event_loop()
+
+    async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        stats["connections"] += 1
+        await asyncio.sleep(delay)
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", target_port)
+        await asyncio.gather(pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer))
+
+    server = loop.run_until_complete(asyncio.start_server(handle, "127.0.0.1", port))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield stats
+    finally:
+        loop.call_soon_threadsafe(server.close)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+def start_api(port: int, env: Optional[Dict[str, str]] = None, workers: int = 1,
+              quiet: bool = True) -> subprocess.Popen:
+    """Start the warm transfer API in a subprocess and wait until it answers /api/health; the caller stops it"""
+    child_env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith(("LIVEKIT_", "OPENAI_", "GROQ_", "TWILIO_"))
+    }
+    child_env.update(env or {})
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=child_env,
+        stdout=subprocess.DEVNULL if quiet else None,
+        stderr=subprocess.DEVNULL if quiet else None,
+    )
+    deadline = time.time() + 30
+    while True:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        if time.time() > deadline or process.poll() is not None:
+            process.kill()
+            raise RuntimeError("API server failed to start")
+        time.sleep(0.1)
+
+
+@contextlib.contextmanager
+def run_api(port: int, env: Optional[Dict[str, str]] = None, workers: int = 1, quiet: bool = True):
+    """Start the warm transfer API in a subprocess and stop it on exit"""
+    process = start_api(port, env, workers, quiet)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Load test: do in-flight LLM summaries stall the rest of the API?
+
+Starts a stub LLM server with a fixed response delay and the API pointed at it,
+fires N concurrent /api/initiate-transfer requests and, while they are in flight,
+measures latency of /api/add-context and /api/notifications.
+
+    python -m benchmarks.summary_load --summaries 20 --llm-delay 2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.stubs import create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+
+
+async def probe(client: httpx.AsyncClient, session_id: str, stop: asyncio.Event, latencies: dict):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.post("/api/add-context", json={
+            "session_id": session_id, "speaker": "Customer", "message": "still waiting"
+        })
+        latencies["add-context"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await client.get("/api/notifications/probe_agent")
+        latencies["notifications"].append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def run(base_url: str, summaries: int, probes: int, baseline_seconds: float) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        sessions = []
+        for _ in range(summaries + probes):
+            data = (await client.post("/api/create-call", json={})).json()
+            sessions.append(data["session_id"])
+            await client.post("/api/add-context", json={
+                "session_id": data["session_id"], "speaker": "Customer",
+                "message": "I was double charged on my last invoice."
+            })
+
+        report = {}
+        for phase in ("idle", "under_load"):
+            latencies = {"add-context": [], "notifications": []}
+            stop = asyncio.Event()
+            probe_tasks = [
+                asyncio.create_task(probe(client, session_id, stop, latencies))
+                for session_id in sessions[summaries:]
+            ]
+            start = time.perf_counter()
+            if phase == "idle":
+                await asyncio.sleep(baseline_seconds)
+            else:
+                await asyncio.gather(*[
+                    client.post("/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"})
+                    for session_id in sessions[:summaries]
+                ])
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await asyncio.gather(*probe_tasks)
+
+            report[phase] = {"elapsed_s": round(elapsed, 3)}
+            for endpoint, samples in latencies.items():
+                report[phase][endpoint] = {
+                    "requests": len(samples),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                    "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                }
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=20, help="concurrent initiate-transfer requests")
+    parser.add_argument("--probes", type=int, default=4, help="concurrent latency probes")
+    parser.add_argument("--llm-delay", type=float, default=2.0, help="stub LLM response delay in seconds")
+    args = parser.parse_args()
+
+    llm_port, api_port = free_port(), free_port()
+    with serve_in_thread(create_stub_llm_app(delay=args.llm_delay), llm_port):
+        env = {
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+            "LLM_MAX_CONCURRENCY": str(args.summaries),
+        }
+        with run_api(api_port, env) as base_url:
+            report = asyncio.run(run(base_url, args.summaries, args.probes, args.llm_delay))
+
+    print(json.dumps({"benchmark": "summary_load", "summaries": args.summaries,
+                      "llm_delay_s": args.llm_delay, **report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
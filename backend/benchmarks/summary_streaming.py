@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to first summary text, buffered vs. streaming transfers.
+
+Runs the API against a stub LLM that sends its first word after --llm-delay and
+each following word --chunk-delay later. For every transfer it measures:
+
+- /api/initiate-transfer: when the response (with the whole summary) arrives
+- /api/initiate-transfer/stream: when Agent A sees the transfer event, the
+  first summary_delta and summary_done, and when Agent B's WebSocket receives
+  the first summary_delta
+
+Rolling summaries are off so every transfer summarizes from scratch.
+
+    python -m benchmarks.summary_streaming --transfers 10 --llm-delay 0.4 --words 60
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+
+from benchmarks.stubs import create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+
+
+async def new_session(client: httpx.AsyncClient, index: int) -> str:
+    session_id = (await client.post("/api/create-call", json={})).json()["session_id"]
+    await client.post("/api/add-context", json={
+        "session_id": session_id, "message": f"Customer {index} was double charged and wants a refund."
+    })
+    return session_id
+
+
+async def buffered_transfer(client: httpx.AsyncClient, index: int) -> dict:
+    session_id = await new_session(client, index)
+    start = time.perf_counter()
+    await client.post("/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": f"bench_b_{index}"})
+    return {"full_summary": time.perf_counter() - start}
+
+
+async def streaming_transfer(client: httpx.AsyncClient, ws_url: str, index: int) -> dict:
+    session_id = await new_session(client, index)
+    agent_b_id = f"bench_stream_b_{index}"
+    marks = {}
+    async with websockets.connect(f"{ws_url}/ws/agents/{agent_b_id}") as socket:
+
+        async def agent_b():
+            while True:
+                message = json.loads(await socket.recv())
+                if message["type"] == "summary_delta" and "agent_b_first_text" not in marks:
+                    marks["agent_b_first_text"] = time.perf_counter() - start
+                if message["type"] == "summary_complete":
+                    return
+
+        start = time.perf_counter()
+        listener = asyncio.create_task(agent_b())
+        async with client.stream("POST", "/api/initiate-transfer/stream",
+                                 json={"session_id": session_id, "agent_b_id": agent_b_id}) as response:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)["event"]
+                if event == "transfer":
+                    marks["transfer_event"] = time.perf_counter() - start
+                elif event == "summary_delta" and "first_text" not in marks:
+                    marks["first_text"] = time.perf_counter() - start
+                elif event == "summary_done":
+                    marks["full_summary"] = time.perf_counter() - start
+        await asyncio.wait_for(listener, timeout=30)
+    return marks
+
+
+def summarize(samples: list) -> dict:
+    report = {}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples if key in sample]
+        report[key] = {
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+        }
+    return report
+
+
+async def run(base_url: str, transfers: int) -> dict:
+    ws_url = base_url.replace("http", "ws", 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        buffered = [await buffered_transfer(client, index) for index in range(transfers)]
+        streaming = [await streaming_transfer(client, ws_url, index) for index in range(transfers)]
+    return {"buffered": summarize(buffered), "streaming": summarize(streaming)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transfers", type=int, default=10)
+    parser.add_argument("--llm-delay", type=float, default=0.4, help="stub LLM time to first word in seconds")
+    parser.add_argument("--chunk-delay", type=float, default=0.03, help="stub LLM delay between words in seconds")
+    parser.add_argument("--words", type=int, default=60, help="summary length in words")
+    args = parser.parse_args()
+
+    text = " ".join(f"word{index}" for index in range(args.words))
+    llm_port = free_port()
+    with serve_in_thread(create_stub_llm_app(delay=args.llm_delay, text=text, chunk_delay=args.chunk_delay), llm_port):
+        env = {
+            "OPENAI_API_KEY": "stub",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+            "ROLLING_SUMMARY_ENABLED": "false",
+        }
+        with run_api(free_port(), env) as base_url:
+            report = asyncio.run(run(base_url, args.transfers))
+
+    print(json.dumps({
+        "benchmark": "summary_streaming",
+        "transfers": args.transfers,
+        "llm_delay_ms": args.llm_delay * 1000,
+        "chunk_delay_ms": args.chunk_delay * 1000,
+        "words": args.words,
+        **report,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and prompt rendering cost of call transcripts.
+
+Compares the old representation (one "[HH:MM:SS] speaker: text" string per
+utterance in a list, joined in full for every summary) with transcript.Transcript
+at --utterances lines per call. Reports retained memory per call (tracemalloc),
+append throughput and the time to build the summary prompt, both in full and
+within the default SUMMARY_CONTEXT_MAX_TOKENS budget.
+
+    python -m benchmarks.transcript_memory --utterances 10000 --calls 20
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from transcript import Transcript
+
+WORDS = (
+    "account billing charge refund invoice plan upgrade router internet outage password reset "
+    "card payment address delivery order cancel subscription renewal discount technician"
+).split()
+
+
+def utterances(count: int, seed: int):
+    rng = random.Random(seed)
+    start = time.time()
+    speakers = ["Customer", "Agent"]
+    for index in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 20)))
+        yield start + index * 2, speakers[index % 2], text
+
+
+def build_strings(items):
+    lines = []
+    for timestamp, speaker, text in items:
+        lines.append(f"[{datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')}] {speaker}: {text}")
+    return lines
+
+
+def build_transcript(items):
+    transcript = Transcript()
+    for item in items:
+        transcript.append(item)
+    return transcript
+
+
+def measure(build, render_full, render_window, utterance_count: int, calls: int) -> dict:
+    # Utterances are generated inside the traced window, as request bodies would be,
+    # and dropped afterwards so only what each representation retains is counted
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = [list(utterances(utterance_count, seed)) for seed in range(calls)]
+    start = time.perf_counter()
+    stores = [build(items) for items in data]
+    append_seconds = time.perf_counter() - start
+    del data
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for store in stores:
+        render_full(store)
+    full_seconds = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    for store in stores:
+        render_window(store)
+    window_seconds = (time.perf_counter() - start) / calls
+
+    return {
+        "bytes_per_call": retained // calls,
+        "bytes_per_utterance": round(retained / calls / utterance_count, 1),
+        "appends_per_s": round(utterance_count * calls / append_seconds),
+        "render_full_ms": round(full_seconds * 1000, 2),
+        "render_prompt_window_ms": round(window_seconds * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=10000, help="utterances per call")
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--max-tokens", type=int, default=6000, help="prompt budget (SUMMARY_CONTEXT_MAX_TOKENS)")
+    args = parser.parse_args()
+
+    # Before: the whole list was joined on every summary, so the "window" is the full transcript
+    strings = measure(build_strings, "\n".join, "\n".join, args.utterances, args.calls)
+    compact = measure(
+        build_transcript,
+        lambda transcript: transcript.render(),
+        lambda transcript: transcript.render(args.max_tokens),
+        args.utterances,
+        args.calls,
+    )
+    print(json.dumps({
+        "benchmark": "transcript_memory",
+        "utterances_per_call": args.utterances,
+        "calls": args.calls,
+        "max_tokens": args.max_tokens,
+        "formatted_strings": strings,
+        "transcript": compact,
+        "memory_saved_pct": round((1 - compact["bytes_per_call"] / strings["bytes_per_call"]) * 100, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
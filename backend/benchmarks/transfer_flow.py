@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Load test: full call flows, run concurrently.
+
+Each flow is the WarmTransferTester flow from test_api.py (create-call →
+add-context → initiate-transfer → complete-transfer → end-call) on a shared
+HTTP client. By default the API runs against stub LiveKit and LLM servers with
+injected latency; pass --base-url to drive an already running server instead.
+
+Reports throughput and per-endpoint p50/p95/p99 latency as JSON. Write it to a
+file with --output and compare later runs against it with --baseline, so
+regressions show up as percentage changes.
+
+    python -m benchmarks.transfer_flow --flows 2000 --concurrency 200
+    python -m benchmarks.transfer_flow --output before.json
+    python -m benchmarks.transfer_flow --baseline before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.stubs import (
+    BACKEND_DIR, create_stub_livekit_app, create_stub_llm_app, free_port, percentile, run_api, serve_in_thread
+)
+from test_api import WarmTransferTester
+
+ENDPOINTS = ["create-call", "add-context", "initiate-transfer", "complete-transfer", "end-call"]
+QUANTILES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(samples: List[float], errors: int) -> dict:
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+async def run(base_url: str, flows: int, concurrency: int) -> dict:
+    timings: Dict[str, List[float]] = {endpoint: [] for endpoint in ENDPOINTS}
+    errors: Dict[str, int] = {endpoint: 0 for endpoint in ENDPOINTS}
+    flow_seconds: List[float] = []
+    completed = 0
+    remaining = iter(range(flows))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+
+        async def worker():
+            nonlocal completed
+            for _ in remaining:
+                tester = WarmTransferTester(base_url, client=client, verbose=False)
+                start = time.perf_counter()
+                if await tester.run_flow():
+                    completed += 1
+                    flow_seconds.append(time.perf_counter() - start)
+                for endpoint, samples in tester.timings.items():
+                    timings[endpoint].extend(samples)
+                for endpoint, count in tester.failures.items():
+                    errors[endpoint] += count
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "flows_completed": completed,
+        "flows_failed": flows - completed,
+        "flows_per_s": round(completed / elapsed, 2),
+        "requests_per_s": round(sum(len(samples) for samples in timings.values()) / elapsed, 2),
+        "flow": summarize(flow_seconds, flows - completed),
+        "endpoints": {endpoint: summarize(timings[endpoint], errors[endpoint]) for endpoint in ENDPOINTS},
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Percentage change of each latency quantile and of throughput relative to a previous report"""
+    def change(new: float, old: float) -> Optional[float]:
+        return round((new - old) / old * 100, 1) if old else None
+
+    changes = {"flows_per_s": change(report["flows_per_s"], baseline["flows_per_s"])}
+    for endpoint, stats in report["endpoints"].items():
+        old = baseline["endpoints"].get(endpoint)
+        if old:
+            changes[endpoint] = {quantile: change(stats[quantile], old[quantile]) for quantile in QUANTILES}
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", type=int, default=1000, help="total call flows to run")
+    parser.add_argument("--concurrency", type=int, default=100, help="flows in flight at once")
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="stub LLM response delay in seconds")
+    parser.add_argument("--livekit-delay", type=float, default=0.02, help="stub LiveKit response delay in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the API under test")
+    parser.add_argument("--base-url", help="benchmark a running server instead of starting one with stubs")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "transfer_flow",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "flows": args.flows,
+        "concurrency": args.concurrency,
+    }
+
+    if args.base_url:
+        report["target"] = args.base_url
+        report.update(asyncio.run(run(args.base_url, args.flows, args.concurrency)))
+    else:
+        report.update({
+            "llm_delay_ms": args.llm_delay * 1000,
+            "livekit_delay_ms": args.livekit_delay * 1000,
+            "workers": args.workers,
+        })
+        livekit_port, llm_port = free_port(), free_port()
+        with serve_in_thread(create_stub_livekit_app(delay=args.livekit_delay), livekit_port), \
+                serve_in_thread(create_stub_llm_app(delay=args.llm_delay), llm_port):
+            env = {
+                "LIVEKIT_API_KEY": "stub",
+                "LIVEKIT_API_SECRET": "stub_secret_stub_secret_stub_secret",
+                "LIVEKIT_HTTP_URL": f"http://127.0.0.1:{livekit_port}",
+                "OPENAI_API_KEY": "stub",
+                "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+                "LLM_MAX_CONCURRENCY": str(args.concurrency),
+            }
+            with tempfile.TemporaryDirectory() as tmp:
+                if args.workers > 1:
+                    # Workers only see each other's calls through a shared store
+                    env["STATE_BACKEND"] = "sqlite"
+                    env["STATE_SQLITE_PATH"] = os.path.join(tmp, "state.db")
+                with run_api(free_port(), env, workers=args.workers) as base_url:
+                    report.update(asyncio.run(run(base_url, args.flows, args.concurrency)))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline_revision"] = baseline.get("git_revision")
+        report["change_vs_baseline_pct"] = compare(report, baseline)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent PSTN transfers through /api/twilio-transfer.
+
+Runs the API against a fake Twilio Calls endpoint with a fixed response delay,
+fires N transfers at once and checks that they overlap instead of serializing
+(total time close to one Twilio round trip, not N of them) while /api/health
+stays responsive. Optionally injects 503s to exercise the retry policy.
+
+    python -m benchmarks.twilio_transfer --transfers 20 --twilio-delay 1
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.stubs import create_stub_twilio_app, free_port, percentile, run_api, serve_in_thread
+
+
+async def run(base_url: str, transfers: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        sessions = [(await client.post("/api/create-call", json={})).json()["session_id"] for _ in range(transfers)]
+
+        health_latencies = []
+        stop = asyncio.Event()
+
+        async def probe():
+            while not stop.is_set():
+                start = time.perf_counter()
+                await client.get("/api/health")
+                health_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.02)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/api/twilio-transfer", json={"session_id": session_id, "phone_number": "+15550100"})
+            for session_id in sessions
+        ])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    statuses = {}
+    for response in responses:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "status_codes": statuses,
+        "health_p99_ms": round(percentile(health_latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transfers", type=int, default=20)
+    parser.add_argument("--twilio-delay", type=float, default=1.0)
+    parser.add_argument("--unavailable-every", type=int, default=0, help="answer every k-th request with 503")
+    args = parser.parse_args()
+
+    twilio_port = free_port()
+    fake_twilio = create_stub_twilio_app(delay=args.twilio_delay, unavailable_every=args.unavailable_every)
+    with serve_in_thread(fake_twilio, twilio_port):
+        env = {
+            "TWILIO_ACCOUNT_SID": "ACbench",
+            "TWILIO_AUTH_TOKEN": "bench",
+            "TWILIO_PHONE_NUMBER": "+15550000",
+            "TWILIO_API_BASE_URL": f"http://127.0.0.1:{twilio_port}",
+            "TWILIO_RETRY_BACKOFF_SECONDS": "0.05",
+        }
+        with run_api(free_port(), env) as base_url:
+            result = asyncio.run(run(base_url, args.transfers))
+
+    print(json.dumps({
+        "benchmark": "twilio_transfer",
+        "transfers": args.transfers,
+        "twilio_delay_s": args.twilio_delay,
+        "serialized_would_take_s": args.transfers * args.twilio_delay,
+        "twilio_requests": fake_twilio.state.requests,
+        "twilio_max_in_flight": fake_twilio.state.max_in_flight,
+        **result,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: initiate-transfer latency when upstream connections are new vs. reused.
+
+The stub LLM and LiveKit servers sit behind proxies that hold every new
+connection for --connect-delay seconds, standing in for TCP and TLS setup
+to a remote service. Each configuration gets a fresh API, then:
+
+- cold burst: --burst concurrent transfers as the first upstream traffic
+- warm burst: the same again after --idle seconds without traffic
+
+Configurations:
+- cold:   UPSTREAM_PREWARM_CONNECTIONS=0 and a 5s keep-alive (the httpx
+          default the SDKs used before they were given a shared pool)
+- pooled: the defaults, with connections pre-warmed at startup and kept
+          alive for UPSTREAM_KEEPALIVE_SECONDS
+
+    python -m benchmarks.upstream_pools --burst 20 --connect-delay 0.1 --idle 8
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.stubs import (
+    connect_delay_proxy, create_stub_livekit_app, create_stub_llm_app, free_port, percentile, run_api,
+    serve_in_thread
+)
+
+CONFIGS = {
+    "cold": {"UPSTREAM_PREWARM_CONNECTIONS": "0", "UPSTREAM_KEEPALIVE_SECONDS": "5"},
+    "pooled": {},
+}
+
+
+async def burst(client: httpx.AsyncClient, size: int) -> dict:
+    sessions = []
+    for index in range(size):
+        room_name = f"call_bench_{time.monotonic_ns()}_{index}"
+        response = await client.post("/api/create-call", json={"room_name": room_name})
+        session_id = response.json()["session_id"]
+        await client.post("/api/add-context", json={"session_id": session_id, "message": "Refund request."})
+        sessions.append(session_id)
+
+    async def transfer(session_id: str) -> float:
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/initiate-transfer", json={"session_id": session_id, "agent_b_id": "bench_agent"}
+        )
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    latencies = await asyncio.gather(*[transfer(session_id) for session_id in sessions])
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+async def run(base_url: str, size: int, idle: float, proxies: dict) -> dict:
+    report = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        for name in ("cold_burst", "warm_burst"):
+            if name == "warm_burst":
+                await asyncio.sleep(idle)
+            opened = {upstream: stats["connections"] for upstream, stats in proxies.items()}
+            report[name] = await burst(client, size)
+            report[name]["new_connections"] = {
+                upstream: stats["connections"] - opened[upstream] for upstream, stats in proxies.items()
+            }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=20, help="concurrent transfers per burst")
+    parser.add_argument("--connect-delay", type=float, default=0.1, help="seconds to set up each upstream connection")
+    parser.add_argument("--idle", type=float, default=8, help="seconds between the bursts")
+    parser.add_argument("--llm-delay", type=float, default=0.2)
+    parser.add_argument("--livekit-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    llm_port, livekit_port = free_port(), free_port()
+    llm_proxy_port, livekit_proxy_port = free_port(), free_port()
+    report = {"benchmark": "upstream_pools", "burst": args.burst, "connect_delay_s": args.connect_delay}
+    # Hosted APIs keep idle connections open far longer than uvicorn's 5s default
+    with serve_in_thread(create_stub_llm_app(delay=args.llm_delay), llm_port, keep_alive=120), \
+            serve_in_thread(create_stub_livekit_app(delay=args.livekit_delay), livekit_port, keep_alive=120):
+        for config, overrides in CONFIGS.items():
+            with connect_delay_proxy(llm_port, llm_proxy_port, args.connect_delay) as llm_proxy, \
+                    connect_delay_proxy(livekit_port, livekit_proxy_port, args.connect_delay) as livekit_proxy:
+                env = {
+                    "LIVEKIT_API_KEY": "stub",
+                    "LIVEKIT_API_SECRET": "stub_secret_stub_secret_stub_secret",
+                    "LIVEKIT_HTTP_URL": f"http://127.0.0.1:{livekit_proxy_port}",
+                    "OPENAI_API_KEY": "stub",
+                    "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_proxy_port}/v1",
+                    "ROLLING_SUMMARY_ENABLED": "false",
+                    **overrides,
+                }
+                proxies = {"llm": llm_proxy, "livekit": livekit_proxy}
+                with run_api(free_port(), env) as base_url:
+                    report[config] = asyncio.run(run(base_url, args.burst, args.idle, proxies))
+    for name in ("cold_burst", "warm_burst"):
+        report[f"{name}_p99_speedup"] = round(report["cold"][name]["p99_ms"] / report["pooled"][name]["p99_ms"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Extractive call summaries computed locally, without an LLM.
+
+Used when no LLM provider is configured or the providers fail, and as an
+instant draft while the LLM summary is still being written. Utterances are
+split into sentences, treated as the documents of a TF-IDF model of the
+call, and each sentence is scored by the weight of its words: words the call
+comes back to a few times (the product, the problem, amounts, order numbers)
+count most, words in nearly every line count for nothing, and sentences said
+word for word many times ("let me check that for you") are discounted.
+Customer sentences are weighted up, since they state the need, and later
+sentences slightly up, since they reflect where the call ended. The best
+sentences are returned in call order, skipping near-duplicates of sentences
+already picked.
+
+This is TF-IDF rather than TextRank: TextRank compares every pair of
+sentences, while this is linear in the transcript length, so even a
+10,000-line call takes milliseconds.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'$.]*[a-z0-9]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above after again all am an and any are as at be because been before being below between both but by
+can could did do does doing don't down during each few for from further get got had has have having he her here
+hers him his how i i'm i'll i've if in into is it it's its just let let's me more most my no nor not now of off
+okay ok on once one only or other our ours out over own please same she should so some sure than thank thanks
+that that's the their them then there these they this those through to too under until up us very was we we're
+were what when where which while who whom why will with would yeah yes you you're your yours
+""".split())
+
+# Lowercase speaker-name prefix -> weight; other speakers weigh 1.0
+SPEAKER_WEIGHTS = {"customer": 1.5, "caller": 1.5}
+MAX_SENTENCE_CHARS = 240
+# Sentences sharing more than this share of their words with a picked one are skipped
+MAX_OVERLAP = 0.6
+
+
+def _terms(sentence: str) -> frozenset:
+    return frozenset(_WORD.findall(sentence.lower())) - STOPWORDS
+
+
+def _speaker_weight(speaker: str, weights: Dict[str, float]) -> float:
+    name = speaker.lower()
+    for prefix, weight in weights.items():
+        if name.startswith(prefix):
+            return weight
+    return 1.0
+
+
+def extract_summary(items: Iterable[Sequence], max_sentences: int = 6,
+                    speaker_weights: Optional[Dict[str, float]] = None) -> str:
+    """Pick the key sentences of (timestamp, speaker, text) utterances; one "- Speaker: sentence" line each"""
+    weights = SPEAKER_WEIGHTS if speaker_weights is None else speaker_weights
+    sentences = []  # (speaker, sentence, distinct terms)
+    document_frequency: Counter = Counter()
+    repeats: Counter = Counter()
+    for _, speaker, text in items:
+        for sentence in _SENTENCE_END.split(text.strip()):
+            terms = _terms(sentence)
+            if terms:
+                sentences.append((speaker, sentence, terms))
+                repeats[terms] += 1
+                document_frequency.update(terms)
+    if not sentences:
+        return ""
+
+    count = len(sentences)
+    # Sublinear term frequency times IDF: grows while a word recurs, falls to zero as it nears every line
+    term_weight = {
+        term: (1.0 + math.log(frequency)) * math.log(count / frequency)
+        for term, frequency in document_frequency.items()
+    }
+
+    speaker_weight = {speaker: _speaker_weight(speaker, weights) for speaker in {s[0] for s in sentences}}
+
+    def score(index: int) -> float:
+        speaker, _, terms = sentences[index]
+        # The square root of the length keeps long sentences from winning on length alone
+        weight = sum(map(term_weight.__getitem__, terms)) / math.sqrt(len(terms))
+        position = 1.0 + 0.3 * index / count
+        return weight / repeats[terms] * speaker_weight[speaker] * position
+
+    # Consider a few more candidates than needed, as some will be near-duplicates
+    candidates = heapq.nlargest(max_sentences * 4, range(count), key=score)
+    picked: List[int] = []
+    for index in candidates:
+        terms = sentences[index][2]
+        if any(len(terms & sentences[other][2]) > MAX_OVERLAP * len(terms) for other in picked):
+            continue
+        picked.append(index)
+        if len(picked) == max_sentences:
+            break
+
+    lines = []
+    for index in sorted(picked):
+        speaker, sentence, _ = sentences[index]
+        if len(sentence) > MAX_SENTENCE_CHARS:
+            sentence = sentence[:MAX_SENTENCE_CHARS - 1].rstrip() + "…"
+        lines.append(f"- {speaker}: {sentence}")
+    return "\n".join(lines)
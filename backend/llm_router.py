@@ -0,0 +1,109 @@
+"""
+Latency-aware routing between LLM providers.
+
+ProviderRouter keeps a rolling window of latencies and outcomes for every
+configured provider and ranks them for each request: healthy providers first,
+fastest first. A provider whose requests keep failing has its circuit opened
+and is skipped until a cooldown passes; then a single probe request is let
+through, which closes the circuit again on success.
+
+The router only keeps score; LLMService decides how to use the ranking
+(failover, hedged requests).
+"""
+
+import time
+from collections import deque
+from typing import Any, List, Optional
+
+
+class LLMProvider:
+    """A configured provider/model pair and its recent track record"""
+
+    def __init__(self, name: str, client: Any, model: str, window: int):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    @property
+    def latency(self) -> float:
+        """Mean of recent latencies; 0 for a provider with no samples so it gets tried"""
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def circuit(self, now: float) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+
+class ProviderRouter:
+    def __init__(self, failure_threshold: int, cooldown: float, unhealthy_error_rate: float = 0.5):
+        self.providers: List[LLMProvider] = []
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.unhealthy_error_rate = unhealthy_error_rate
+
+    def add(self, provider: LLMProvider):
+        self.providers.append(provider)
+
+    def ranked(self, now: Optional[float] = None) -> List[LLMProvider]:
+        """Providers that may take a request, best first.
+
+        If every circuit is open the full list is returned anyway; trying a
+        provider that is probably down beats failing without trying.
+        """
+        now = now or time.monotonic()
+        available = []
+        for provider in self.providers:
+            state = provider.circuit(now)
+            if state == "open" or (state == "half_open" and provider.probing):
+                continue
+            available.append(provider)
+        if not available:
+            available = list(self.providers)
+        # sorted() is stable, so configuration order (Groq first) breaks ties
+        return sorted(available, key=lambda p: (p.error_rate > self.unhealthy_error_rate, p.latency))
+
+    def started(self, provider: LLMProvider, now: Optional[float] = None):
+        if provider.circuit(now or time.monotonic()) == "half_open":
+            provider.probing = True
+
+    def record_success(self, provider: LLMProvider, seconds: float):
+        provider.latencies.append(seconds)
+        provider.outcomes.append(True)
+        provider.consecutive_failures = 0
+        provider.open_until = 0.0
+        provider.probing = False
+
+    def record_failure(self, provider: LLMProvider, now: Optional[float] = None):
+        now = now or time.monotonic()
+        provider.outcomes.append(False)
+        provider.consecutive_failures += 1
+        if provider.probing or provider.consecutive_failures >= self.failure_threshold:
+            provider.open_until = now + self.cooldown
+        provider.probing = False
+
+    def record_abandoned(self, provider: LLMProvider, seconds: float):
+        """A hedged request that lost the race; it took at least this long"""
+        provider.latencies.append(seconds)
+        provider.probing = False
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            provider.name: {
+                "model": provider.model,
+                "latency_ms": round(provider.latency * 1000, 1),
+                "error_rate": round(provider.error_rate, 3),
+                "circuit": provider.circuit(now),
+            }
+            for provider in self.providers
+        }
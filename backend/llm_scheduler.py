@@ -0,0 +1,209 @@
+"""
+Admission control for LLM requests.
+
+Every summary request waits here for a slot on the provider it was routed to.
+Each provider has a concurrency limit and, optionally, a token bucket that
+keeps requests under the account's rate limit. When either is exhausted,
+requests queue by priority: summaries for a transfer happening now go before
+background refreshes of the rolling summary, and in arrival order within a
+priority. A few slots can be reserved for transfers, so background work never
+fills the provider up.
+
+Instead of letting a spike queue up until every request times out at once,
+the scheduler sheds load. A request is refused straight away when its queue is
+full (background requests already when a few are queued) or when the rate
+limit means it could not start within max_wait, and a request still queued
+after max_wait gives up. Shed requests raise Overloaded, and the caller takes a
+cheaper path.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+TRANSFER = "transfer"
+BACKGROUND = "background"
+# Lower goes first
+PRIORITIES = {TRANSFER: 0, BACKGROUND: 1}
+
+
+class Overloaded(Exception):
+    """A request shed instead of queued; reason is queue_full, rate_limited or timeout"""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} request shed ({reason})")
+        self.provider = provider
+        self.reason = reason
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, in bursts of up to `burst`; a rate of 0 is unlimited"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: Optional[float] = None) -> float:
+        if self.rate <= 0:
+            return float("inf")
+        self._refill(now or time.monotonic())
+        return self.tokens
+
+    def take(self, now: Optional[float] = None) -> bool:
+        if self.available(now) < 1:
+            return False
+        if self.rate > 0:
+            self.tokens -= 1
+        return True
+
+    def delay(self, tokens: float = 1, now: Optional[float] = None) -> float:
+        """Seconds until `tokens` more tokens will have been added"""
+        if self.rate <= 0:
+            return 0.0
+        return max(0.0, tokens - self.available(now)) / self.rate
+
+
+class ProviderQueue:
+    """Slots, rate limit and waiting requests for one provider"""
+
+    def __init__(self, name: str, limit: int, bucket: TokenBucket, window: int):
+        self.name = name
+        self.limit = limit
+        self.bucket = bucket
+        self.in_flight = 0
+        # (priority rank, arrival number, future resolved on admission)
+        self.waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self.depth: Counter = Counter()
+        self.waits: deque = deque(maxlen=window)
+        self.admitted: Counter = Counter()
+        self.shed: Counter = Counter()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class AdmissionScheduler:
+    def __init__(self, max_concurrency: int, reserved_for_transfers: int, max_queue: int,
+                 background_max_queue: int, max_wait: float, window: int = 200):
+        self.max_concurrency = max(1, max_concurrency)
+        # Background requests only run while more than this many slots are free
+        self.reserved = min(max(0, reserved_for_transfers), self.max_concurrency - 1)
+        self.max_queue = max_queue
+        self.background_max_queue = background_max_queue
+        self.max_wait = max_wait
+        self.window = window
+        self.queues: Dict[str, ProviderQueue] = {}
+        self._arrivals = itertools.count()
+
+    def add(self, name: str, requests_per_minute: float = 0, burst: Optional[int] = None):
+        bucket = TokenBucket(requests_per_minute / 60, burst or self.max_concurrency)
+        self.queues[name] = ProviderQueue(name, self.max_concurrency, bucket, self.window)
+
+    def _has_slot(self, queue: ProviderQueue, rank: int) -> bool:
+        limit = queue.limit if rank == PRIORITIES[TRANSFER] else queue.limit - self.reserved
+        return queue.in_flight < limit
+
+    def _check_admissible(self, queue: ProviderQueue, priority: str):
+        """Shed a request up front if it cannot be served within max_wait"""
+        queued = sum(queue.depth.values())
+        if queued >= self.max_queue or (priority == BACKGROUND and queued >= self.background_max_queue):
+            raise Overloaded(queue.name, "queue_full")
+        # Requests of the same or a higher priority each need a token first
+        ahead = queue.depth[TRANSFER] if priority == TRANSFER else queued
+        if queue.bucket.delay(ahead + 1) > self.max_wait:
+            raise Overloaded(queue.name, "rate_limited")
+
+    def _dispatch(self, queue: ProviderQueue):
+        """Admit waiting requests, highest priority first, while slots and tokens last"""
+        queue.timer = None
+        while queue.waiting:
+            rank, _, waiter = queue.waiting[0]
+            if waiter.done():
+                # Gave up while queued
+                heapq.heappop(queue.waiting)
+                continue
+            if not self._has_slot(queue, rank):
+                return
+            if not queue.bucket.take():
+                queue.timer = asyncio.get_running_loop().call_later(queue.bucket.delay(), self._dispatch, queue)
+                return
+            heapq.heappop(queue.waiting)
+            queue.in_flight += 1
+            waiter.set_result(None)
+
+    def _release(self, queue: ProviderQueue):
+        queue.in_flight -= 1
+        if queue.timer is None:
+            self._dispatch(queue)
+
+    @asynccontextmanager
+    async def slot(self, name: str, priority: str = TRANSFER) -> AsyncIterator[float]:
+        """Hold one of the provider's slots; yields the seconds spent queued. Raises Overloaded if shed."""
+        queue = self.queues[name]
+        rank = PRIORITIES[priority]
+        start = time.monotonic()
+        try:
+            if not queue.depth and self._has_slot(queue, rank) and queue.bucket.take():
+                queue.in_flight += 1
+            else:
+                await self._wait(queue, priority, rank)
+        except Overloaded:
+            queue.shed[priority] += 1
+            raise
+        waited = time.monotonic() - start
+        queue.waits.append(waited)
+        queue.admitted[priority] += 1
+        try:
+            yield waited
+        finally:
+            self._release(queue)
+
+    async def _wait(self, queue: ProviderQueue, priority: str, rank: int):
+        self._check_admissible(queue, priority)
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(queue.waiting, (rank, next(self._arrivals), waiter))
+        queue.depth[priority] += 1
+        try:
+            if queue.timer is None:
+                self._dispatch(queue)
+            await asyncio.wait((waiter,), timeout=self.max_wait)
+        except asyncio.CancelledError:
+            # cancel() fails if the request was admitted in the meantime; hand its slot on
+            if not waiter.cancel():
+                self._release(queue)
+            raise
+        finally:
+            queue.depth[priority] -= 1
+            if not queue.depth[priority]:
+                del queue.depth[priority]
+        if waiter.cancel():
+            raise Overloaded(queue.name, "timeout")
+
+    def depths(self) -> Dict[Tuple[str, str], int]:
+        """Queued requests by (provider, priority)"""
+        return {(name, priority): queue.depth[priority] for name, queue in self.queues.items() for priority in PRIORITIES}
+
+    def stats(self) -> dict:
+        report = {}
+        for name, queue in self.queues.items():
+            waits = sorted(queue.waits)
+            tokens = queue.bucket.available()
+            report[name] = {
+                "in_flight": queue.in_flight,
+                "max_concurrency": queue.limit,
+                "queued": {priority: queue.depth[priority] for priority in PRIORITIES},
+                "tokens": None if tokens == float("inf") else round(tokens, 2),
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                "wait_p99_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000, 1) if waits else 0.0,
+                "admitted": {priority: queue.admitted[priority] for priority in PRIORITIES},
+                "shed": {priority: queue.shed[priority] for priority in PRIORITIES},
+            }
+        return report
@@ -1,30 +1,51 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 import asyncio
+import hashlib
 import json
 import logging
-from typing import Dict, List, Optional
+import time
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape as xml_escape
+import importlib.util
 import os
 from dotenv import load_dotenv
 
-from livekit import api
-from livekit.api import AccessToken, VideoGrants
-
-# Import LLM integration
-import openai
-from groq import Groq
+from state_store import ConflictError, StateStore, create_state_store
+from llm_router import LLMProvider, ProviderRouter
+from llm_scheduler import BACKGROUND, TRANSFER, AdmissionScheduler, Overloaded
+from agent_directory import STATUSES, AgentDirectory
+from upstream_clients import ClientRegistry, Upstream
+from transcript import Transcript, format_line, render_items
+from extractive_summary import extract_summary
+from schemas import (
+    AckRequest, AckResponse, AddContextBatchRequest, AddContextBatchResponse, AddContextRequest,
+    AddContextResponse, AgentExitRequest, AgentExitResponse, AgentListResponse, AgentInfo, CallListResponse,
+    CallRecord, CallSession, CompleteTransferResponse, ContextItem, CreateCallRequest, CreateCallResponse,
+    EndCallResponse, describe_errors, HealthResponse, HeartbeatRequest, MessageResponse, NotificationsResponse,
+    NotifyAgentBRequest, NotifyAgentBResponse, RegisterAgentRequest, RegisteredAgent, SessionRequest,
+    TransferRequest, TransferResponse, TwilioTransferRequest, TwilioTransferResponse
+)
+from metrics import (
+    ENDPOINT_SECONDS, LLM_FALLBACKS, LLM_HEDGED_REQUESTS, LLM_QUEUE_WAIT_SECONDS, LLM_REQUESTS, LLM_SHED,
+    STAGE_SECONDS, SUMMARY_CACHE,
+    StateCollector, register_state_collector, time_stage, timed
+)
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
-# Import Twilio (optional)
-try:
-    from twilio.rest import Client as TwilioClient
-    TWILIO_AVAILABLE = True
-except ImportError:
-    TWILIO_AVAILABLE = False
+import jwt
 
-import requests
+# The LiveKit, Groq, OpenAI and Twilio SDKs are imported where their clients are
+# built, so a deployment only loads (and starts up with) the ones it has credentials for
+TWILIO_AVAILABLE = importlib.util.find_spec("twilio") is not None
 
 load_dotenv()
 
@@ -32,7 +53,14 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Warm Transfer API", version="1.0.0")
+# orjson encodes the stored call records and notifications, datetimes included, without a jsonable_encoder pass
+app = FastAPI(title="Warm Transfer API", version="1.0.0", default_response_class=ORJSONResponse)
+
+@app.exception_handler(RequestValidationError)
+async def request_validation_error(request: Request, exc: RequestValidationError):
+    """Malformed bodies are a 400 with the offending fields, as before the routes were typed"""
+    # Locations start with "body"
+    return ORJSONResponse(status_code=400, content={"detail": describe_errors(exc.errors(), skip=1)})
 
 # CORS middleware
 app.add_middleware(
@@ -44,16 +72,37 @@ app.add_middleware(
 )
 
 # Global state management
+# Call status changes the state machine allows; transferring -> transferring re-targets a transfer
+CALL_TRANSITIONS = {
+    "active": ("transferring", "ended"),
+    "transferring": ("transferring", "transferred", "ended"),
+    "transferred": ("ended",),
+    "ended": (),
+}
+CALL_STATUSES = tuple(CALL_TRANSITIONS)
+
+class CallStateConflict(Exception):
+    """A call change that the call's current state does not allow, or that another request overtook"""
+
 class TransferManager:
-    def __init__(self):
-        self.active_calls: Dict[str, dict] = {}
-        self.agents: Dict[str, dict] = {}
-        self.transfer_sessions: Dict[str, dict] = {}
-        self.notifications: Dict[str, List[dict]] = {}
+    # Call fields indexed for dashboard queries; the store keeps them current on every write
+    CALL_INDEXES = ("status", "agent_a", "agent_b", "room_name", "transfer_room")
+    
+    def __init__(self, store: StateStore, agents: AgentDirectory):
+        self.store = store
+        for field in self.CALL_INDEXES:
+            store.add_index("calls", field)
+        # Read-only views over the store; all writes go through the methods below
+        # so that shared backends apply them atomically
+        self.active_calls: Mapping[str, dict] = store.records("calls")
+        self.transfer_sessions: Mapping[str, dict] = store.records("transfer_sessions")
+        self.notifications: Mapping[str, List[dict]] = store.lists("notifications")
+        # Registered Agent B candidates and their load, kept in the same store
+        self.agents = agents
         
     def create_call_session(self, caller_id: str, room_name: str) -> str:
         session_id = str(uuid.uuid4())
-        self.active_calls[session_id] = {
+        self.store.put("calls", session_id, {
             "caller_id": caller_id,
             "room_name": room_name,
             "agent_a": None,
@@ -62,79 +111,317 @@ class TransferManager:
             "created_at": datetime.now(),
             "call_summary": "",
             "transfer_room": None,
-            "agent_a_exited": False
-        }
+            "agent_a_exited": False,
+            "updated_at": datetime.now(),
+            # Bumped by every status change; requests that span awaits check it before writing
+            "version": 0
+        })
         return session_id
     
+    def calls_with_status(self, status: str) -> List[str]:
+        return self.store.lookup("calls", "status", status)
+    
+    def calls_for_agent(self, agent_id: str) -> List[str]:
+        """Sessions where the agent is Agent A or Agent B"""
+        as_agent_a = self.store.lookup("calls", "agent_a", agent_id)
+        seen = set(as_agent_a)
+        return as_agent_a + [s for s in self.store.lookup("calls", "agent_b", agent_id) if s not in seen]
+    
+    def call_for_room(self, room_name: str) -> Optional[str]:
+        """Session whose customer room or transfer room this is"""
+        sessions = self.store.lookup("calls", "room_name", room_name) or self.store.lookup("calls", "transfer_room", room_name)
+        return sessions[0] if sessions else None
+    
+    def update_call(self, session_id: str, expect_version: Optional[int] = None, **fields) -> Optional[dict]:
+        """Merge fields into a call session; returns the updated session or None if unknown.
+        
+        With expect_version, the write only happens if no status change has been
+        made since that version; otherwise CallStateConflict is raised.
+        """
+        fields["updated_at"] = datetime.now()
+        if expect_version is None:
+            return self.store.update("calls", session_id, fields)
+        try:
+            updated = self.store.update("calls", session_id, fields, expect={"version": expect_version})
+        except ConflictError:
+            raise CallStateConflict("Call changed while this request was in progress")
+        if updated is None:
+            raise CallStateConflict("Call session no longer exists")
+        return updated
+    
+    def transition(self, session_id: str, status: str, require: Optional[dict] = None, **fields) -> Tuple[dict, dict]:
+        """Move a call to status, writing fields along with it; returns the call before and after.
+        
+        The write is conditional on the version that was validated, so when two
+        requests race, one wins and the other is re-validated against the result.
+        Raises KeyError for an unknown session and CallStateConflict when the
+        state machine, or a field in `require`, does not allow the change.
+        """
+        while True:
+            call = self.active_calls.get(session_id)
+            if call is None:
+                raise KeyError(session_id)
+            if status not in CALL_TRANSITIONS[call["status"]]:
+                raise CallStateConflict(f"Call is {call['status']}; it cannot become {status}")
+            if any(call.get(field) != value for field, value in (require or {}).items()):
+                raise CallStateConflict(f"Call is {call['status']}; it cannot become {status} yet")
+            previous = dict(call)
+            version = call.get("version")
+            try:
+                updated = self.store.update("calls", session_id, {
+                    **fields, "status": status, "version": (version or 0) + 1, "updated_at": datetime.now()
+                }, expect={"version": version})
+            except ConflictError:
+                continue
+            if updated is None:
+                raise KeyError(session_id)
+            # The in-memory store hands back the live record; callers keep this as the version they started from
+            return previous, dict(updated)
+    
+    def remove_call(self, session_id: str):
+        self.store.delete("calls", session_id)
+        self.agents.release(session_id)
+    
     def assign_agent_a(self, session_id: str, agent_id: str):
-        if session_id in self.active_calls:
-            self.active_calls[session_id]["agent_a"] = agent_id
+        self.update_call(session_id, agent_a=agent_id)
             
-    def initiate_transfer(self, session_id: str, agent_b_id: str) -> str:
-        if session_id not in self.active_calls:
-            raise ValueError("Session not found")
-            
-        transfer_room = f"transfer_{session_id}_{uuid.uuid4().hex[:8]}"
-        self.active_calls[session_id]["agent_b"] = agent_b_id
-        self.active_calls[session_id]["transfer_room"] = transfer_room
-        self.active_calls[session_id]["status"] = "transferring"
+    def route_transfer(self, session_id: str, agent_b_id: Optional[str] = None, skill: Optional[str] = None) -> Optional[str]:
+        """Pick Agent B for a transfer.
         
-        return transfer_room
-
-    def end_call(self, session_id: str):
-        if session_id in self.active_calls:
-            self.active_calls[session_id]["status"] = "ended"
-            self.active_calls[session_id]["ended_at"] = datetime.now()
+        An explicitly requested agent is used as is. Otherwise the least-loaded
+        available agent with the skill is picked; None if there is none. The
+        load is only counted once initiate_transfer has moved the call.
+        """
+        if not agent_b_id:
+            agent = self.agents.select(skill)
+            if agent is None:
+                return None
+            agent_b_id = agent.agent_id
+        return agent_b_id
+    
+    def initiate_transfer(self, session_id: str, agent_b_id: str, transfer_room: Optional[str] = None) -> Tuple[dict, dict]:
+        """Move the call to transferring and count it against Agent B's load; returns the call before and after.
+        
+        A transition that is rejected (see transition) leaves the directory untouched,
+        so the agent currently on the call keeps its load.
+        """
+        transfer_room = transfer_room or f"transfer_{session_id}_{uuid.uuid4().hex[:8]}"
+        previous, call = self.transition(
+            session_id, "transferring", agent_b=agent_b_id, transfer_room=transfer_room, transfer_ready=False
+        )
+        self.agents.assign(agent_b_id, session_id)
+        return previous, call
+    
+    def complete_transfer(self, session_id: str) -> dict:
+        """Move a transfer whose room is set up and Agent B notified to transferred; returns the call"""
+        _, call = self.transition(session_id, "transferred", require={"transfer_ready": True})
+        return call
 
-transfer_manager = TransferManager()
+    def end_call(self, session_id: str) -> dict:
+        """Move the call to ended and free Agent B's load; returns the ended call"""
+        _, call = self.transition(session_id, "ended", ended_at=datetime.now())
+        self.agents.release(session_id)
+        return call
+    
+    def queue_notification(self, agent_id: str, notification: dict) -> dict:
+        """Queue a notification until the agent acknowledges it; returns it with its sequence number"""
+        return self.store.push("notifications", agent_id, notification, NOTIFICATION_QUEUE_MAX)
+    
+    def read_notifications(self, agent_id: str, since: int = 0) -> List[dict]:
+        """Queued notifications with a sequence number above since, oldest first.
+        
+        A cursor ahead of the agent's last sequence number comes from before a
+        restart of a non-persistent store, so it is treated as 0.
+        """
+        if since > self.store.last_sequence("notifications", agent_id):
+            since = 0
+        return [n for n in self.notifications.get(agent_id, []) if n["seq"] > since]
+    
+    def ack_notifications(self, agent_id: str, seq: int) -> int:
+        """Drop notifications up to and including seq; returns how many were dropped"""
+        return self.store.ack("notifications", agent_id, seq)
+    
+    def prune_notifications(self, agent_id: str, cutoff: datetime, max_len: int) -> int:
+        """Drop queued notifications older than cutoff and all but the newest max_len; returns how many were dropped"""
+        queued = self.notifications.get(agent_id, [])
+        expired = [n["seq"] for n in queued[:max(0, len(queued) - max_len)]]
+        expired += [n["seq"] for n in queued if datetime.fromisoformat(n["timestamp"]) < cutoff]
+        return self.ack_notifications(agent_id, max(expired)) if expired else 0
 
 # LiveKit configuration
 LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY")
 LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET")
 LIVEKIT_WS_URL = os.getenv("LIVEKIT_WS_URL", "ws://localhost:7880")
 LIVEKIT_HTTP_URL = os.getenv("LIVEKIT_HTTP_URL", "http://localhost:7880")
+LIVEKIT_TOKEN_TTL_SECONDS = int(os.getenv("LIVEKIT_TOKEN_TTL_SECONDS", "21600"))
+LIVEKIT_TOKEN_MIN_REMAINING_SECONDS = int(os.getenv("LIVEKIT_TOKEN_MIN_REMAINING_SECONDS", "3600"))  # reissue cached tokens below this
+LIVEKIT_TOKEN_CACHE_SIZE = int(os.getenv("LIVEKIT_TOKEN_CACHE_SIZE", "10000"))
+TRANSFER_ROOM_POOL_SIZE = int(os.getenv("TRANSFER_ROOM_POOL_SIZE", "0"))  # 0 disables pre-provisioning
+TRANSFER_ROOM_POOL_MAX_AGE_SECONDS = float(os.getenv("TRANSFER_ROOM_POOL_MAX_AGE_SECONDS", "600"))
+LIVEKIT_TIMEOUT_SECONDS = float(os.getenv("LIVEKIT_TIMEOUT_SECONDS", "10"))  # per LiveKit API request
 
 # LLM configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Same variables and defaults the SDKs use; read here because pre-warming needs the host
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # in-flight requests per provider
+LLM_TRANSFER_RESERVED_SLOTS = int(os.getenv("LLM_TRANSFER_RESERVED_SLOTS", "2"))  # of those, never taken by background summaries
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "100"))  # requests queued per provider before new ones are shed
+LLM_BACKGROUND_QUEUE_MAX = int(os.getenv("LLM_BACKGROUND_QUEUE_MAX", str(LLM_MAX_CONCURRENCY)))  # background summaries are shed beyond this queue depth
+LLM_QUEUE_MAX_WAIT_SECONDS = float(os.getenv("LLM_QUEUE_MAX_WAIT_SECONDS", "5"))  # longest wait for a slot before the extractive summary is used
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "0"))  # account rate limit; 0 for none
+OPENAI_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "0"))
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", str(LLM_MAX_CONCURRENCY)))  # requests started back to back under a rate limit
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))  # race the next provider after this long; 0 disables
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))  # consecutive failures that open a provider's circuit
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "20"))  # recent requests used to rank providers
+# With both providers configured, failing over beats the SDKs' own retries against the same provider
+LLM_SDK_MAX_RETRIES = 0 if OPENAI_API_KEY and GROQ_API_KEY else 2
+ROLLING_SUMMARY_ENABLED = os.getenv("ROLLING_SUMMARY_ENABLED", "true").lower() == "true"
+SUMMARY_MAX_STALE_MESSAGES = int(os.getenv("SUMMARY_MAX_STALE_MESSAGES", "3"))  # unsummarized lines tolerated at transfer time; more start a background refresh
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "1000"))
+SUMMARY_CACHE_TTL_SECONDS = float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "900"))
+EXTRACTIVE_SUMMARY_SENTENCES = int(os.getenv("EXTRACTIVE_SUMMARY_SENTENCES", "6"))  # key sentences in the local draft/fallback summary
+
+# Upstream connection pools (LiveKit, Groq, OpenAI each get their own)
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))  # idle connections kept open (Groq/OpenAI)
+UPSTREAM_KEEPALIVE_SECONDS = float(os.getenv("UPSTREAM_KEEPALIVE_SECONDS", "30"))  # idle time before a connection is closed
+UPSTREAM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT_SECONDS", "5"))
+UPSTREAM_PREWARM_CONNECTIONS = int(os.getenv("UPSTREAM_PREWARM_CONNECTIONS", "8"))  # opened to each upstream at startup; matches LLM_MAX_CONCURRENCY
+
+# Notification delivery
+NOTIFICATION_QUEUE_POLL_SECONDS = float(os.getenv("NOTIFICATION_QUEUE_POLL_SECONDS", "1"))  # socket drain interval for queued items
+NOTIFICATION_LONG_POLL_MAX_SECONDS = float(os.getenv("NOTIFICATION_LONG_POLL_MAX_SECONDS", "30"))  # cap on ?wait= for polls
+NOTIFICATION_SEND_TIMEOUT_SECONDS = float(os.getenv("NOTIFICATION_SEND_TIMEOUT_SECONDS", "2"))  # a socket slower than this is closed
+
+# Retention and memory bounds
+REAPER_INTERVAL_SECONDS = float(os.getenv("REAPER_INTERVAL_SECONDS", "60"))
+ENDED_CALL_TTL_SECONDS = float(os.getenv("ENDED_CALL_TTL_SECONDS", "3600"))  # keep ended calls queryable this long
+ABANDONED_CALL_TTL_SECONDS = float(os.getenv("ABANDONED_CALL_TTL_SECONDS", "14400"))  # no updates or context for this long
+NOTIFICATION_TTL_SECONDS = float(os.getenv("NOTIFICATION_TTL_SECONDS", "3600"))
+NOTIFICATION_QUEUE_MAX = int(os.getenv("NOTIFICATION_QUEUE_MAX", "100"))  # undelivered notifications kept per agent
+MAX_CONTEXT_MESSAGES = int(os.getenv("MAX_CONTEXT_MESSAGES", "2000"))  # transcript lines kept per session
+SUMMARY_CONTEXT_MAX_TOKENS = int(os.getenv("SUMMARY_CONTEXT_MAX_TOKENS", "6000"))  # newest transcript window sent to the LLM
+CONTEXT_BATCH_MAX_ITEMS = int(os.getenv("CONTEXT_BATCH_MAX_ITEMS", "1000"))  # items per /api/add-context/batch request
+
+# Agent directory
+AGENT_HEARTBEAT_TTL_SECONDS = float(os.getenv("AGENT_HEARTBEAT_TTL_SECONDS", "30"))  # agents without a heartbeat this long are dropped
 
 # Twilio configuration (optional)
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+TWILIO_API_BASE_URL = os.getenv("TWILIO_API_BASE_URL")  # override for testing against a local fake
+TWILIO_TIMEOUT_SECONDS = float(os.getenv("TWILIO_TIMEOUT_SECONDS", "10"))
+TWILIO_MAX_RETRIES = int(os.getenv("TWILIO_MAX_RETRIES", "2"))
+TWILIO_RETRY_BACKOFF_SECONDS = float(os.getenv("TWILIO_RETRY_BACKOFF_SECONDS", "0.5"))
 
-# Initialize clients
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
+state_store = create_state_store()
+# Call transcripts are kept as compact utterance buffers rather than lists of formatted strings
+state_store.use_list_type("contexts", Transcript)
+transfer_manager = TransferManager(state_store, AgentDirectory(AGENT_HEARTBEAT_TTL_SECONDS, state_store))
+
+def upstream(name: str, kind: str, url: str, build, timeout: float) -> Upstream:
+    return Upstream(
+        name, kind, url, build,
+        max_connections=UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive=UPSTREAM_MAX_KEEPALIVE,
+        keepalive_seconds=UPSTREAM_KEEPALIVE_SECONDS,
+        connect_timeout=UPSTREAM_CONNECT_TIMEOUT_SECONDS,
+        timeout=timeout,
+        prewarm=UPSTREAM_PREWARM_CONNECTIONS,
+    )
+
+def build_room_service(session):
+    from livekit import api
+    return api.room_service.RoomService(session, LIVEKIT_HTTP_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
+
+def build_groq(http_client):
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=LLM_SDK_MAX_RETRIES, http_client=http_client)
+
+def build_openai(http_client):
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=LLM_SDK_MAX_RETRIES, http_client=http_client
+    )
 
+# One pooled connection per upstream, opened and pre-warmed on startup and closed on shutdown.
+# SDK clients (and so the SDK imports) are built on startup or first use, never at import time.
+upstream_clients = ClientRegistry()
+if LIVEKIT_API_KEY and LIVEKIT_API_SECRET:
+    upstream_clients.register(upstream("livekit", "aiohttp", LIVEKIT_HTTP_URL, build_room_service, LIVEKIT_TIMEOUT_SECONDS))
 if GROQ_API_KEY:
-    try:
-        groq_client = Groq(api_key=GROQ_API_KEY)
-    except Exception as e:
-        logger.error(f"Failed to initialize Groq client: {e}")
-        groq_client = None
+    upstream_clients.register(upstream("groq", "httpx", GROQ_BASE_URL, build_groq, LLM_TIMEOUT_SECONDS))
+if OPENAI_API_KEY:
+    upstream_clients.register(upstream("openai", "httpx", OPENAI_BASE_URL, build_openai, LLM_TIMEOUT_SECONDS))
+
+# Twilio client is created on first use; its async HTTP session needs a running event loop
+twilio_client = None
+
+def get_twilio_client():
+    """Return the shared async Twilio client, which reuses one pooled aiohttp session"""
+    global twilio_client
+    if twilio_client is None and TWILIO_AVAILABLE and TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
+        from twilio.http.async_http_client import AsyncTwilioHttpClient
+        from twilio.rest import Client as TwilioClient
+        twilio_client = TwilioClient(
+            TWILIO_ACCOUNT_SID,
+            TWILIO_AUTH_TOKEN,
+            http_client=AsyncTwilioHttpClient(pool_connections=True)
+        )
+        if TWILIO_API_BASE_URL:
+            twilio_client.api.base_url = TWILIO_API_BASE_URL.rstrip("/")
+    return twilio_client
 
-if TWILIO_AVAILABLE and TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
-    twilio_client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+async def create_twilio_call(**params):
+    """Place an outbound Twilio call without blocking the event loop.
+    
+    Each attempt is bounded by TWILIO_TIMEOUT_SECONDS. Only failures where Twilio cannot
+    have placed the call (connection errors, 429, 503) are retried, so a retry never dials twice.
+    """
+    import aiohttp
+    from twilio.base.exceptions import TwilioRestException
+    client = get_twilio_client()
+    for attempt in range(TWILIO_MAX_RETRIES + 1):
+        try:
+            return await asyncio.wait_for(client.calls.create_async(**params), timeout=TWILIO_TIMEOUT_SECONDS)
+        except (aiohttp.ClientConnectorError, TwilioRestException) as e:
+            retryable = isinstance(e, aiohttp.ClientConnectorError) or e.status in (429, 503)
+            if not retryable or attempt == TWILIO_MAX_RETRIES:
+                raise
+            logger.warning(f"Twilio call attempt {attempt + 1} failed, retrying: {e}")
+            await asyncio.sleep(TWILIO_RETRY_BACKOFF_SECONDS * 2 ** attempt)
 
 class LiveKitService:
     def __init__(self):
-        if not LIVEKIT_API_KEY or not LIVEKIT_API_SECRET:
+        # (room, identity, admin_permissions) -> (jwt, exp), least recently used first
+        self.token_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.token_cache_hits = 0
+        self.token_cache_misses = 0
+        self._claim_templates: Dict[bool, dict] = {}
+        self.configured = "livekit" in upstream_clients
+        if not self.configured:
             logger.warning("LiveKit API credentials not configured")
-            self.room_service = None
-        else:
-            try:
-                self.api_key = LIVEKIT_API_KEY
-                self.api_secret = LIVEKIT_API_SECRET
-                self.url = LIVEKIT_HTTP_URL
-                self.room_service = api.room_service.RoomService(
-                    url=self.url,
-                    api_key=self.api_key,
-                    api_secret=self.api_secret
-                )
-            except Exception as e:
-                logger.error(f"Failed to initialize LiveKit config: {e}")
-                self.room_service = None
+    
+    @property
+    def room_service(self):
+        """RoomService on the shared LiveKit connection pool, or None if LiveKit is not configured"""
+        return upstream_clients.client("livekit")
+    
+    async def _create_room(self, room_name: str, empty_timeout: Optional[int] = None) -> dict:
+        """Create a LiveKit room, raising on failure"""
+        from livekit import api
+        room_request = api.CreateRoomRequest(name=room_name)
+        if empty_timeout:
+            room_request.empty_timeout = empty_timeout
+        room = await self.room_service.create_room(room_request)
+        return {"room_name": room.name, "sid": room.sid}
         
     async def create_room(self, room_name: str) -> dict:
         """Create a new LiveKit room"""
@@ -144,24 +431,20 @@ class LiveKitService:
                 logger.warning("LiveKit not configured, returning mock room")
                 return {"room_name": room_name, "sid": f"mock_sid_{uuid.uuid4().hex[:8]}"}
             
-            room_request = api.CreateRoomRequest(name=room_name)
-            room = await self.room_service.create_room(room_request)
-            return {"room_name": room.name, "sid": room.sid}
+            return await self._create_room(room_name)
                 
         except Exception as e:
             logger.error(f"Failed to create room: {e}")
             # Return mock room for development
             return {"room_name": room_name, "sid": f"mock_sid_{uuid.uuid4().hex[:8]}"}
     
-    def generate_token(self, room_name: str, participant_name: str, admin_permissions: bool = False) -> str:
-        """Generate access token for LiveKit room"""
-        if not LIVEKIT_API_KEY or not LIVEKIT_API_SECRET:
-            logger.warning("LiveKit credentials not configured, returning mock token")
-            return f"mock_token_{uuid.uuid4().hex[:16]}"
-            
+    def _build_token(self, room_name: str, participant_name: str, admin_permissions: bool):
+        """Unsigned livekit.api.AccessToken with the participant's grants (the SDK is imported lazily, so not annotated)"""
+        from livekit.api import AccessToken, VideoGrants
         token = AccessToken(LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
         token.with_identity(participant_name)
         token.with_name(participant_name)
+        token.with_ttl(timedelta(seconds=LIVEKIT_TOKEN_TTL_SECONDS))
         
         grants = VideoGrants(
             room_join=True,
@@ -177,7 +460,60 @@ class LiveKitService:
             grants.room_create = True
             
         token.with_grants(grants)
-        return token.to_jwt()
+        return token
+    
+    def _claims_template(self, admin_permissions: bool) -> dict:
+        """Claims exactly as the SDK lays them out for this grant set, decoded once from a real token"""
+        template = self._claim_templates.get(admin_permissions)
+        if template is None:
+            sample = self._build_token("template_room", "template_identity", admin_permissions).to_jwt()
+            template = jwt.decode(sample, options={"verify_signature": False})
+            self._claim_templates[admin_permissions] = template
+        return template
+    
+    def generate_tokens(self, requests: List[tuple]) -> List[str]:
+        """Mint access tokens for several (room_name, participant_name, admin_permissions) requests at once.
+        
+        Tokens are served from the cache while they have at least
+        LIVEKIT_TOKEN_MIN_REMAINING_SECONDS left; the rest are signed with one shared
+        issue time from a per-grant-set claims template instead of a fresh AccessToken each.
+        """
+        if not LIVEKIT_API_KEY or not LIVEKIT_API_SECRET:
+            logger.warning("LiveKit credentials not configured, returning mock token")
+            return [f"mock_token_{uuid.uuid4().hex[:16]}" for _ in requests]
+        
+        now = int(time.time())
+        tokens = []
+        for room_name, participant_name, admin_permissions in requests:
+            key = (room_name, participant_name, admin_permissions)
+            cached = self.token_cache.get(key)
+            if cached and cached[1] - now >= LIVEKIT_TOKEN_MIN_REMAINING_SECONDS:
+                self.token_cache.move_to_end(key)
+                self.token_cache_hits += 1
+                tokens.append(cached[0])
+                continue
+            
+            claims = dict(self._claims_template(admin_permissions))
+            claims["video"] = {**claims["video"], "room": room_name}
+            claims.update(
+                sub=participant_name,
+                name=participant_name,
+                nbf=now,
+                exp=now + LIVEKIT_TOKEN_TTL_SECONDS
+            )
+            token = jwt.encode(claims, LIVEKIT_API_SECRET, algorithm="HS256")
+            
+            self.token_cache[key] = (token, claims["exp"])
+            self.token_cache.move_to_end(key)
+            if len(self.token_cache) > LIVEKIT_TOKEN_CACHE_SIZE:
+                self.token_cache.popitem(last=False)
+            self.token_cache_misses += 1
+            tokens.append(token)
+        return tokens
+    
+    def generate_token(self, room_name: str, participant_name: str, admin_permissions: bool = False) -> str:
+        """Generate access token for LiveKit room"""
+        return self.generate_tokens([(room_name, participant_name, admin_permissions)])[0]
     
     async def list_participants(self, room_name: str) -> List[dict]:
         """List participants in a room"""
@@ -185,6 +521,7 @@ class LiveKitService:
             if not self.room_service:
                 return []
                 
+            from livekit import api
             participants = await self.room_service.list_participants(
                 api.ListParticipantsRequest(room=room_name)
             )
@@ -194,17 +531,32 @@ class LiveKitService:
             return []
 
     async def delete_room(self, room_name: str):
-        """Delete a LiveKit room"""
-        try:
-            if self.room_service:
-                await self.room_service.delete_room(api.DeleteRoomRequest(room=room_name))
-        except Exception as e:
-            logger.error(f"Failed to delete room: {e}")
+        """Delete a LiveKit room, raising on failure"""
+        if self.room_service:
+            from livekit import api
+            await self.room_service.delete_room(api.DeleteRoomRequest(room=room_name))
+    
+    async def delete_rooms(self, room_names: List[str]) -> Dict[str, Optional[str]]:
+        """Delete several rooms concurrently; maps each room to an error message, or None on success"""
+        results = await asyncio.gather(
+            *[self.delete_room(room_name) for room_name in room_names],
+            return_exceptions=True
+        )
+        errors = {}
+        for room_name, result in zip(room_names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to delete LiveKit room {room_name}: {result}")
+                # TwirpError keeps its text in .message rather than the exception args
+                errors[room_name] = getattr(result, "message", None) or str(result) or type(result).__name__
+            else:
+                errors[room_name] = None
+        return errors
 
     async def remove_participant(self, room_name: str, participant_id: str):
         """Remove a participant from a LiveKit room"""
         try:
             if self.room_service:
+                from livekit import api
                 await self.room_service.remove_participant(
                     api.RoomParticipantIdentity(room=room_name, identity=participant_id)
                 )
@@ -213,87 +565,748 @@ class LiveKitService:
 
 livekit_service = LiveKitService()
 
+class TransferRoomPool:
+    """Transfer rooms created ahead of time so initiate_transfer can skip the create-room round trip"""
+    def __init__(self, size: int, max_age: float):
+        self.size = size
+        self.max_age = max_age
+        self.rooms: deque = deque()  # (room_name, created_at monotonic)
+        self.refill_task: Optional[asyncio.Task] = None
+        # Deletions of rooms that expired in the pool
+        self.deletions: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and livekit_service.configured
+    
+    def acquire(self) -> Optional[str]:
+        """Take a ready room, or None if the pool is empty or disabled"""
+        if not self.enabled:
+            return None
+        room_name = None
+        expired = []
+        while self.rooms:
+            name, created_at = self.rooms.popleft()
+            if time.monotonic() - created_at < self.max_age:
+                room_name = name
+                break
+            expired.append(name)
+        if expired:
+            task = asyncio.create_task(livekit_service.delete_rooms(expired))
+            self.deletions.add(task)
+            task.add_done_callback(self.deletions.discard)
+        if room_name:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.schedule_refill()
+        return room_name
+    
+    def schedule_refill(self):
+        if self.enabled and self.refill_task is None:
+            self.refill_task = asyncio.create_task(self._refill())
+    
+    async def _create_pooled_room(self):
+        room_name = f"transfer_pool_{uuid.uuid4().hex[:12]}"
+        # Keep the idle room alive a little longer than we are willing to hand it out
+        await livekit_service._create_room(room_name, empty_timeout=int(self.max_age) + 60)
+        self.rooms.append((room_name, time.monotonic()))
+    
+    async def _refill(self):
+        try:
+            missing = self.size - len(self.rooms)
+            if missing > 0:
+                results = await asyncio.gather(
+                    *[self._create_pooled_room() for _ in range(missing)],
+                    return_exceptions=True
+                )
+                failures = [r for r in results if isinstance(r, Exception)]
+                if failures:
+                    logger.warning(f"Failed to pre-create {len(failures)} transfer rooms: {failures[0]}")
+        finally:
+            self.refill_task = None
+    
+    async def drain(self):
+        """Delete every unused pooled room and wait for deletions of expired ones"""
+        rooms = [name for name, _ in self.rooms]
+        self.rooms.clear()
+        if rooms:
+            await livekit_service.delete_rooms(rooms)
+        if self.deletions:
+            await asyncio.gather(*self.deletions, return_exceptions=True)
+
+transfer_room_pool = TransferRoomPool(TRANSFER_ROOM_POOL_SIZE, TRANSFER_ROOM_POOL_MAX_AGE_SECONDS)
+
+SUMMARY_SYSTEM_PROMPT = "You are an AI assistant that creates concise call summaries for warm transfers. Summarize the key points, customer needs, and context that would be helpful for the next agent."
+
 class LLMService:
     def __init__(self):
-        self.call_contexts: Dict[str, List[str]] = {}
-        # Initialize OpenAI client if available
-        if OPENAI_API_KEY:
-            self.openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        else:
-            self.openai_client = None
+        # Read-only view; lines are appended through the shared state store
+        self.call_contexts: Mapping[str, Sequence[tuple]] = state_store.lists("contexts")
+        # Running summary per session: {"summary": str, "total": lines added,
+        # "covered": lines folded in, "task": refresh task, "admitted": whether its request has a slot}
+        self.rolling_summaries: Dict[str, dict] = {}
+        # Last add_context time per session, used by the reaper for orphaned contexts
+        self.context_activity: Dict[str, datetime] = {}
+        self.trimmed_lines = 0
+        # Finished summaries keyed by (session_id, transcript hash) -> (summary, expires_at),
+        # and summaries being generated for a key so concurrent requests share one LLM call
+        self.summary_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.summaries_in_flight: Dict[tuple, asyncio.Task] = {}
+        self.summary_cache_hits = 0
+        self.summary_cache_misses = 0
+        self.summary_requests_coalesced = 0
+        # Requests wait here for a provider slot, transfers ahead of background refreshes, so a
+        # burst queues (or is shed to the extractive summary) instead of hitting the rate limits
+        self.scheduler = AdmissionScheduler(
+            LLM_MAX_CONCURRENCY, LLM_TRANSFER_RESERVED_SLOTS, LLM_QUEUE_MAX, LLM_BACKGROUND_QUEUE_MAX,
+            LLM_QUEUE_MAX_WAIT_SECONDS
+        )
+        # Configuration order (Groq first, for fast inference) decides until latencies are known
+        self.router = ProviderRouter(LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN_SECONDS)
+        for name, model, requests_per_minute in (
+            ("groq", "llama-3.1-8b-instant", GROQ_REQUESTS_PER_MINUTE),
+            ("openai", "gpt-3.5-turbo", OPENAI_REQUESTS_PER_MINUTE),
+        ):
+            if name in upstream_clients:
+                # The SDK client is built on startup (refresh_clients) or on first use (client)
+                self.router.add(LLMProvider(name, None, model, LLM_LATENCY_WINDOW))
+                self.scheduler.add(name, requests_per_minute, LLM_RATE_BURST)
     
-    def add_context(self, session_id: str, message: str):
-        """Add context to call session"""
-        if session_id not in self.call_contexts:
-            self.call_contexts[session_id] = []
-        self.call_contexts[session_id].append(message)
+    def refresh_clients(self):
+        """Point the providers at the current SDK clients, e.g. after the pools were reopened"""
+        for provider in self.router.providers:
+            provider.client = upstream_clients.client(provider.name)
     
-    async def generate_call_summary(self, session_id: str) -> str:
-        """Generate call summary using LLM"""
-        if session_id not in self.call_contexts:
-            return "No call context available"
+    def client(self, provider: LLMProvider):
+        """The provider's SDK client, built if the app has not started up yet"""
+        if provider.client is None:
+            provider.client = upstream_clients.client(provider.name)
+        return provider.client
+    
+    def add_context(self, session_id: str, speaker: str, message: str, timestamp: Optional[float] = None) -> str:
+        """Add an utterance to the call transcript and return it formatted"""
+        utterance = (time.time() if timestamp is None else timestamp, speaker, message)
+        self._ingest(session_id, [utterance])
+        return format_line(*utterance)
+    
+    def add_contexts(self, utterances: Dict[str, List[tuple]]):
+        """Add (timestamp, speaker, message) utterances for several sessions at once"""
+        for session_id, items in utterances.items():
+            self._ingest(session_id, items)
+    
+    def _ingest(self, session_id: str, items: List[tuple]):
+        # One store write and at most one summary refresh per session, however many items
+        self.trimmed_lines += state_store.extend(
+            "contexts", session_id, items, max_len=MAX_CONTEXT_MESSAGES
+        )
+        self.context_activity[session_id] = datetime.now()
+        if ROLLING_SUMMARY_ENABLED:
+            self._schedule_rolling_summary(session_id, len(items))
+    
+    def discard_session(self, session_id: str):
+        """Drop a session's context and stop any background summarization"""
+        state_store.delete("contexts", session_id)
+        self.context_activity.pop(session_id, None)
+        rolling = self.rolling_summaries.pop(session_id, None)
+        if rolling and rolling["task"]:
+            rolling["task"].cancel()
+        for key in [key for key in self.summary_cache if key[0] == session_id]:
+            del self.summary_cache[key]
+    
+    def _configured(self) -> bool:
+        return bool(self.router.providers)
+    
+    def draft_summary(self, session_id: str) -> str:
+        """Key sentences picked from the transcript locally, in milliseconds; "" if there are none"""
+        items = self.call_contexts.get(session_id)
+        key_points = extract_summary(items, EXTRACTIVE_SUMMARY_SENTENCES) if items else ""
+        return f"Key points from the call (extracted automatically):\n{key_points}" if key_points else ""
+    
+    async def _complete(self, provider: LLMProvider, prompt: str) -> str:
+        """Run one chat completion against a provider"""
+        response = await self.client(provider).chat.completions.create(
+            model=provider.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=200,
+            temperature=0.3
+        )
+        return response.choices[0].message.content
+    
+    @asynccontextmanager
+    async def _admit(self, provider: LLMProvider, priority: str):
+        """Hold a scheduler slot on the provider, recording the queue wait; raises Overloaded if shed"""
+        try:
+            async with self.scheduler.slot(provider.name, priority) as waited:
+                LLM_QUEUE_WAIT_SECONDS.labels(provider.name, priority).observe(waited)
+                yield
+        except Overloaded as e:
+            LLM_SHED.labels(provider.name, priority, e.reason).inc()
+            raise
+    
+    async def _attempt(self, provider: LLMProvider, prompt: str, priority: str = TRANSFER,
+                       on_admitted: Optional[Callable[[], None]] = None) -> str:
+        """One request to one provider once admitted; its latency and outcome feed the router"""
+        async with self._admit(provider, priority):
+            if on_admitted:
+                on_admitted()
+            self.router.started(provider)
+            start = time.perf_counter()
+            # The queue wait is bounded by LLM_QUEUE_MAX_WAIT_SECONDS, the request itself by the timeout
+            try:
+                summary = await asyncio.wait_for(self._complete(provider, prompt), timeout=LLM_TIMEOUT_SECONDS)
+            except asyncio.CancelledError:
+                self.router.record_abandoned(provider, time.perf_counter() - start)
+                raise
+            except asyncio.TimeoutError:
+                self.router.record_failure(provider)
+                LLM_REQUESTS.labels(provider.name, "timeout").inc()
+                raise
+            except Exception as e:
+                logger.warning(f"LLM request to {provider.name} failed: {e}")
+                self.router.record_failure(provider)
+                LLM_REQUESTS.labels(provider.name, "error").inc()
+                raise
+        self.router.record_success(provider, time.perf_counter() - start)
+        LLM_REQUESTS.labels(provider.name, "success").inc()
+        return summary
+    
+    async def _summarize(self, prompt: str, priority: str = TRANSFER,
+                         on_admitted: Optional[Callable[[], None]] = None) -> str:
+        """Send the prompt to the best-ranked provider, failing over to the next one on error.
+        
+        With LLM_HEDGE_AFTER_SECONDS set, a request still running (or queued) after that
+        long is raced against the next provider and the first answer wins. A request shed
+        by the scheduler fails over like any other error.
+        """
+        candidates = self.router.ranked()
+        if not candidates:
+            raise RuntimeError("LLM service not configured")
+        pending = set()
+        last_error: Optional[BaseException] = None
         
-        context = "\n".join(self.call_contexts[session_id])
+        def launch():
+            pending.add(asyncio.ensure_future(self._attempt(candidates.pop(0), prompt, priority, on_admitted)))
         
+        launch()
         try:
-            if GROQ_API_KEY:
-                # Use Groq for fast inference
-                response = groq_client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an AI assistant that creates concise call summaries for warm transfers. Summarize the key points, customer needs, and context that would be helpful for the next agent."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Please summarize this call context for a warm transfer:\n\n{context}"
-                        }
-                    ],
-                    max_tokens=200,
-                    temperature=0.3
-                )
-                return response.choices[0].message.content
-            
-            elif self.openai_client:
-                # Use updated OpenAI client
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
+            while pending:
+                hedge_after = LLM_HEDGE_AFTER_SECONDS if LLM_HEDGE_AFTER_SECONDS > 0 and candidates else None
+                done, _ = await asyncio.wait(pending, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    LLM_HEDGED_REQUESTS.inc()
+                    launch()
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if not pending and candidates:
+                    LLM_FALLBACKS.labels("provider_failover").inc()
+                    launch()
+            raise last_error
+        finally:
+            # Losers of a hedged race are cancelled once there is an answer
+            for task in pending:
+                task.cancel()
+    
+    async def _attempt_stream(self, provider: LLMProvider, prompt: str) -> AsyncIterator[str]:
+        """Stream one completion from one provider once admitted, yielding text as it arrives"""
+        async with self._admit(provider, TRANSFER):
+            self.router.started(provider)
+            start = time.perf_counter()
+            finished = failed = False
+            try:
+                # The request timeout bounds the wait for the response and for each chunk after it
+                stream = await self.client(provider).chat.completions.create(
+                    model=provider.model,
                     messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an AI assistant that creates concise call summaries for warm transfers. Summarize the key points, customer needs, and context that would be helpful for the next agent."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Please summarize this call context for a warm transfer:\n\n{context}"
-                        }
+                        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
                     ],
                     max_tokens=200,
-                    temperature=0.3
+                    temperature=0.3,
+                    stream=True,
+                    timeout=LLM_TIMEOUT_SECONDS
                 )
-                return response.choices[0].message.content
-            
-            else:
-                return "LLM service not configured. Please add API keys."
+                try:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await stream.response.aclose()
+                finished = True
+            except Exception as e:
+                failed = True
+                logger.warning(f"Streaming LLM request to {provider.name} failed: {e}")
+                self.router.record_failure(provider)
+                LLM_REQUESTS.labels(provider.name, "error").inc()
+                raise
+            finally:
+                if finished:
+                    self.router.record_success(provider, time.perf_counter() - start)
+                    LLM_REQUESTS.labels(provider.name, "success").inc()
+                elif not failed:
+                    # The consumer stopped reading before the stream finished
+                    self.router.record_abandoned(provider, time.perf_counter() - start)
+    
+    async def _summarize_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream from the best-ranked provider, failing over only if nothing has been produced yet"""
+        candidates = self.router.ranked()
+        if not candidates:
+            raise RuntimeError("LLM service not configured")
+        for index, provider in enumerate(candidates):
+            produced = False
+            try:
+                async for text in self._attempt_stream(provider, prompt):
+                    produced = True
+                    yield text
+                return
+            except Exception:
+                if produced or index == len(candidates) - 1:
+                    raise
+                LLM_FALLBACKS.labels("provider_failover").inc()
+    
+    def _schedule_rolling_summary(self, session_id: str, added: int = 1):
+        """Start a background refresh of the running summary once it falls more than SUMMARY_MAX_STALE_MESSAGES
+        lines behind, unless one is already in flight. Fewer would still be used at transfer time, so
+        refreshing for every line would only keep an LLM request running for the whole call."""
+        if not self._configured():
+            return
+        rolling = self.rolling_summaries.setdefault(
+            session_id, {"summary": "", "total": 0, "covered": 0, "task": None, "admitted": False}
+        )
+        rolling["total"] += added
+        if rolling["task"] is None and rolling["total"] - rolling["covered"] > SUMMARY_MAX_STALE_MESSAGES:
+            try:
+                rolling["task"] = asyncio.get_running_loop().create_task(self._refresh_rolling_summary(session_id))
+            except RuntimeError:
+                # No event loop (synchronous caller); the transfer path will summarize in full
+                pass
+    
+    async def _refresh_rolling_summary(self, session_id: str):
+        """Fold newly added lines into the running summary until it is within the staleness threshold, at background priority"""
+        rolling = self.rolling_summaries[session_id]
+        
+        def admitted():
+            rolling["admitted"] = True
+        
+        try:
+            while session_id in self.call_contexts:
+                # Count by lines added rather than list position; the transcript may have been trimmed
+                covered = rolling["total"]
+                pending = covered - rolling["covered"]
+                if pending <= SUMMARY_MAX_STALE_MESSAGES:
+                    break
+                new_lines = render_items(self.call_contexts[session_id][-pending:], SUMMARY_CONTEXT_MAX_TOKENS)
                 
+                if rolling["summary"]:
+                    prompt = (
+                        f"Here is the summary of a call so far:\n\n{rolling['summary']}\n\n"
+                        f"Update it for a warm transfer with these new lines from the call:\n\n{new_lines}"
+                    )
+                else:
+                    prompt = f"Please summarize this call context for a warm transfer:\n\n{new_lines}"
+                
+                rolling["admitted"] = False
+                summary = await self._summarize(prompt, BACKGROUND, admitted)
+                if covered > rolling["covered"]:
+                    rolling["summary"] = summary
+                    rolling["covered"] = covered
+        except asyncio.CancelledError:
+            raise
+        except Overloaded as e:
+            # Retried when the next context line arrives; a transfer meanwhile summarizes in full
+            logger.info(f"Rolling summary refresh for session {session_id} shed: {e}")
+        except Exception as e:
+            # Leave the previous summary in place; generate_call_summary falls back to a full pass
+            logger.warning(f"Rolling summary refresh failed for session {session_id}: {e}")
+        finally:
+            rolling["task"] = None
+    
+    async def _ready_rolling_summary(self, session_id: str) -> Optional[str]:
+        """Return the running summary if it is within the staleness threshold, waiting on an in-flight refresh"""
+        rolling = self.rolling_summaries.get(session_id)
+        if not rolling:
+            return None
+        
+        if rolling["task"] and rolling["total"] - rolling["covered"] > SUMMARY_MAX_STALE_MESSAGES:
+            if rolling["admitted"]:
+                # A refresh is already folding in the missing lines; waiting is cheaper than starting over
+                try:
+                    await asyncio.wait_for(asyncio.shield(rolling["task"]), timeout=LLM_TIMEOUT_SECONDS)
+                except Exception:
+                    pass
+            else:
+                # The refresh is still queued at background priority; summarize in full as a transfer instead
+                rolling["task"].cancel()
+        
+        stale = rolling["total"] - rolling["covered"]
+        if rolling["summary"] and stale <= SUMMARY_MAX_STALE_MESSAGES:
+            return rolling["summary"]
+        return None
+    
+    async def generate_call_summary(self, session_id: str) -> str:
+        """Return a cached summary of this exact transcript, joining any in-flight request for it"""
+        if session_id not in self.call_contexts:
+            return "No call context available"
+        
+        if not self._configured():
+            LLM_FALLBACKS.labels("not_configured").inc()
+            return self.draft_summary(session_id) or "LLM service not configured. Please add API keys."
+        
+        context, key = self._summary_key(session_id)
+        cached = self._cached_summary(key)
+        if cached:
+            return cached
+        
+        task = self.summaries_in_flight.get(key)
+        if task:
+            self.summary_requests_coalesced += 1
+            SUMMARY_CACHE.labels("coalesced").inc()
+        else:
+            self.summary_cache_misses += 1
+            SUMMARY_CACHE.labels("miss").inc()
+            task = asyncio.get_running_loop().create_task(self._generate_summary(session_id, context))
+            self.summaries_in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish_summary(key, done))
+        # Shielded so one caller giving up does not cancel the summary for the others
+        summary, _ = await asyncio.shield(task)
+        return summary
+    
+    def _summary_key(self, session_id: str) -> tuple:
+        """Return (transcript, cache key) for a session's current context"""
+        context = render_items(self.call_contexts[session_id], SUMMARY_CONTEXT_MAX_TOKENS)
+        return context, (session_id, hashlib.sha256(context.encode()).hexdigest())
+    
+    def _cached_summary(self, key: tuple) -> Optional[str]:
+        cached = self.summary_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            self.summary_cache.move_to_end(key)
+            self.summary_cache_hits += 1
+            SUMMARY_CACHE.labels("hit").inc()
+            return cached[0]
+        return None
+    
+    def _store_summary(self, key: tuple, summary: str):
+        # Sessions discarded while the summary was in flight are not cached
+        if key[0] not in self.call_contexts:
+            return
+        self.summary_cache[key] = (summary, time.monotonic() + SUMMARY_CACHE_TTL_SECONDS)
+        self.summary_cache.move_to_end(key)
+        if len(self.summary_cache) > SUMMARY_CACHE_SIZE:
+            self.summary_cache.popitem(last=False)
+    
+    def _finish_summary(self, key: tuple, task: asyncio.Task):
+        self.summaries_in_flight.pop(key, None)
+        if task.cancelled() or task.exception():
+            return
+        summary, cacheable = task.result()
+        if cacheable:
+            self._store_summary(key, summary)
+    
+    async def stream_call_summary(self, session_id: str) -> AsyncIterator[str]:
+        """Yield the call summary in pieces as the provider produces it.
+        
+        A cached, in-flight or fresh rolling summary is yielded whole; otherwise the
+        full context is summarized with a streaming completion.
+        """
+        if session_id not in self.call_contexts:
+            yield "No call context available"
+            return
+        
+        if not self._configured():
+            LLM_FALLBACKS.labels("not_configured").inc()
+            yield self.draft_summary(session_id) or "LLM service not configured. Please add API keys."
+            return
+        
+        context, key = self._summary_key(session_id)
+        summary = self._cached_summary(key)
+        if not summary and key in self.summaries_in_flight:
+            self.summary_requests_coalesced += 1
+            SUMMARY_CACHE.labels("coalesced").inc()
+            summary, _ = await asyncio.shield(self.summaries_in_flight[key])
+        if not summary:
+            summary = await self._ready_rolling_summary(session_id)
+            if summary:
+                self._store_summary(key, summary)
+        if summary:
+            yield summary
+            return
+        
+        self.summary_cache_misses += 1
+        SUMMARY_CACHE.labels("miss").inc()
+        if ROLLING_SUMMARY_ENABLED:
+            LLM_FALLBACKS.labels("full_resummarize").inc()
+        rolling = self.rolling_summaries.get(session_id)
+        covered = rolling["total"] if rolling else 0
+        
+        parts: List[str] = []
+        try:
+            async for text in self._summarize_stream(
+                f"Please summarize this call context for a warm transfer:\n\n{context}"
+            ):
+                parts.append(text)
+                yield text
+        except Overloaded as e:
+            logger.warning(f"LLM providers busy, using the extractive summary: {e}")
+            LLM_FALLBACKS.labels("shed").inc()
+            # Requests are shed before they start streaming, so nothing has been yielded yet
+            yield self.draft_summary(session_id) or f"Failed to generate summary: {e}"
+            return
+        except Exception as e:
+            logger.error(f"Failed to stream summary: {e}")
+            LLM_FALLBACKS.labels("error_message").inc()
+            if not parts:
+                yield self.draft_summary(session_id) or f"Failed to generate summary: {str(e)}"
+            return
+        
+        summary = "".join(parts)
+        self._store_summary(key, summary)
+        if rolling and covered > rolling["covered"]:
+            rolling["summary"] = summary
+            rolling["covered"] = covered
+    
+    async def _generate_summary(self, session_id: str, context: str) -> tuple:
+        """Use the rolling summary if it is fresh enough, otherwise summarize the full context.
+        
+        Returns (summary, cacheable). If the LLM fails, the extractive draft (or an error
+        message) is returned to the caller but not cached, so the next request retries the LLM.
+        """
+        summary = await self._ready_rolling_summary(session_id)
+        if summary:
+            return summary, True
+        if ROLLING_SUMMARY_ENABLED:
+            LLM_FALLBACKS.labels("full_resummarize").inc()
+        
+        rolling = self.rolling_summaries.get(session_id)
+        covered = rolling["total"] if rolling else 0
+        
+        try:
+            summary = await self._summarize(f"Please summarize this call context for a warm transfer:\n\n{context}")
+        except asyncio.TimeoutError:
+            logger.error(f"Summary generation timed out after {LLM_TIMEOUT_SECONDS}s")
+            LLM_FALLBACKS.labels("error_message").inc()
+            return self.draft_summary(session_id) or "Failed to generate summary: LLM request timed out", False
+        except Overloaded as e:
+            logger.warning(f"LLM providers busy, using the extractive summary: {e}")
+            LLM_FALLBACKS.labels("shed").inc()
+            return self.draft_summary(session_id) or f"Failed to generate summary: {e}", False
         except Exception as e:
             logger.error(f"Failed to generate summary: {e}")
-            return f"Failed to generate summary: {str(e)}"
+            LLM_FALLBACKS.labels("error_message").inc()
+            return self.draft_summary(session_id) or f"Failed to generate summary: {str(e)}", False
+        
+        # Seed the running summary so later transfers only fold in what follows
+        if rolling and covered > rolling["covered"]:
+            rolling["summary"] = summary
+            rolling["covered"] = covered
+        return summary, True
 
 llm_service = LLMService()
 
+class NotificationHub:
+    """Tracks open agent WebSockets and long-polls so notifications reach them as soon as they are created"""
+    def __init__(self):
+        self.connections: Dict[str, List[WebSocket]] = {}
+        # Highest sequence number sent on each socket
+        self.cursors: Dict[WebSocket, int] = {}
+        self.signals: Dict[str, asyncio.Event] = {}
+        # Closes of sockets dropped for being too slow
+        self.closing: Set[asyncio.Task] = set()
+    
+    async def connect(self, agent_id: str, websocket: WebSocket, since: int = 0):
+        await websocket.accept()
+        self.connections.setdefault(agent_id, []).append(websocket)
+        self.cursors[websocket] = since
+    
+    def disconnect(self, agent_id: str, websocket: WebSocket):
+        sockets = self.connections.get(agent_id, [])
+        if websocket in sockets:
+            sockets.remove(websocket)
+        if not sockets:
+            self.connections.pop(agent_id, None)
+        self.cursors.pop(websocket, None)
+    
+    async def send(self, agent_id: str, websocket: WebSocket, notification: dict) -> bool:
+        """Send on one socket. A socket that fails, or does not take the notification within
+        NOTIFICATION_SEND_TIMEOUT_SECONDS, is dropped; the notification stays queued until acked."""
+        try:
+            await asyncio.wait_for(websocket.send_json(notification), timeout=NOTIFICATION_SEND_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Dropping notification socket for agent {agent_id}: {e!r}")
+            if websocket in self.cursors:
+                self.disconnect(agent_id, websocket)
+                # The client reconnects or falls back to polling from its last acknowledged seq
+                task = asyncio.create_task(self._close(websocket))
+                self.closing.add(task)
+                task.add_done_callback(self.closing.discard)
+            return False
+        if "seq" in notification and websocket in self.cursors:
+            self.cursors[websocket] = max(self.cursors[websocket], notification["seq"])
+        return True
+    
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), timeout=NOTIFICATION_SEND_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+    
+    async def publish(self, agent_id: str, notification: dict) -> bool:
+        """Send a notification to every socket the agent has open, concurrently. Returns True if any accepted it."""
+        sends = [
+            self.send(agent_id, websocket, notification)
+            for websocket in list(self.connections.get(agent_id, []))
+            # Queued notifications already sent by the socket's flusher are skipped
+            if not ("seq" in notification and self.cursors.get(websocket, 0) >= notification["seq"])
+        ]
+        return any(await asyncio.gather(*sends))
+    
+    def wake(self, agent_id: str):
+        """Release long-polls waiting on the agent's queue"""
+        signal = self.signals.pop(agent_id, None)
+        if signal:
+            signal.set()
+    
+    async def wait(self, agent_id: str, timeout: float):
+        """Wait up to timeout seconds for the next wake() for this agent"""
+        signal = self.signals.setdefault(agent_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(signal.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+notification_hub = NotificationHub()
+
+async def deliver_notification(agent_id: str, notification: dict):
+    """Queue a notification until the agent acknowledges it and push it to any open socket or long-poll"""
+    queued = transfer_manager.queue_notification(agent_id, notification)
+    notification_hub.wake(agent_id)
+    await notification_hub.publish(agent_id, queued)
+
+class SessionReaper:
+    """Periodically evicts ended and abandoned sessions, orphaned contexts, stale notifications and silent agents"""
+    def __init__(self):
+        self.evicted: Dict[str, int] = {"calls": 0, "contexts": 0, "notifications": 0, "agents": 0}
+        self.last_sweep: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    def sweep(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Run one eviction pass and return what it removed"""
+        now = now or datetime.now()
+        ended_cutoff = now - timedelta(seconds=ENDED_CALL_TTL_SECONDS)
+        abandoned_cutoff = now - timedelta(seconds=ABANDONED_CALL_TTL_SECONDS)
+        evicted = {"calls": 0, "contexts": 0, "notifications": 0, "agents": 0}
+        
+        for session_id in list(transfer_manager.active_calls):
+            call = transfer_manager.active_calls.get(session_id)
+            if call is None:
+                continue
+            last_context = llm_service.context_activity.get(session_id)
+            last_activity = max(call.get("updated_at") or call["created_at"], last_context or call["created_at"])
+            ended = call["status"] == "ended" and call.get("ended_at", now) < ended_cutoff
+            if ended or last_activity < abandoned_cutoff:
+                transfer_manager.remove_call(session_id)
+                if session_id in llm_service.call_contexts:
+                    evicted["contexts"] += 1
+                llm_service.discard_session(session_id)
+                evicted["calls"] += 1
+        
+        # Contexts added under ids that never had a call session (or whose session is gone). Activity is
+        # only tracked for contexts this worker wrote, so ones restored on startup or written by another
+        # worker start their TTL when a sweep first sees them
+        stored_contexts = set(llm_service.call_contexts)
+        for session_id in stored_contexts:
+            if session_id in transfer_manager.active_calls:
+                continue
+            last_context = llm_service.context_activity.setdefault(session_id, now)
+            if last_context < abandoned_cutoff:
+                llm_service.discard_session(session_id)
+                evicted["contexts"] += 1
+        # Contexts another worker evicted
+        for session_id in list(llm_service.context_activity):
+            if session_id not in stored_contexts:
+                llm_service.context_activity.pop(session_id)
+        
+        notification_cutoff = now - timedelta(seconds=NOTIFICATION_TTL_SECONDS)
+        for agent_id in list(transfer_manager.notifications):
+            evicted["notifications"] += transfer_manager.prune_notifications(
+                agent_id, notification_cutoff, NOTIFICATION_QUEUE_MAX
+            )
+        
+        # Routing already skips agents with stale heartbeats; this frees their memory
+        evicted["agents"] = len(transfer_manager.agents.expire())
+        
+        for kind, count in evicted.items():
+            self.evicted[kind] += count
+        self.last_sweep = now
+        if any(evicted.values()):
+            logger.info(f"Reaper evicted {evicted}")
+        return evicted
+    
+    async def run(self):
+        while True:
+            await asyncio.sleep(REAPER_INTERVAL_SECONDS)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Reaper sweep failed: {e}")
+    
+    def stats(self) -> dict:
+        return {
+            "evicted": dict(self.evicted),
+            "trimmed_context_lines": llm_service.trimmed_lines,
+            "store_size": {
+                "calls": len(transfer_manager.active_calls),
+                "contexts": len(llm_service.call_contexts),
+                "notification_queues": len(transfer_manager.notifications),
+                "rolling_summaries": len(llm_service.rolling_summaries),
+            },
+            "last_sweep": self.last_sweep.isoformat() if self.last_sweep else None,
+        }
+
+session_reaper = SessionReaper()
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Connections first, so the room pool's first refill already has them
+    await upstream_clients.start()
+    llm_service.refresh_clients()
+    # Loads the Twilio SDK now, if it is configured, rather than on the first phone transfer
+    get_twilio_client()
+    session_reaper.task = asyncio.create_task(session_reaper.run())
+    transfer_room_pool.schedule_refill()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    global twilio_client
+    if session_reaper.task:
+        session_reaper.task.cancel()
+    await transfer_room_pool.drain()
+    await upstream_clients.close()
+    if twilio_client:
+        await twilio_client.http_client.close()
+        twilio_client = None
+    # Get the last journaled writes on disk before the process exits
+    state_store.flush()
+
 # API Routes
-@app.get("/")
+@app.get("/", response_model=MessageResponse)
 async def root():
     return {"message": "Warm Transfer API is running"}
 
-@app.post("/api/create-call")
-async def create_call(request: dict):
+@app.post("/api/create-call", response_model=CreateCallResponse)
+async def create_call(request: CreateCallRequest):
     """Create a new call session or join existing room"""
     try:
-        caller_id = request.get("caller_id", f"caller_{uuid.uuid4().hex[:8]}")
-        room_name = request.get("room_name")
+        caller_id = request.caller_id or f"caller_{uuid.uuid4().hex[:8]}"
+        room_name = request.room_name
         
         if not room_name:
             # Create new room if no room_name provided
@@ -308,9 +1321,11 @@ async def create_call(request: dict):
         session_id = transfer_manager.create_call_session(caller_id, room_name)
         
         # Generate tokens
-        caller_token = livekit_service.generate_token(room_name, caller_id)
         agent_a_id = f"agent_a_{uuid.uuid4().hex[:8]}"
-        agent_token = livekit_service.generate_token(room_name, agent_a_id)
+        caller_token, agent_token = livekit_service.generate_tokens([
+            (room_name, caller_id, False),
+            (room_name, agent_a_id, False)
+        ])
         
         # Assign agent A
         transfer_manager.assign_agent_a(session_id, agent_a_id)
@@ -328,79 +1343,271 @@ async def create_call(request: dict):
         logger.error(f"Failed to create call: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/initiate-transfer")
-async def initiate_transfer(request: dict):
-    """Initiate warm transfer to Agent B"""
+def resolve_agent_b(session_id: str, request: TransferRequest) -> str:
+    """Agent B for a transfer: the requested agent_b_id, else the best registered agent for the optional skill"""
+    skill = request.skill
+    agent_b_id = transfer_manager.route_transfer(session_id, request.agent_b_id, skill)
+    if not agent_b_id:
+        raise HTTPException(status_code=503, detail=f"No available agent{f' with skill {skill}' if skill else ''}")
+    return agent_b_id
+
+async def start_transfer(session_id: str, request: TransferRequest) -> Tuple[dict, bool]:
+    """Pick Agent B and move the call to transferring.
+    
+    Returns the updated call and whether its transfer room came from the pool
+    (and so already exists). The room of a transfer this one replaces is deleted.
+    """
+    agent_b_id = resolve_agent_b(session_id, request)
+    # Use a pre-created transfer room when one is available
+    pooled_room = transfer_room_pool.acquire()
     try:
-        session_id = request.get("session_id")
-        agent_b_id = request.get("agent_b_id", f"agent_b_{uuid.uuid4().hex[:8]}")
-        
-        if not session_id or session_id not in transfer_manager.active_calls:
+        previous, call = transfer_manager.initiate_transfer(session_id, agent_b_id, pooled_room)
+    except (KeyError, CallStateConflict) as e:
+        if pooled_room:
+            await livekit_service.delete_rooms([pooled_room])
+        if isinstance(e, KeyError):
+            raise HTTPException(status_code=404, detail="Call session not found")
+        raise HTTPException(status_code=409, detail=str(e))
+    if previous.get("transfer_room"):
+        # Agent A re-targeted the transfer; nobody will join the earlier room
+        await livekit_service.delete_rooms([previous["transfer_room"]])
+    return call, bool(pooled_room)
+
+async def confirm_transfer(session_id: str, call: dict, **fields):
+    """Mark the transfer started as `call` ready, writing fields with it.
+    
+    If end-call or another transfer overtook it while the request was awaiting
+    LiveKit or the LLM, its transfer room is deleted and 409 raised instead.
+    """
+    try:
+        transfer_manager.update_call(session_id, expect_version=call["version"], transfer_ready=True, **fields)
+    except CallStateConflict as e:
+        await livekit_service.delete_rooms([call["transfer_room"]])
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/api/initiate-transfer", response_model=TransferResponse)
+async def initiate_transfer(request: TransferRequest):
+    """Initiate warm transfer to Agent B.
+    
+    Without agent_b_id, the least-loaded available registered agent (with
+    `skill`, if given) is picked; 503 if there is none.
+    """
+    start = time.perf_counter()
+    session_id = request.session_id
+    try:
+        if session_id not in transfer_manager.active_calls:
             raise HTTPException(status_code=404, detail="Call session not found")
         
-        # Generate call summary
-        summary = await llm_service.generate_call_summary(session_id)
-        transfer_manager.active_calls[session_id]["call_summary"] = summary
-        
-        # Create transfer room
-        transfer_room = transfer_manager.initiate_transfer(session_id, agent_b_id)
+        call, pooled = await start_transfer(session_id, request)
+        transfer_room, agent_b_id = call["transfer_room"], call["agent_b"]
         
-        # Create transfer room in LiveKit
-        await livekit_service.create_room(transfer_room)
+        # Generate the call summary while the transfer room is created in LiveKit
+        pending = [timed("initiate_transfer", "summary", llm_service.generate_call_summary(session_id))]
+        if not pooled:
+            pending.append(timed("initiate_transfer", "create_room", livekit_service.create_room(transfer_room)))
+        summary, *_ = await asyncio.gather(*pending)
+        await confirm_transfer(session_id, call, call_summary=summary)
         
         # Generate tokens for transfer room
-        agent_a_transfer_token = livekit_service.generate_token(
-            transfer_room, 
-            transfer_manager.active_calls[session_id]["agent_a"]
-        )
-        agent_b_transfer_token = livekit_service.generate_token(transfer_room, agent_b_id)
+        with time_stage("initiate_transfer", "token_minting"):
+            agent_a_transfer_token, agent_b_transfer_token = livekit_service.generate_tokens([
+                (transfer_room, call["agent_a"], False),
+                (transfer_room, agent_b_id, False)
+            ])
         
         # Notify Agent B about the transfer
-        await notify_agent_b({
-            "session_id": session_id,
-            "agent_b_id": agent_b_id,
-            "transfer_room": transfer_room,
-            "agent_b_token": agent_b_transfer_token
-        })
+        await timed("initiate_transfer", "notify_agent_b", notify_agent_b(NotifyAgentBRequest(
+            session_id=session_id,
+            agent_b_id=agent_b_id,
+            transfer_room=transfer_room,
+            agent_b_token=agent_b_transfer_token
+        )))
         
         return {
             "transfer_room": transfer_room,
+            "agent_b_id": agent_b_id,
             "agent_a_transfer_token": agent_a_transfer_token,
             "agent_b_transfer_token": agent_b_transfer_token,
             "call_summary": summary,
             "ws_url": LIVEKIT_WS_URL
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to initiate transfer: {e}")
+        transfer_manager.agents.release(session_id)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        ENDPOINT_SECONDS.labels("initiate_transfer").observe(time.perf_counter() - start)
+
+# Streaming summaries by session; held here so they finish even if Agent A's response is dropped
+summary_streams: Dict[str, asyncio.Task] = {}
 
-@app.post("/api/complete-transfer")
-async def complete_transfer(request: dict):
+@app.post("/api/initiate-transfer/stream", response_class=StreamingResponse)
+async def initiate_transfer_stream(request: TransferRequest):
+    """Initiate warm transfer to Agent B, streaming the call summary as it is generated.
+    
+    The response is newline-delimited JSON: a "transfer" event with the room,
+    tokens and an extractive "summary_draft" to show until the LLM catches up,
+    "summary_delta" events carrying summary text as it arrives, then a
+    "summary_done" event with the full summary. Agent B is notified (with the
+    same draft) and receives the same deltas over its WebSocket; text produced
+    before that notification is queued is held back and sent in one delta after it.
+    """
+    start = time.perf_counter()
+    session_id = request.session_id
+    
+    if session_id not in transfer_manager.active_calls:
+        raise HTTPException(status_code=404, detail="Call session not found")
+    
+    call, pooled = await start_transfer(session_id, request)
+    transfer_room, agent_b_id = call["transfer_room"], call["agent_b"]
+    summary_task: Optional[asyncio.Task] = None
+    try:
+        with time_stage("initiate_transfer_stream", "summary_draft"):
+            summary_draft = llm_service.draft_summary(session_id)
+        
+        # Summarize in the background so Agent B still gets the summary if Agent A disconnects
+        events: asyncio.Queue = asyncio.Queue()
+        # Set once the transfer_request notification is queued; Agent B ignores summary
+        # updates for a transfer it has not been told about, so none may overtake it
+        agent_b_notified = asyncio.Event()
+        
+        async def summarize():
+            parts: List[str] = []
+            published = 0  # parts already sent to Agent B
+            
+            async def publish_to_agent_b():
+                nonlocal published
+                if agent_b_notified.is_set() and published < len(parts):
+                    text = "".join(parts[published:])
+                    published = len(parts)
+                    await notification_hub.publish(agent_b_id, {
+                        "type": "summary_delta",
+                        "session_id": session_id,
+                        "text": text
+                    })
+            
+            try:
+                async for text in llm_service.stream_call_summary(session_id):
+                    if not parts:
+                        STAGE_SECONDS.labels("initiate_transfer_stream", "first_summary_text").observe(
+                            time.perf_counter() - start
+                        )
+                    parts.append(text)
+                    events.put_nowait({"event": "summary_delta", "text": text})
+                    await publish_to_agent_b()
+                await agent_b_notified.wait()
+                await publish_to_agent_b()
+            finally:
+                summary = "".join(parts)
+                try:
+                    transfer_manager.update_call(session_id, expect_version=call["version"], call_summary=summary)
+                    current = True
+                except CallStateConflict:
+                    # The call was ended or re-targeted meanwhile; this transfer no longer exists
+                    current = False
+                events.put_nowait({"event": "summary_done", "call_summary": summary})
+                events.put_nowait(None)
+                if current and agent_b_notified.is_set():
+                    await deliver_notification(agent_b_id, {
+                        "type": "summary_complete",
+                        "session_id": session_id,
+                        "call_summary": summary,
+                        "timestamp": datetime.now().isoformat()
+                    })
+                STAGE_SECONDS.labels("initiate_transfer_stream", "summary").observe(time.perf_counter() - start)
+        
+        summary_task = summary_streams[session_id] = asyncio.create_task(summarize())
+        
+        def forget(task: asyncio.Task):
+            # A re-targeted transfer may already have replaced this entry
+            if summary_streams.get(session_id) is task:
+                del summary_streams[session_id]
+        
+        summary_task.add_done_callback(forget)
+        
+        if not pooled:
+            await timed("initiate_transfer_stream", "create_room", livekit_service.create_room(transfer_room))
+        await confirm_transfer(session_id, call)
+        
+        with time_stage("initiate_transfer_stream", "token_minting"):
+            agent_a_transfer_token, agent_b_transfer_token = livekit_service.generate_tokens([
+                (transfer_room, call["agent_a"], False),
+                (transfer_room, agent_b_id, False)
+            ])
+        
+        # Agent B can join right away; the summary follows as summary_delta / summary_complete
+        await timed("initiate_transfer_stream", "notify_agent_b", notify_agent_b(NotifyAgentBRequest(
+            session_id=session_id,
+            agent_b_id=agent_b_id,
+            transfer_room=transfer_room,
+            agent_b_token=agent_b_transfer_token,
+            summary_streaming=True,
+            summary_draft=summary_draft
+        )))
+        agent_b_notified.set()
+    except HTTPException:
+        # Agent B was never told about this transfer, so no summary may reach them
+        if summary_task:
+            summary_task.cancel()
+        raise
+    except Exception as e:
+        logger.error(f"Failed to initiate transfer: {e}")
+        if summary_task:
+            summary_task.cancel()
+        transfer_manager.agents.release(session_id)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    transfer_event = {
+        "event": "transfer",
+        "transfer_room": transfer_room,
+        "agent_b_id": agent_b_id,
+        "agent_a_transfer_token": agent_a_transfer_token,
+        "agent_b_transfer_token": agent_b_transfer_token,
+        "ws_url": LIVEKIT_WS_URL,
+        "summary_draft": summary_draft
+    }
+    
+    async def stream():
+        try:
+            yield orjson.dumps(transfer_event) + b"\n"
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield orjson.dumps(event) + b"\n"
+        finally:
+            ENDPOINT_SECONDS.labels("initiate_transfer_stream").observe(time.perf_counter() - start)
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/api/complete-transfer", response_model=CompleteTransferResponse)
+async def complete_transfer(request: SessionRequest):
     """Complete the warm transfer"""
+    start = time.perf_counter()
     try:
-        session_id = request.get("session_id")
+        session_id = request.session_id
         
-        if not session_id or session_id not in transfer_manager.active_calls:
+        if session_id not in transfer_manager.active_calls:
             raise HTTPException(status_code=404, detail="Call session not found")
         
-        call_session = transfer_manager.active_calls[session_id]
-        
-        # Check if call is still active
-        if call_session.get("status") == "ended":
-            raise HTTPException(status_code=400, detail="Cannot complete transfer - call has ended")
+        # Only a transfer that is set up and not ended (or already completed) can complete
+        try:
+            call_session = transfer_manager.complete_transfer(session_id)
+        except CallStateConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
         
         original_room = call_session["room_name"]
         agent_b_id = call_session["agent_b"]
         
-        agent_b_original_token = livekit_service.generate_token(
-            original_room, 
-            agent_b_id, 
-            admin_permissions=False  # Use regular permissions, not admin
-        )
-        
-        # Update session status
-        transfer_manager.active_calls[session_id]["status"] = "transferred"
+        with time_stage("complete_transfer", "token_minting"):
+            agent_b_original_token = livekit_service.generate_token(
+                original_room, 
+                agent_b_id, 
+                admin_permissions=False  # Use regular permissions, not admin
+            )
         
         completion_notification = {
             "type": "transfer_completed",
@@ -412,11 +1619,8 @@ async def complete_transfer(request: dict):
             "message": f"Transfer completed! Join customer room: {original_room}"
         }
         
-        # Store completion notification for Agent B to poll
-        if agent_b_id not in transfer_manager.notifications:
-            transfer_manager.notifications[agent_b_id] = []
-        
-        transfer_manager.notifications[agent_b_id].append(completion_notification)
+        # Queue for Agent B until they ack it, and push it to any socket or long-poll they have open
+        await timed("complete_transfer", "notify_agent_b", deliver_notification(agent_b_id, completion_notification))
         
         # Log for debugging
         logger.info(f"Added completion notification for agent {agent_b_id}: {completion_notification}")
@@ -429,23 +1633,23 @@ async def complete_transfer(request: dict):
             "notification_sent": True
         }
         
+    except HTTPException:
+        raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Call session not found")
     except Exception as e:
         logger.error(f"Failed to complete transfer: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        ENDPOINT_SECONDS.labels("complete_transfer").observe(time.perf_counter() - start)
 
-@app.post("/api/add-context")
-async def add_context(request: dict):
+@app.post("/api/add-context", response_model=AddContextResponse)
+async def add_context(request: AddContextRequest):
     """Add context to call session"""
     try:
-        session_id = request.get("session_id")
-        message = request.get("message")
-        speaker = request.get("speaker", "Unknown")  # Added speaker identification
-        
-        if not session_id or not message:
-            raise HTTPException(status_code=400, detail="Missing session_id or message")
-        
-        formatted_message = f"[{datetime.now().strftime('%H:%M:%S')}] {speaker}: {message}"
-        llm_service.add_context(session_id, formatted_message)
+        formatted_message = llm_service.add_context(
+            request.session_id, request.speaker, request.message, request.timestamp
+        )
         
         return {"message": "Context added successfully", "formatted_message": formatted_message}
         
@@ -453,66 +1657,153 @@ async def add_context(request: dict):
         logger.error(f"Failed to add context: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/call-status/{session_id}")
+def utterance(item: ContextItem) -> tuple:
+    """(timestamp, speaker, message) for a validated context item"""
+    timestamp = time.time() if item.timestamp is None else item.timestamp
+    return (timestamp, item.speaker or "Unknown", item.message)
+
+context_items = TypeAdapter(List[ContextItem])
+
+# Transcription feeds send this constantly: the raw body goes to pydantic's JSON parser in one pass
+# instead of json.loads and then model validation, which would nearly double the per-item cost
+@app.post("/api/add-context/batch", response_model=AddContextBatchResponse, openapi_extra={"requestBody": {
+    "required": True, "content": {"application/json": {"schema": AddContextBatchRequest.model_json_schema()}}
+}})
+async def add_context_batch(http_request: Request):
+    """Add many context items, possibly for several calls, in one request.
+    
+    Body: {"items": [{"session_id", "message", "speaker", "timestamp" (epoch seconds, optional)}, ...]}
+    """
+    try:
+        payload = orjson.loads(await http_request.body())
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"invalid JSON at position {e.pos}")
+    # Counted before validation, so an oversized batch is refused without building its items
+    raw_items = payload.get("items") if isinstance(payload, dict) else None
+    if isinstance(raw_items, list) and len(raw_items) > CONTEXT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {CONTEXT_BATCH_MAX_ITEMS} items per batch")
+    try:
+        items = AddContextBatchRequest.model_validate(payload).items
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=describe_errors(e.errors()))
+    
+    by_session: Dict[str, List[tuple]] = {}
+    for index, item in enumerate(items):
+        if not item.session_id:
+            raise HTTPException(status_code=400, detail=f"Item {index}: Missing session_id")
+        by_session.setdefault(item.session_id, []).append(utterance(item))
+    
+    try:
+        llm_service.add_contexts(by_session)
+    except Exception as e:
+        logger.error(f"Failed to add context batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {"accepted": len(items), "sessions": len(by_session)}
+
+# The read routes below are polled constantly. They hand the stored records straight to orjson;
+# the response models describe them but skip re-validating data the server wrote itself.
+
+@app.get("/api/call-status/{session_id}", response_model=CallSession)
 async def get_call_status(session_id: str):
     """Get call session status"""
-    if session_id not in transfer_manager.active_calls:
+    call = transfer_manager.active_calls.get(session_id)
+    if call is None:
         raise HTTPException(status_code=404, detail="Call session not found")
     
-    return transfer_manager.active_calls[session_id]
+    return ORJSONResponse(call)
 
-@app.post("/api/end-call")
-async def end_call(request: dict):
+@app.get("/api/calls", response_model=CallListResponse)
+async def query_calls(status: Optional[str] = None, agent_id: Optional[str] = None):
+    """Calls in a status and/or involving an agent (as Agent A or B), looked up through the call indexes"""
+    if status is None and agent_id is None:
+        raise HTTPException(status_code=400, detail="Filter by status and/or agent_id")
+    session_ids = None
+    if status is not None:
+        session_ids = transfer_manager.calls_with_status(status)
+    if agent_id is not None:
+        for_agent = transfer_manager.calls_for_agent(agent_id)
+        if session_ids is None:
+            session_ids = for_agent
+        else:
+            for_agent = set(for_agent)
+            session_ids = [s for s in session_ids if s in for_agent]
+    
+    calls = []
+    for session_id in session_ids:
+        call = transfer_manager.active_calls.get(session_id)
+        if call is not None:
+            calls.append({"session_id": session_id, **call})
+    return ORJSONResponse({"calls": calls, "count": len(calls)})
+
+@app.get("/api/rooms/{room_name}/call", response_model=CallRecord)
+async def get_call_for_room(room_name: str):
+    """The call session using a customer room or transfer room"""
+    session_id = transfer_manager.call_for_room(room_name)
+    call = transfer_manager.active_calls.get(session_id) if session_id else None
+    if call is None:
+        raise HTTPException(status_code=404, detail="No call session for this room")
+    return ORJSONResponse({"session_id": session_id, **call})
+
+@app.post("/api/end-call", response_model=EndCallResponse)
+async def end_call(request: SessionRequest):
     """End a call session"""
+    start = time.perf_counter()
     try:
-        session_id = request.get("session_id")
+        session_id = request.session_id
         
-        if not session_id or session_id not in transfer_manager.active_calls:
+        if session_id not in transfer_manager.active_calls:
             raise HTTPException(status_code=404, detail="Call session not found")
         
-        call_session = transfer_manager.active_calls[session_id]
+        try:
+            call_session = transfer_manager.end_call(session_id)
+        except CallStateConflict:
+            return {
+                "message": "Call already ended",
+                "session_id": session_id,
+                "room_name": transfer_manager.active_calls[session_id]["room_name"],
+                "status": "ended",
+                "room_cleanup": {}
+            }
         room_name = call_session["room_name"]
         
-        transfer_manager.end_call(session_id)
-        
+        # End the rooms concurrently - this will disconnect all participants
+        room_cleanup = {}
         if livekit_service.room_service:
-            try:
-                # End the room - this will disconnect all participants
-                await livekit_service.delete_room(room_name)
-                logger.info(f"LiveKit room {room_name} deleted successfully")
-            except Exception as e:
-                logger.warning(f"Failed to delete LiveKit room {room_name}: {e}")
+            rooms = [room_name]
+            if call_session.get("transfer_room"):
+                rooms.append(call_session["transfer_room"])
+            errors = await timed("end_call", "delete_rooms", livekit_service.delete_rooms(rooms))
+            room_cleanup = {room: f"error: {error}" if error else "deleted" for room, error in errors.items()}
         
-        transfer_room = call_session.get("transfer_room")
-        if transfer_room and livekit_service.room_service:
-            try:
-                await livekit_service.delete_room(transfer_room)
-                logger.info(f"Transfer room {transfer_room} deleted successfully")
-            except Exception as e:
-                logger.warning(f"Failed to delete transfer room {transfer_room}: {e}")
-        
-        if session_id in llm_service.call_contexts:
-            del llm_service.call_contexts[session_id]
+        llm_service.discard_session(session_id)
         
         return {
             "message": "Call ended successfully",
             "session_id": session_id,
             "room_name": room_name,
-            "status": "ended"
+            "status": "ended",
+            "room_cleanup": room_cleanup
         }
         
+    except HTTPException:
+        raise
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Call session not found")
     except Exception as e:
         logger.error(f"Failed to end call: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        ENDPOINT_SECONDS.labels("end_call").observe(time.perf_counter() - start)
 
-@app.post("/api/agent-exit-room")
-async def agent_exit_room(request: dict):
+@app.post("/api/agent-exit-room", response_model=AgentExitResponse)
+async def agent_exit_room(request: AgentExitRequest):
     """Remove Agent A from original room after transfer completion"""
     try:
-        session_id = request.get("session_id")
-        agent_id = request.get("agent_id")
+        session_id = request.session_id
+        agent_id = request.agent_id
         
-        if not session_id or session_id not in transfer_manager.active_calls:
+        if session_id not in transfer_manager.active_calls:
             raise HTTPException(status_code=404, detail="Call session not found")
         
         call_session = transfer_manager.active_calls[session_id]
@@ -528,7 +1819,7 @@ async def agent_exit_room(request: dict):
                 logger.warning(f"Failed to remove agent from room: {e}")
         
         # Update session to mark Agent A as exited
-        call_session["agent_a_exited"] = True
+        transfer_manager.update_call(session_id, agent_a_exited=True)
         
         return {
             "message": f"Agent {agent_id} exited room successfully",
@@ -540,16 +1831,15 @@ async def agent_exit_room(request: dict):
         logger.error(f"Failed to remove agent from room: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/notify-agent-b")
-async def notify_agent_b(request: dict):
+@app.post("/api/notify-agent-b", response_model=NotifyAgentBResponse, response_model_exclude_unset=True)
+async def notify_agent_b(request: NotifyAgentBRequest):
     """Notify Agent B about incoming transfer (webhook/notification endpoint)"""
     try:
-        session_id = request.get("session_id")
-        agent_b_id = request.get("agent_b_id")
-        transfer_room = request.get("transfer_room")
-        agent_b_token = request.get("agent_b_token")
+        session_id = request.session_id
+        agent_b_id = request.agent_b_id
+        transfer_room = request.transfer_room
+        agent_b_token = request.agent_b_token
         
-        # In a real system, this would send notifications via WebSocket, email, or push notifications
         notification_data = {
             "type": "transfer_request",
             "session_id": session_id,
@@ -559,12 +1849,13 @@ async def notify_agent_b(request: dict):
             "timestamp": datetime.now().isoformat(),
             "message": f"Incoming warm transfer from Agent A. Join transfer room: {transfer_room}"
         }
+        if request.summary_streaming:
+            notification_data["summary_streaming"] = True
+            # Shown to Agent B until the first summary_delta arrives
+            notification_data["summary_draft"] = request.summary_draft
         
-        # Store notification for Agent B to poll/retrieve
-        if agent_b_id not in transfer_manager.notifications:
-            transfer_manager.notifications[agent_b_id] = []
-        
-        transfer_manager.notifications[agent_b_id].append(notification_data)
+        # Queue for Agent B until they ack it, and push it to any socket or long-poll they have open
+        await deliver_notification(agent_b_id, notification_data)
         
         return {
             "message": "Agent B notified successfully",
@@ -575,58 +1866,177 @@ async def notify_agent_b(request: dict):
         logger.error(f"Failed to notify Agent B: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/notifications/{agent_id}")
-async def get_notifications(agent_id: str):
-    """Get pending notifications for an agent"""
-    notifications = transfer_manager.notifications.get(agent_id, [])
+@app.post("/api/agents/register", response_model=RegisteredAgent)
+async def register_agent(request: RegisterAgentRequest):
+    """Register Agent B with {"agent_id", "skills": [...], "capacity": concurrent transfers}; re-registering updates them"""
+    agent = transfer_manager.agents.register(request.agent_id, request.skills, request.capacity)
+    return {**agent.to_dict(), "heartbeat_ttl_seconds": AGENT_HEARTBEAT_TTL_SECONDS}
+
+@app.post("/api/agents/{agent_id}/heartbeat", response_model=AgentInfo)
+async def agent_heartbeat(agent_id: str, request: Optional[HeartbeatRequest] = None):
+    """Keep a registration alive, optionally setting status (available, busy or away)"""
+    status = request.status if request else None
+    if status is not None and status not in STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(STATUSES)}")
+    agent = transfer_manager.agents.heartbeat(agent_id, status)
+    if agent is None:
+        # Expired or never registered; the client should register again
+        raise HTTPException(status_code=404, detail="Agent not registered")
+    return agent.to_dict()
+
+@app.delete("/api/agents/{agent_id}", response_model=MessageResponse)
+async def unregister_agent(agent_id: str):
+    if not transfer_manager.agents.unregister(agent_id):
+        raise HTTPException(status_code=404, detail="Agent not registered")
+    return {"message": f"Agent {agent_id} unregistered"}
+
+@app.get("/api/agents", response_model=AgentListResponse)
+async def list_agents(skill: Optional[str] = None):
+    agents = transfer_manager.agents.agents.values()
+    return {"agents": [agent.to_dict() for agent in agents if skill is None or skill in agent.skills]}
+
+@app.get("/api/notifications/{agent_id}", response_model=NotificationsResponse)
+async def get_notifications(agent_id: str, http_request: Request, since: int = 0, wait: float = 0):
+    """Get notifications queued for an agent after the `since` cursor.
+    
+    Notifications stay queued until acknowledged, so a lost response is simply
+    read again. With `wait`, the request is held until a notification arrives or
+    `wait` seconds (capped at NOTIFICATION_LONG_POLL_MAX_SECONDS) pass.
+    """
+    notifications = transfer_manager.read_notifications(agent_id, since)
+    deadline = time.monotonic() + min(max(wait, 0), NOTIFICATION_LONG_POLL_MAX_SECONDS)
+    while not notifications and time.monotonic() < deadline:
+        # Re-read at least every poll interval to see notifications queued by other workers
+        await notification_hub.wait(agent_id, min(NOTIFICATION_QUEUE_POLL_SECONDS, deadline - time.monotonic()))
+        if await http_request.is_disconnected():
+            break
+        notifications = transfer_manager.read_notifications(agent_id, since)
     
-    # Log for debugging - but don't clear notifications immediately
     if notifications:
-        logger.info(f"Found {len(notifications)} notifications for agent {agent_id}")
-        for notif in notifications:
-            logger.info(f"Notification type: {notif.get('type')}, session: {notif.get('session_id')}")
+        logger.debug(f"Returning {len(notifications)} notifications for agent {agent_id}")
+    return ORJSONResponse({
+        "notifications": notifications,
+        "cursor": notifications[-1]["seq"] if notifications else min(since, state_store.last_sequence("notifications", agent_id))
+    })
+
+@app.post("/api/notifications/{agent_id}/ack", response_model=AckResponse)
+async def ack_notifications(agent_id: str, request: AckRequest):
+    """Acknowledge every notification up to and including `seq`"""
+    return {"acknowledged": transfer_manager.ack_notifications(agent_id, request.seq)}
+
+@app.websocket("/ws/agents/{agent_id}")
+async def agent_notifications_ws(websocket: WebSocket, agent_id: str, since: int = 0):
+    """Push channel for agent notifications; GET /api/notifications remains as a polling fallback.
     
-    # Clear notifications after returning them to prevent duplicate processing
-    if agent_id in transfer_manager.notifications:
-        transfer_manager.notifications[agent_id] = []
+    Queued notifications after `since` are sent on connect. Clients acknowledge
+    with {"ack": seq} frames; anything else they send is treated as a keep-alive.
+    """
+    if since > state_store.last_sequence("notifications", agent_id):
+        since = 0
+    await notification_hub.connect(agent_id, websocket, since)
     
-    return {"notifications": notifications}
+    async def flush_queue():
+        # Delivers anything queued while the agent was offline and, with a shared
+        # state backend, notifications queued by other workers
+        while True:
+            for notification in transfer_manager.read_notifications(agent_id, notification_hub.cursors.get(websocket, 0)):
+                if not await notification_hub.send(agent_id, websocket, notification):
+                    return
+            await asyncio.sleep(NOTIFICATION_QUEUE_POLL_SECONDS)
+    
+    flusher = asyncio.create_task(flush_queue())
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                frame = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(frame, dict) and isinstance(frame.get("ack"), int):
+                transfer_manager.ack_notifications(agent_id, frame["ack"])
+            # Any frame from an open socket counts as a heartbeat for a registered agent
+            transfer_manager.agents.heartbeat(agent_id)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        flusher.cancel()
+        notification_hub.disconnect(agent_id, websocket)
+
+@app.websocket("/ws/calls/{session_id}/context")
+async def context_ingest_ws(websocket: WebSocket, session_id: str):
+    """Ingest stream for live transcription feeds.
+    
+    Each frame is one {"message", "speaker", "timestamp"} object or a list of up to
+    CONTEXT_BATCH_MAX_ITEMS of them, and is acknowledged with {"accepted": n} or
+    {"error": ...}. Items may repeat the URL's session_id but not name another one.
+    A frame with an error is rejected as a whole.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                frame = orjson.loads(raw)
+                frame = frame if isinstance(frame, list) else [frame]
+                if len(frame) > CONTEXT_BATCH_MAX_ITEMS:
+                    await websocket.send_json({"error": f"At most {CONTEXT_BATCH_MAX_ITEMS} items per frame"})
+                    continue
+                items = context_items.validate_python(frame)
+            except ValidationError as e:
+                await websocket.send_json({"error": describe_errors(e.errors())})
+                continue
+            except orjson.JSONDecodeError as e:
+                await websocket.send_json({"error": f"invalid JSON at position {e.pos}"})
+                continue
+            mismatched = [index for index, item in enumerate(items) if item.session_id not in (None, session_id)]
+            if mismatched:
+                await websocket.send_json({"error": "; ".join(
+                    f"{index}.session_id: does not match the session in the URL" for index in mismatched
+                )})
+                continue
+            utterances = [utterance(item) for item in items]
+            if utterances:
+                llm_service.add_contexts({session_id: utterances})
+            await websocket.send_json({"accepted": len(utterances)})
+    except WebSocketDisconnect:
+        pass
 
 # Optional Twilio integration
-@app.post("/api/twilio-transfer")
-async def twilio_transfer(request: dict):
+@app.post("/api/twilio-transfer", response_model=TwilioTransferResponse)
+async def twilio_transfer(request: TwilioTransferRequest):
     """Transfer call to external phone number via Twilio"""
-    if not TWILIO_AVAILABLE or not twilio_client:
+    if not TWILIO_AVAILABLE or not get_twilio_client():
         raise HTTPException(status_code=501, detail="Twilio integration not configured")
     
     try:
-        session_id = request.get("session_id")
-        phone_number = request.get("phone_number")
+        session_id = request.session_id
+        phone_number = request.phone_number
         
-        if not session_id or session_id not in transfer_manager.active_calls:
+        if session_id not in transfer_manager.active_calls:
             raise HTTPException(status_code=404, detail="Call session not found")
         
-        if not phone_number:
-            raise HTTPException(status_code=400, detail="Phone number required")
-        
         if not TWILIO_PHONE_NUMBER:
             raise HTTPException(status_code=500, detail="Twilio phone number not configured")
         
         # Generate call summary
         summary = await llm_service.generate_call_summary(session_id)
         
+        # The summary can be transcript text (extractive fallback), so neither value is trusted as markup
+        twiml = (
+            f"<Response><Say>Incoming warm transfer. Call summary: {xml_escape(summary)}</Say>"
+            f"<Dial>{xml_escape(phone_number)}</Dial></Response>"
+        )
         try:
-            call = twilio_client.calls.create(
-                to=phone_number,
-                from_=TWILIO_PHONE_NUMBER,
-                twiml=f'<Response><Say>Incoming warm transfer. Call summary: {summary}</Say><Dial>{phone_number}</Dial></Response>'
-            )
+            call = await create_twilio_call(to=phone_number, from_=TWILIO_PHONE_NUMBER, twiml=twiml)
             
             return {
                 "twilio_call_sid": call.sid,
                 "call_summary": summary,
                 "message": "Twilio transfer initiated"
             }
+        except asyncio.TimeoutError:
+            logger.error(f"Twilio API timed out after {TWILIO_TIMEOUT_SECONDS}s")
+            raise HTTPException(status_code=504, detail="Twilio error: request timed out")
         except Exception as twilio_error:
             logger.error(f"Twilio API error: {twilio_error}")
             raise HTTPException(status_code=400, detail=f"Twilio error: {str(twilio_error)}")
@@ -637,8 +2047,21 @@ async def twilio_transfer(request: dict):
         logger.error(f"Failed to initiate Twilio transfer: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def calls_by_status() -> Dict[str, int]:
+    return {status: len(transfer_manager.calls_with_status(status)) for status in CALL_STATUSES}
+
+def notification_depth() -> Dict[str, int]:
+    return {agent_id: len(queue) for agent_id, queue in transfer_manager.notifications.items()}
+
+register_state_collector(StateCollector(calls_by_status, notification_depth, llm_service.scheduler.depths))
+
+@app.get("/metrics", response_class=Response)
+async def metrics():
+    """Prometheus metrics for this worker"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Health check endpoint for debugging
-@app.get("/api/health")
+@app.get("/api/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
     return {
@@ -646,7 +2069,30 @@ async def health_check():
         "livekit_configured": bool(LIVEKIT_API_KEY and LIVEKIT_API_SECRET),
         "twilio_configured": bool(TWILIO_AVAILABLE and TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN),
         "livekit_url": LIVEKIT_WS_URL,
-        "active_calls": len(transfer_manager.active_calls)
+        "active_calls": len(transfer_manager.active_calls),
+        "calls_by_status": calls_by_status(),
+        "token_cache": {
+            "size": len(livekit_service.token_cache),
+            "hits": livekit_service.token_cache_hits,
+            "misses": livekit_service.token_cache_misses
+        },
+        "llm_providers": llm_service.router.stats(),
+        "llm_queue": llm_service.scheduler.stats(),
+        "agents": transfer_manager.agents.stats(),
+        "summary_cache": {
+            "size": len(llm_service.summary_cache),
+            "hits": llm_service.summary_cache_hits,
+            "misses": llm_service.summary_cache_misses,
+            "coalesced": llm_service.summary_requests_coalesced
+        },
+        "transfer_room_pool": {
+            "ready": len(transfer_room_pool.rooms),
+            "hits": transfer_room_pool.hits,
+            "misses": transfer_room_pool.misses
+        },
+        "retention": session_reaper.stats(),
+        "upstreams": upstream_clients.stats(),
+        "state_store": state_store.stats()
     }
 
 if __name__ == "__main__":
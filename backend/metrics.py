@@ -0,0 +1,114 @@
+"""
+Prometheus metrics for the warm transfer API, served at /metrics.
+
+Latency histograms cover each stage of the transfer pipeline. Gauges for call
+status and notification queues are computed from live state at scrape time
+by StateCollector. Metrics are per process; with several workers, scrape each
+worker or aggregate them in Prometheus.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+from prometheus_client import Counter, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+# Summaries and LiveKit calls run from a few ms to tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+ENDPOINT_SECONDS = Histogram(
+    "warm_transfer_endpoint_seconds",
+    "End-to-end latency of transfer pipeline endpoints",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "warm_transfer_stage_seconds",
+    "Latency of individual stages within transfer pipeline endpoints",
+    ["endpoint", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_REQUESTS = Counter(
+    "warm_transfer_llm_requests_total",
+    "LLM completion requests by provider and outcome",
+    ["provider", "outcome"],
+)
+LLM_FALLBACKS = Counter(
+    "warm_transfer_llm_fallbacks_total",
+    "Summaries that could not use the preferred path, by reason",
+    ["reason"],
+)
+LLM_HEDGED_REQUESTS = Counter(
+    "warm_transfer_llm_hedged_requests_total",
+    "Requests raced against a second provider after the hedge delay",
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "warm_transfer_llm_queue_wait_seconds",
+    "Time LLM requests waited for a provider slot, by priority",
+    ["provider", "priority"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_SHED = Counter(
+    "warm_transfer_llm_shed_total",
+    "LLM requests refused by admission control (queue_full, rate_limited or timeout)",
+    ["provider", "priority", "reason"],
+)
+SUMMARY_CACHE = Counter(
+    "warm_transfer_summary_cache_total",
+    "Summary requests by cache result (hit, coalesced onto an in-flight request, or miss)",
+    ["result"],
+)
+
+
+@contextmanager
+def time_stage(endpoint: str, stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(endpoint, stage).observe(time.perf_counter() - start)
+
+
+async def timed(endpoint: str, stage: str, awaitable):
+    """Await something and record how long it took as a pipeline stage"""
+    with time_stage(endpoint, stage):
+        return await awaitable
+
+
+class StateCollector:
+    """Gauges derived from live state on every scrape"""
+
+    def __init__(self, calls_by_status: Callable[[], Dict[str, int]], notification_depth: Callable[[], Dict[str, int]],
+                 llm_queue_depth: Callable[[], Dict[Tuple[str, str], int]]):
+        self.calls_by_status = calls_by_status
+        self.notification_depth = notification_depth
+        self.llm_queue_depth = llm_queue_depth
+
+    def collect(self):
+        calls = GaugeMetricFamily("warm_transfer_calls", "Call sessions held in memory, by status", labels=["status"])
+        for status, count in sorted(self.calls_by_status().items()):
+            calls.add_metric([status], count)
+        yield calls
+
+        depth = self.notification_depth()
+        yield GaugeMetricFamily(
+            "warm_transfer_notification_queue_depth",
+            "Undelivered notifications across all agent queues",
+            value=sum(depth.values()),
+        )
+        yield GaugeMetricFamily(
+            "warm_transfer_notification_queues",
+            "Agents with at least one undelivered notification",
+            value=len(depth),
+        )
+        queued = GaugeMetricFamily(
+            "warm_transfer_llm_queue_depth", "LLM requests waiting for a provider slot", labels=["provider", "priority"]
+        )
+        for (provider, priority), count in sorted(self.llm_queue_depth().items()):
+            queued.add_metric([provider, priority], count)
+        yield queued
+
+
+def register_state_collector(collector: StateCollector):
+    REGISTRY.register(collector)
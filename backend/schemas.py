@@ -0,0 +1,256 @@
+"""
+Request and response models for the API routes.
+
+Request bodies are validated by FastAPI against these models; a body that
+does not match is answered with 400 and the offending fields (see the
+RequestValidationError handler in main.py). Response models document what
+each route returns. Call records and notifications are stored as plain dicts,
+so their models allow fields beyond the ones listed here.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, ConfigDict, Field, StrictInt
+
+# Non-empty string; an empty session_id or message is as good as a missing one
+Required = Field(min_length=1)
+
+
+def describe_errors(errors: Sequence[dict], skip: int = 0) -> str:
+    """One line per validation error, e.g. "items.0.message: Field required"; skip drops leading loc parts"""
+    return "; ".join(_describe_error(error, skip) for error in errors)
+
+
+def _describe_error(error: dict, skip: int) -> str:
+    if error["type"] == "json_invalid":
+        # FastAPI reports a body that is not JSON at ("body", <character offset>)
+        reason = error.get("ctx", {}).get("error")
+        return f"invalid JSON at position {error['loc'][-1]}" + (f": {reason}" if reason else "")
+    return f"{'.'.join(str(part) for part in error['loc'][skip:]) or 'body'}: {error['msg']}"
+
+
+# Requests
+
+class CreateCallRequest(BaseModel):
+    caller_id: Optional[str] = None
+    # Join an existing room instead of creating one
+    room_name: Optional[str] = None
+
+
+class SessionRequest(BaseModel):
+    session_id: str = Required
+
+
+class TransferRequest(SessionRequest):
+    # Without agent_b_id, the least-loaded available registered agent (with skill, if given) is picked
+    agent_b_id: Optional[str] = None
+    skill: Optional[str] = None
+
+
+class ContextItem(BaseModel):
+    """One transcript utterance; session_id is taken from the URL on the ingest WebSocket"""
+    session_id: Optional[str] = None
+    message: str = Required
+    speaker: Optional[str] = None
+    # Epoch seconds (not milliseconds); defaults to the time it is received. Transcripts store
+    # timestamps as unsigned 32-bit ints, so anything outside that range is rejected with the request
+    timestamp: Optional[float] = Field(None, strict=True, ge=0, lt=2**32)
+
+
+class AddContextRequest(ContextItem):
+    session_id: str = Required
+    speaker: str = "Unknown"
+
+
+class AddContextBatchRequest(BaseModel):
+    items: List[ContextItem] = Field(min_length=1)
+
+
+class AgentExitRequest(SessionRequest):
+    agent_id: str = Required
+
+
+class NotifyAgentBRequest(SessionRequest):
+    agent_b_id: str = Required
+    transfer_room: str
+    agent_b_token: str
+    summary_streaming: bool = False
+    summary_draft: str = ""
+
+
+class RegisterAgentRequest(BaseModel):
+    agent_id: str = Required
+    skills: List[str] = []
+    # Concurrent transfers
+    capacity: StrictInt = Field(1, ge=1)
+
+
+class HeartbeatRequest(BaseModel):
+    # available, busy or away; checked against agent_directory.STATUSES
+    status: Optional[str] = None
+
+
+class AckRequest(BaseModel):
+    seq: StrictInt
+
+
+class TwilioTransferRequest(SessionRequest):
+    phone_number: str = Required
+
+
+# Stored records
+
+class CallSession(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    caller_id: str
+    room_name: str
+    agent_a: Optional[str] = None
+    agent_b: Optional[str] = None
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    call_summary: str = ""
+    transfer_room: Optional[str] = None
+    transfer_ready: Optional[bool] = None
+    agent_a_exited: bool = False
+    ended_at: Optional[datetime] = None
+    version: int = 0
+
+
+class CallRecord(CallSession):
+    session_id: str
+
+
+class Notification(BaseModel):
+    """A queued agent notification; which fields are set depends on its type"""
+    model_config = ConfigDict(extra="allow")
+
+    type: str
+    session_id: str
+    # Assigned when queued; acknowledge up to it
+    seq: Optional[int] = None
+    timestamp: Optional[str] = None
+    agent_b_id: Optional[str] = None
+    transfer_room: Optional[str] = None
+    agent_b_token: Optional[str] = None
+    original_room: Optional[str] = None
+    customer_token: Optional[str] = None
+    message: Optional[str] = None
+    call_summary: Optional[str] = None
+    summary_streaming: Optional[bool] = None
+    summary_draft: Optional[str] = None
+    text: Optional[str] = None
+
+
+class AgentInfo(BaseModel):
+    agent_id: str
+    skills: List[str]
+    capacity: int
+    status: str
+    load: int
+    available: bool
+
+
+# Responses
+
+class MessageResponse(BaseModel):
+    message: str
+
+
+class CreateCallResponse(BaseModel):
+    session_id: str
+    room_name: str
+    caller_token: str
+    agent_token: str
+    agent_id: str
+    ws_url: str
+
+
+class TransferResponse(BaseModel):
+    transfer_room: str
+    agent_b_id: str
+    agent_a_transfer_token: str
+    agent_b_transfer_token: str
+    call_summary: str
+    ws_url: str
+
+
+class CompleteTransferResponse(MessageResponse):
+    agent_b_original_token: str
+    original_room: str
+    ws_url: str
+    notification_sent: bool
+
+
+class AddContextResponse(MessageResponse):
+    formatted_message: str
+
+
+class AddContextBatchResponse(BaseModel):
+    accepted: int
+    sessions: int
+
+
+class CallListResponse(BaseModel):
+    calls: List[CallRecord]
+    count: int
+
+
+class EndCallResponse(MessageResponse):
+    session_id: str
+    room_name: str
+    status: str
+    # Room name -> "deleted" or "error: ..."
+    room_cleanup: Dict[str, str]
+
+
+class AgentExitResponse(MessageResponse):
+    room_name: str
+    session_id: str
+
+
+class NotifyAgentBResponse(MessageResponse):
+    notification: Notification
+
+
+class RegisteredAgent(AgentInfo):
+    heartbeat_ttl_seconds: float
+
+
+class AgentListResponse(BaseModel):
+    agents: List[AgentInfo]
+
+
+class NotificationsResponse(BaseModel):
+    notifications: List[Notification]
+    # Pass back as ?since= to read only newer notifications
+    cursor: int
+
+
+class AckResponse(BaseModel):
+    acknowledged: int
+
+
+class TwilioTransferResponse(MessageResponse):
+    twilio_call_sid: str
+    call_summary: str
+
+
+class HealthResponse(BaseModel):
+    status: str
+    livekit_configured: bool
+    twilio_configured: bool
+    livekit_url: str
+    active_calls: int
+    calls_by_status: Dict[str, int]
+    token_cache: Dict[str, int]
+    llm_providers: Dict[str, Any]
+    llm_queue: Dict[str, Any]
+    agents: Dict[str, Any]
+    summary_cache: Dict[str, int]
+    transfer_room_pool: Dict[str, int]
+    retention: Dict[str, Any]
+    upstreams: Dict[str, Any]
+    state_store: Dict[str, Union[int, float]]
@@ -0,0 +1,827 @@
+"""
+Pluggable storage for call state shared between API workers.
+
+InMemoryStateStore keeps everything in process-local dicts. It is the default
+and all a single worker needs. JournaledStateStore is the same in-memory store
+made restart-safe by an append-only journal and periodic snapshots.
+SQLiteStateStore keeps the same data in a SQLite file, so several uvicorn
+workers (or containers sharing a volume) see the same calls, contexts and
+notification queues.
+
+Data lives in named namespaces of two kinds:
+- records: key -> dict (call sessions, transfer sessions)
+- lists:   key -> list of JSON values (call contexts, notification queues)
+
+Record fields can be indexed with `add_index()`; `lookup()` then finds the keys
+of records holding a value without scanning the namespace. Indexes are kept
+up to date by every write, so they stay correct whichever method changed a
+record.
+
+Queues that clients read by cursor use `push()`, which stamps each item with a
+per-key sequence number under "seq", and `ack()`, which drops everything up to
+a sequence number.
+
+`records()` and `lists()` return read-only mappings. All writes go through the
+store methods so that shared backends can apply them atomically.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ConflictError(Exception):
+    """A conditional update found the record changed since it was read"""
+
+
+class StoreLockedError(RuntimeError):
+    """Another process is already using the journal directory"""
+
+
+class StateStore:
+    """Interface implemented by every state backend"""
+
+    # Whether other processes write to the same data, so nothing read from it can be cached
+    shared = False
+
+    def records(self, namespace: str) -> Mapping:
+        raise NotImplementedError
+
+    def put(self, namespace: str, key: str, record: dict):
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, fields: dict, expect: Optional[dict] = None) -> Optional[dict]:
+        """Merge fields into an existing record and return it, or None if the key is missing.
+
+        With expect, the update only applies if the record still holds those
+        field values; otherwise ConflictError is raised and nothing changes.
+        """
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def add_index(self, namespace: str, field: str):
+        """Index a record field so lookup() can find records by its value"""
+        raise NotImplementedError
+
+    def lookup(self, namespace: str, field: str, value: Any) -> List[str]:
+        """Keys of records whose indexed field equals value"""
+        raise NotImplementedError
+
+    def lists(self, namespace: str) -> Mapping:
+        raise NotImplementedError
+
+    def append(self, namespace: str, key: str, item: Any, max_len: Optional[int] = None) -> int:
+        """Append an item, dropping the oldest items beyond max_len. Returns how many were dropped."""
+        raise NotImplementedError
+
+    def extend(self, namespace: str, key: str, items: List[Any], max_len: Optional[int] = None) -> int:
+        """Append several items in one write, then trim to max_len. Returns how many were dropped."""
+        return sum(self.append(namespace, key, item, max_len) for item in items)
+
+    def push(self, namespace: str, key: str, item: dict, max_len: Optional[int] = None) -> dict:
+        """Append a copy of item stamped with the key's next sequence number under "seq" and return it.
+
+        Sequence numbers increase monotonically per key and are never reused, even
+        after the items carrying them have been acknowledged or trimmed.
+        """
+        raise NotImplementedError
+
+    def ack(self, namespace: str, key: str, seq: int) -> int:
+        """Drop pushed items with a sequence number up to seq. Returns how many were dropped."""
+        raise NotImplementedError
+
+    def last_sequence(self, namespace: str, key: str) -> int:
+        """Sequence number of the last item pushed under key, or 0"""
+        raise NotImplementedError
+
+    def use_list_type(self, namespace: str, factory: Callable[[], Any]):
+        """Hold a namespace's lists in a custom container, e.g. a compact Transcript.
+
+        Backends that serialize items anyway may ignore this.
+        """
+
+    def flush(self):
+        """Block until every write so far is durable"""
+
+    def stats(self) -> dict:
+        return {}
+
+    def close(self):
+        pass
+
+
+class InMemoryStateStore(StateStore):
+    """Process-local dicts; the mappings handed out are the live dicts themselves"""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, dict]] = {}
+        self._lists: Dict[str, Dict[str, list]] = {}
+        self._list_types: Dict[str, Callable[[], Any]] = {}
+        self._sequences: Dict[tuple, int] = {}
+        # namespace -> field -> value -> keys
+        self._indexes: Dict[str, Dict[str, Dict[Any, Set[str]]]] = {}
+
+    def records(self, namespace: str) -> Dict[str, dict]:
+        return self._records.setdefault(namespace, {})
+
+    def put(self, namespace: str, key: str, record: dict):
+        records = self.records(namespace)
+        self._unindex(namespace, key, records.get(key))
+        records[key] = record
+        self._index(namespace, key, record)
+
+    def update(self, namespace: str, key: str, fields: dict, expect: Optional[dict] = None) -> Optional[dict]:
+        record = self.records(namespace).get(key)
+        if record is not None:
+            _check_expected(namespace, key, record, expect)
+            changed = {field: record.get(field) for field in self._indexes.get(namespace, ()) if field in fields}
+            self._unindex(namespace, key, changed)
+            record.update(fields)
+            self._index(namespace, key, {field: record[field] for field in changed})
+        return record
+
+    def delete(self, namespace: str, key: str):
+        self._unindex(namespace, key, self.records(namespace).pop(key, None))
+        self.lists(namespace).pop(key, None)
+
+    def add_index(self, namespace: str, field: str):
+        indexes = self._indexes.setdefault(namespace, {})
+        if field in indexes:
+            return
+        indexes[field] = {}
+        for key, record in self.records(namespace).items():
+            self._index(namespace, key, {field: record.get(field)})
+
+    def lookup(self, namespace: str, field: str, value: Any) -> List[str]:
+        return list(self._indexes[namespace][field].get(value, ()))
+
+    def _index(self, namespace: str, key: str, record: dict):
+        for field, index in self._indexes.get(namespace, {}).items():
+            value = record.get(field)
+            if value is not None:
+                index.setdefault(value, set()).add(key)
+
+    def _unindex(self, namespace: str, key: str, record: Optional[dict]):
+        if not record:
+            return
+        for field, index in self._indexes.get(namespace, {}).items():
+            keys = index.get(record.get(field))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[record[field]]
+
+    def lists(self, namespace: str) -> Dict[str, list]:
+        return self._lists.setdefault(namespace, {})
+
+    def _list(self, namespace: str, key: str):
+        lists = self.lists(namespace)
+        items = lists.get(key)
+        if items is None:
+            items = lists[key] = self._list_types.get(namespace, list)()
+        return items
+
+    @staticmethod
+    def _trim(items, max_len: Optional[int]) -> int:
+        if max_len and len(items) > max_len:
+            dropped = len(items) - max_len
+            del items[:dropped]
+            return dropped
+        return 0
+
+    def append(self, namespace: str, key: str, item: Any, max_len: Optional[int] = None) -> int:
+        items = self._list(namespace, key)
+        items.append(item)
+        return self._trim(items, max_len)
+
+    def extend(self, namespace: str, key: str, items: List[Any], max_len: Optional[int] = None) -> int:
+        container = self._list(namespace, key)
+        for item in items:
+            container.append(item)
+        return self._trim(container, max_len)
+
+    def push(self, namespace: str, key: str, item: dict, max_len: Optional[int] = None) -> dict:
+        seq = self._sequences[namespace, key] = self._sequences.get((namespace, key), 0) + 1
+        item = {**item, "seq": seq}
+        items = self._list(namespace, key)
+        items.append(item)
+        self._trim(items, max_len)
+        return item
+
+    def ack(self, namespace: str, key: str, seq: int) -> int:
+        lists = self.lists(namespace)
+        items = lists.get(key)
+        if not items:
+            return 0
+        # Pushed items are in sequence order, so acknowledged ones form a prefix
+        dropped = 0
+        while dropped < len(items) and items[dropped]["seq"] <= seq:
+            dropped += 1
+        del items[:dropped]
+        if not items:
+            del lists[key]
+        return dropped
+
+    def last_sequence(self, namespace: str, key: str) -> int:
+        return self._sequences.get((namespace, key), 0)
+
+    def use_list_type(self, namespace: str, factory: Callable[[], Any]):
+        self._list_types[namespace] = factory
+        # Lists restored before the type was set (see JournaledStateStore) are converted
+        lists = self.lists(namespace)
+        for key, items in lists.items():
+            container = factory()
+            for item in items:
+                container.append(item)
+            lists[key] = container
+
+
+def _check_expected(namespace: str, key: str, record: dict, expect: Optional[dict]):
+    for field, value in (expect or {}).items():
+        if record.get(field) != value:
+            raise ConflictError(f"{namespace}/{key}: {field} is {record.get(field)!r}, expected {value!r}")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict) -> Any:
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_encode, separators=(",", ":"))
+
+
+def _loads(raw: str) -> Any:
+    return json.loads(raw, object_hook=_decode)
+
+
+class _SQLiteRecords(Mapping):
+    def __init__(self, store: "SQLiteStateStore", namespace: str):
+        self._store = store
+        self._namespace = namespace
+
+    def __getitem__(self, key: str) -> dict:
+        row = self._store._query_one(
+            "SELECT value FROM records WHERE namespace = ? AND key = ?", (self._namespace, key)
+        )
+        if row is None:
+            raise KeyError(key)
+        return _loads(row[0])
+
+    def __contains__(self, key: object) -> bool:
+        return self._store._query_one(
+            "SELECT 1 FROM records WHERE namespace = ? AND key = ?", (self._namespace, key)
+        ) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._store._query_all("SELECT key FROM records WHERE namespace = ?", (self._namespace,))
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._store._query_one("SELECT COUNT(*) FROM records WHERE namespace = ?", (self._namespace,))[0]
+
+    def items(self) -> List[tuple]:
+        # One query rather than one per key
+        rows = self._store._query_all("SELECT key, value FROM records WHERE namespace = ?", (self._namespace,))
+        return [(key, _loads(value)) for key, value in rows]
+
+    def values(self) -> List[dict]:
+        return [record for _, record in self.items()]
+
+
+class _SQLiteLists(Mapping):
+    def __init__(self, store: "SQLiteStateStore", namespace: str):
+        self._store = store
+        self._namespace = namespace
+
+    def __getitem__(self, key: str) -> list:
+        rows = self._store._query_all(
+            "SELECT value FROM list_items WHERE namespace = ? AND key = ? ORDER BY id", (self._namespace, key)
+        )
+        if not rows:
+            raise KeyError(key)
+        return [_loads(row[0]) for row in rows]
+
+    def __contains__(self, key: object) -> bool:
+        return self._store._query_one(
+            "SELECT 1 FROM list_items WHERE namespace = ? AND key = ? LIMIT 1", (self._namespace, key)
+        ) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._store._query_all(
+            "SELECT DISTINCT key FROM list_items WHERE namespace = ?", (self._namespace,)
+        )
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        return self._store._query_one(
+            "SELECT COUNT(DISTINCT key) FROM list_items WHERE namespace = ?", (self._namespace,)
+        )[0]
+
+
+class SQLiteStateStore(StateStore):
+    """Shared store backed by a SQLite file in WAL mode; safe across processes on one host"""
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS list_items ("
+            " id INTEGER PRIMARY KEY, namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS list_items_key ON list_items (namespace, key, id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sequences ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value INTEGER NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def _query_one(self, sql: str, params: tuple):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _query_all(self, sql: str, params: tuple):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _write(self, sql: str, params: tuple):
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def records(self, namespace: str) -> Mapping:
+        return _SQLiteRecords(self, namespace)
+
+    def put(self, namespace: str, key: str, record: dict):
+        self._write(
+            "INSERT OR REPLACE INTO records (namespace, key, value) VALUES (?, ?, ?)",
+            (namespace, key, _dumps(record)),
+        )
+
+    def update(self, namespace: str, key: str, fields: dict, expect: Optional[dict] = None) -> Optional[dict]:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front so concurrent workers
+            # cannot interleave their read-modify-write of the same record
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM records WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                record = _loads(row[0])
+                _check_expected(namespace, key, record, expect)
+                record.update(fields)
+                self._conn.execute(
+                    "UPDATE records SET value = ? WHERE namespace = ? AND key = ?",
+                    (_dumps(record), namespace, key),
+                )
+                self._conn.execute("COMMIT")
+                return record
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM records WHERE namespace = ? AND key = ?", (namespace, key))
+            self._conn.execute("DELETE FROM list_items WHERE namespace = ? AND key = ?", (namespace, key))
+
+    @staticmethod
+    def _field_path(field: str) -> str:
+        # Inlined rather than bound: SQLite only uses an expression index for the identical expression
+        if not field.isidentifier():
+            raise ValueError(f"Cannot index field {field!r}")
+        return f"json_extract(value, '$.{field}')"
+
+    def add_index(self, namespace: str, field: str):
+        # One expression index per field serves every namespace that indexes it
+        self._write(
+            f"CREATE INDEX IF NOT EXISTS records_by_{field} ON records (namespace, {self._field_path(field)})", ()
+        )
+
+    def lookup(self, namespace: str, field: str, value: Any) -> List[str]:
+        rows = self._query_all(
+            f"SELECT key FROM records WHERE namespace = ? AND {self._field_path(field)} = ?", (namespace, value)
+        )
+        return [row[0] for row in rows]
+
+    def lists(self, namespace: str) -> Mapping:
+        return _SQLiteLists(self, namespace)
+
+    def append(self, namespace: str, key: str, item: Any, max_len: Optional[int] = None) -> int:
+        return self.extend(namespace, key, [item], max_len)
+
+    def extend(self, namespace: str, key: str, items: List[Any], max_len: Optional[int] = None) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO list_items (namespace, key, value) VALUES (?, ?, ?)",
+                    [(namespace, key, _dumps(item)) for item in items],
+                )
+                dropped = 0
+                if max_len:
+                    dropped = self._conn.execute(
+                        "DELETE FROM list_items WHERE id IN ("
+                        " SELECT id FROM list_items WHERE namespace = ? AND key = ?"
+                        " ORDER BY id DESC LIMIT -1 OFFSET ?)",
+                        (namespace, key, max_len),
+                    ).rowcount
+                self._conn.execute("COMMIT")
+                return dropped
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def push(self, namespace: str, key: str, item: dict, max_len: Optional[int] = None) -> dict:
+        with self._lock:
+            # Numbering and inserting in one transaction keeps list order equal to
+            # sequence order even when several workers push to the same key
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self._conn.execute(
+                    "INSERT INTO sequences (namespace, key, value) VALUES (?, ?, 1)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET value = value + 1 RETURNING value",
+                    (namespace, key),
+                ).fetchone()[0]
+                item = {**item, "seq": seq}
+                self._conn.execute(
+                    "INSERT INTO list_items (namespace, key, value) VALUES (?, ?, ?)", (namespace, key, _dumps(item))
+                )
+                if max_len:
+                    self._conn.execute(
+                        "DELETE FROM list_items WHERE id IN ("
+                        " SELECT id FROM list_items WHERE namespace = ? AND key = ?"
+                        " ORDER BY id DESC LIMIT -1 OFFSET ?)",
+                        (namespace, key, max_len),
+                    )
+                self._conn.execute("COMMIT")
+                return item
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def ack(self, namespace: str, key: str, seq: int) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM list_items WHERE namespace = ? AND key = ? AND json_extract(value, '$.seq') <= ?",
+                (namespace, key, seq),
+            ).rowcount
+
+    def last_sequence(self, namespace: str, key: str) -> int:
+        row = self._query_one("SELECT value FROM sequences WHERE namespace = ? AND key = ?", (namespace, key))
+        return row[0] if row else 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _journal_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"journal.{generation:08d}.log")
+
+
+def _journals(directory: str) -> List[tuple]:
+    """(generation, path) of every journal in directory, oldest first"""
+    journals = []
+    for name in os.listdir(directory):
+        if name.startswith("journal.") and name.endswith(".log"):
+            journals.append((int(name.split(".")[1]), os.path.join(directory, name)))
+    return sorted(journals)
+
+
+def _lock_directory(directory: str):
+    """Take an exclusive lock on directory's lock file; returns the open file that holds it"""
+    path = os.path.join(directory, "lock")
+    lock_file = open(path, "a+")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.seek(0)
+        holder = lock_file.read().strip() or "unknown"
+        lock_file.close()
+        raise StoreLockedError(
+            f"State journal {directory} is in use by another process (pid {holder}). "
+            "STATE_BACKEND=journal supports a single worker; use STATE_BACKEND=sqlite to share state between workers."
+        )
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    return lock_file
+
+
+def _apply_entry(store: InMemoryStateStore, op: str, namespace: str, key: str, *args):
+    # Called unbound so that replaying into a JournaledStateStore does not journal again
+    if op == "put":
+        InMemoryStateStore.put(store, namespace, key, args[0])
+    elif op == "update":
+        InMemoryStateStore.update(store, namespace, key, args[0])
+    elif op == "delete":
+        InMemoryStateStore.delete(store, namespace, key)
+    elif op == "extend":
+        InMemoryStateStore.extend(store, namespace, key, args[0], args[1])
+    elif op == "push":
+        item, max_len = args
+        store._sequences[namespace, key] = item["seq"]
+        InMemoryStateStore.append(store, namespace, key, item, max_len)
+    elif op == "ack":
+        InMemoryStateStore.ack(store, namespace, key, args[0])
+
+
+def _restore(store: InMemoryStateStore, directory: str, before: Optional[int] = None) -> tuple:
+    """Load directory's snapshot into an empty store and replay the journals after it.
+
+    Only journals older than generation `before` are replayed when it is given.
+    Returns (snapshot generation, last journal generation replayed, entries replayed).
+    """
+    generation = 0
+    path = os.path.join(directory, "snapshot.json")
+    if os.path.exists(path):
+        with open(path) as file:
+            snapshot = _loads(file.read())
+        generation = snapshot["generation"]
+        store._records = snapshot["records"]
+        store._lists = snapshot["lists"]
+        store._sequences = {(namespace, key): value for namespace, key, value in snapshot["sequences"]}
+    last, entries = generation - 1, 0
+    for journal_generation, journal in _journals(directory):
+        if journal_generation < generation or (before is not None and journal_generation >= before):
+            continue
+        last = journal_generation
+        with open(journal, "rb") as file:
+            for line in file:
+                try:
+                    entry = _loads(line)
+                except ValueError:
+                    # A write torn by a crash; nothing after it was acknowledged either
+                    logger.warning(f"Ignoring torn journal entry at the end of {journal}")
+                    break
+                _apply_entry(store, *entry)
+                entries += 1
+    return generation, last, entries
+
+
+class JournaledStateStore(InMemoryStateStore):
+    """In-memory store that survives restarts by journaling every write.
+
+    Each write is applied in memory, then queued as one JSON line. A background
+    thread writes whatever has queued up with a single write() and fsync() every
+    flush_interval (group commit), so requests never wait on the disk and a
+    crash loses at most the last interval.
+
+    Every snapshot_every entries a new journal generation is started. A second
+    thread then compacts the previous snapshot and the closed journals into a
+    new snapshot and deletes those journals, working from the files rather
+    than the live state so requests are not paused while a large state is
+    copied. On startup the snapshot is loaded and the journals after it
+    replayed.
+
+    Directory layout: snapshot.json (holding the first generation it does not
+    cover), journal.<generation>.log files, and a lock file. The journal only
+    describes one process's state, so the lock, held until close(), makes a
+    second process opening the same directory fail instead of interleaving its
+    writes and snapshots.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 0.005, snapshot_every: int = 100000):
+        super().__init__()
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = _lock_directory(directory)
+        start = time.perf_counter()
+        snapshot_generation, last, self.recovered_entries = _restore(self, directory)
+        self.recovery_seconds = time.perf_counter() - start
+        for generation, journal in _journals(directory):
+            if generation < snapshot_generation:
+                # Left behind by a crash between writing a snapshot and cleaning up
+                os.remove(journal)
+        self.snapshots = 0
+        self._generation = last + 1
+        self._entries_since_snapshot = self.recovered_entries
+        self._file = open(_journal_path(directory, self._generation), "ab")
+        # Shared with the writer thread: queued journal lines, and generation numbers to rotate to
+        self._cond = threading.Condition()
+        self._pending: list = []
+        self._queued = 0
+        self._written = 0
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="state-journal", daemon=True)
+        self._writer.start()
+        self._compact_to = self._compacted = snapshot_generation
+        self._compactor: Optional[threading.Thread] = None
+
+    def _log(self, *entry):
+        # Encoded now: the in-memory record may change again before the writer gets to it
+        line = _dumps(entry)
+        with self._cond:
+            self._pending.append(line)
+            self._queued += 1
+            self._cond.notify()
+        self._entries_since_snapshot += 1
+        if self._entries_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def put(self, namespace: str, key: str, record: dict):
+        super().put(namespace, key, record)
+        self._log("put", namespace, key, record)
+
+    def update(self, namespace: str, key: str, fields: dict, expect: Optional[dict] = None) -> Optional[dict]:
+        record = super().update(namespace, key, fields, expect)
+        if record is not None:
+            self._log("update", namespace, key, fields)
+        return record
+
+    def delete(self, namespace: str, key: str):
+        super().delete(namespace, key)
+        self._log("delete", namespace, key)
+
+    def append(self, namespace: str, key: str, item: Any, max_len: Optional[int] = None) -> int:
+        return self.extend(namespace, key, [item], max_len)
+
+    def extend(self, namespace: str, key: str, items: List[Any], max_len: Optional[int] = None) -> int:
+        dropped = super().extend(namespace, key, items, max_len)
+        self._log("extend", namespace, key, items, max_len)
+        return dropped
+
+    def push(self, namespace: str, key: str, item: dict, max_len: Optional[int] = None) -> dict:
+        item = super().push(namespace, key, item, max_len)
+        self._log("push", namespace, key, item, max_len)
+        return item
+
+    def ack(self, namespace: str, key: str, seq: int) -> int:
+        dropped = super().ack(namespace, key, seq)
+        if dropped:
+            self._log("ack", namespace, key, seq)
+        return dropped
+
+    def snapshot(self):
+        """Start a new journal generation and compact everything before it into the snapshot"""
+        self._generation += 1
+        self._entries_since_snapshot = 0
+        with self._cond:
+            self._pending.append(self._generation)
+            self._queued += 1
+            self._cond.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed and not self._pending:
+                    return
+            # Give concurrent writes a moment to join this batch
+            time.sleep(self.flush_interval)
+            with self._cond:
+                batch, self._pending = self._pending, []
+            try:
+                self._write_batch(batch)
+            except OSError as e:
+                logger.error(f"State journal write failed, retrying: {e}")
+                with self._cond:
+                    self._pending[:0] = batch
+                time.sleep(max(self.flush_interval, 1.0))
+                continue
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+    def _write_batch(self, batch: list):
+        lines = []
+        for entry in batch:
+            if isinstance(entry, str):
+                lines.append(entry)
+                continue
+            self._write_lines(lines)
+            lines = []
+            # Rotate: the journal is complete, later lines go to the next generation
+            self._file.close()
+            self._file = open(_journal_path(self.directory, entry), "ab")
+            self._start_compaction(entry)
+        self._write_lines(lines)
+
+    def _write_lines(self, lines: List[str]):
+        if lines:
+            self._file.write(("\n".join(lines) + "\n").encode())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _start_compaction(self, generation: int):
+        with self._cond:
+            self._compact_to = generation
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=self._compact_loop, name="state-compaction", daemon=True)
+                self._compactor.start()
+
+    def _compact_loop(self):
+        while True:
+            with self._cond:
+                generation = self._compact_to
+                if generation <= self._compacted:
+                    self._compactor = None
+                    return
+            try:
+                self._compact(generation)
+            except Exception as e:
+                # The journals stay in place, so nothing is lost; the next rotation retries
+                logger.error(f"State snapshot failed: {e}")
+                with self._cond:
+                    self._compactor = None
+                return
+            with self._cond:
+                self._compacted = generation
+                self.snapshots += 1
+
+    def _compact(self, generation: int):
+        """Write a snapshot covering every journal before generation, then delete those journals"""
+        state = InMemoryStateStore()
+        _restore(state, self.directory, before=generation)
+        path = os.path.join(self.directory, "snapshot.json")
+        with open(path + ".tmp", "w") as file:
+            file.write(_dumps({
+                "generation": generation,
+                "records": state._records,
+                "lists": state._lists,
+                "sequences": [[namespace, key, value] for (namespace, key), value in state._sequences.items()],
+            }))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+        for journal_generation, journal in _journals(self.directory):
+            if journal_generation < generation:
+                os.remove(journal)
+
+    def flush(self):
+        with self._cond:
+            target = self._queued
+            self._cond.notify()
+            self._cond.wait_for(lambda: self._written >= target)
+
+    def stats(self) -> dict:
+        return {
+            "journal_generation": self._generation,
+            "entries_since_snapshot": self._entries_since_snapshot,
+            "pending_writes": self._queued - self._written,
+            "snapshots": self.snapshots,
+            "recovered_entries": self.recovered_entries,
+            "recovery_seconds": round(self.recovery_seconds, 3),
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        self._file.close()
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        # Closing the file releases the lock
+        self._lock_file.close()
+
+
+def create_state_store(backend: Optional[str] = None) -> StateStore:
+    """Build the store selected by STATE_BACKEND (memory, journal or sqlite)"""
+    backend = (backend or os.getenv("STATE_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return InMemoryStateStore()
+    if backend == "journal":
+        return JournaledStateStore(
+            os.getenv("STATE_JOURNAL_DIR", "warm_transfer_journal"),
+            flush_interval=float(os.getenv("STATE_JOURNAL_FLUSH_MS", "5")) / 1000,
+            snapshot_every=int(os.getenv("STATE_JOURNAL_SNAPSHOT_EVERY", "100000")),
+        )
+    if backend == "sqlite":
+        return SQLiteStateStore(os.getenv("STATE_SQLITE_PATH", "warm_transfer_state.db"))
+    raise ValueError(f"Unknown STATE_BACKEND: {backend}")
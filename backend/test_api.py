@@ -8,161 +8,224 @@ import asyncio
 import httpx
 import json
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 BASE_URL = "http://localhost:8000"
 
 class WarmTransferTester:
-    def __init__(self):
+    """Runs one call flow against the API.
+
+    Pass a shared `client` (with base_url set) to run many testers concurrently,
+    e.g. from benchmarks.transfer_flow; every request's latency is recorded in
+    `timings` by endpoint.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, client: Optional[httpx.AsyncClient] = None, verbose: bool = True):
+        self.base_url = base_url
+        self.client = client
+        self.verbose = verbose
         self.session_data: Dict[str, Any] = {}
+        self.timings: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+
+    def log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    async def request(self, method: str, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request and record its latency under `endpoint`"""
+        start = time.perf_counter()
+        try:
+            if self.client is not None:
+                response = await self.client.request(method, path, **kwargs)
+            else:
+                async with httpx.AsyncClient(base_url=self.base_url) as client:
+                    response = await client.request(method, path, **kwargs)
+        except Exception:
+            self.failures[endpoint] = self.failures.get(endpoint, 0) + 1
+            raise
+        self.timings.setdefault(endpoint, []).append(time.perf_counter() - start)
+        if response.status_code != 200:
+            self.failures[endpoint] = self.failures.get(endpoint, 0) + 1
+        return response
         
     async def test_server_health(self) -> bool:
         """Test if the server is running"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{BASE_URL}/")
-                if response.status_code == 200:
-                    print("✅ Server is running")
-                    return True
-                else:
-                    print(f"❌ Server health check failed: {response.status_code}")
-                    return False
+            response = await self.request("GET", "health", "/")
+            if response.status_code == 200:
+                self.log("✅ Server is running")
+                return True
+            else:
+                self.log(f"❌ Server health check failed: {response.status_code}")
+                return False
         except Exception as e:
-            print(f"❌ Server is not running: {e}")
+            self.log(f"❌ Server is not running: {e}")
             return False
     
     async def test_create_call(self) -> bool:
         """Test creating a new call session"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{BASE_URL}/api/create-call",
-                    json={"caller_id": "test_caller_123"}
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    self.session_data = data
-                    print("✅ Call creation successful")
-                    print(f"   Session ID: {data.get('session_id')}")
-                    print(f"   Room Name: {data.get('room_name')}")
-                    return True
-                else:
-                    print(f"❌ Call creation failed: {response.status_code}")
-                    print(f"   Response: {response.text}")
-                    return False
+            response = await self.request(
+                "POST", "create-call", "/api/create-call",
+                json={"caller_id": "test_caller_123"}
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                self.session_data = data
+                self.log("✅ Call creation successful")
+                self.log(f"   Session ID: {data.get('session_id')}")
+                self.log(f"   Room Name: {data.get('room_name')}")
+                return True
+            else:
+                self.log(f"❌ Call creation failed: {response.status_code}")
+                self.log(f"   Response: {response.text}")
+                return False
         except Exception as e:
-            print(f"❌ Call creation error: {e}")
+            self.log(f"❌ Call creation error: {e}")
             return False
     
     async def test_add_context(self) -> bool:
         """Test adding context to the call"""
         if not self.session_data.get('session_id'):
-            print("❌ No session ID available for context test")
+            self.log("❌ No session ID available for context test")
             return False
             
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{BASE_URL}/api/add-context",
-                    json={
-                        "session_id": self.session_data['session_id'],
-                        "message": "Customer is asking about billing issues and wants to upgrade their plan."
-                    }
-                )
-                
-                if response.status_code == 200:
-                    print("✅ Context addition successful")
-                    return True
-                else:
-                    print(f"❌ Context addition failed: {response.status_code}")
-                    return False
+            response = await self.request(
+                "POST", "add-context", "/api/add-context",
+                json={
+                    "session_id": self.session_data['session_id'],
+                    "message": "Customer is asking about billing issues and wants to upgrade their plan."
+                }
+            )
+            
+            if response.status_code == 200:
+                self.log("✅ Context addition successful")
+                return True
+            else:
+                self.log(f"❌ Context addition failed: {response.status_code}")
+                return False
         except Exception as e:
-            print(f"❌ Context addition error: {e}")
+            self.log(f"❌ Context addition error: {e}")
             return False
     
     async def test_initiate_transfer(self) -> bool:
         """Test initiating a warm transfer"""
         if not self.session_data.get('session_id'):
-            print("❌ No session ID available for transfer test")
+            self.log("❌ No session ID available for transfer test")
             return False
             
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{BASE_URL}/api/initiate-transfer",
-                    json={
-                        "session_id": self.session_data['session_id'],
-                        "agent_b_id": "test_agent_b_456"
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    self.session_data.update(data)
-                    print("✅ Transfer initiation successful")
-                    print(f"   Transfer Room: {data.get('transfer_room')}")
-                    print(f"   Call Summary: {data.get('call_summary', 'N/A')[:100]}...")
-                    return True
-                else:
-                    print(f"❌ Transfer initiation failed: {response.status_code}")
-                    print(f"   Response: {response.text}")
-                    return False
+            response = await self.request(
+                "POST", "initiate-transfer", "/api/initiate-transfer",
+                json={
+                    "session_id": self.session_data['session_id'],
+                    "agent_b_id": "test_agent_b_456"
+                }
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                self.session_data.update(data)
+                self.log("✅ Transfer initiation successful")
+                self.log(f"   Transfer Room: {data.get('transfer_room')}")
+                self.log(f"   Call Summary: {data.get('call_summary', 'N/A')[:100]}...")
+                return True
+            else:
+                self.log(f"❌ Transfer initiation failed: {response.status_code}")
+                self.log(f"   Response: {response.text}")
+                return False
         except Exception as e:
-            print(f"❌ Transfer initiation error: {e}")
+            self.log(f"❌ Transfer initiation error: {e}")
             return False
     
     async def test_complete_transfer(self) -> bool:
         """Test completing the warm transfer"""
         if not self.session_data.get('session_id'):
-            print("❌ No session ID available for transfer completion test")
+            self.log("❌ No session ID available for transfer completion test")
             return False
             
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{BASE_URL}/api/complete-transfer",
-                    json={"session_id": self.session_data['session_id']}
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    print("✅ Transfer completion successful")
-                    print(f"   Message: {data.get('message')}")
-                    return True
-                else:
-                    print(f"❌ Transfer completion failed: {response.status_code}")
-                    return False
+            response = await self.request(
+                "POST", "complete-transfer", "/api/complete-transfer",
+                json={"session_id": self.session_data['session_id']}
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                self.log("✅ Transfer completion successful")
+                self.log(f"   Message: {data.get('message')}")
+                return True
+            else:
+                self.log(f"❌ Transfer completion failed: {response.status_code}")
+                return False
         except Exception as e:
-            print(f"❌ Transfer completion error: {e}")
+            self.log(f"❌ Transfer completion error: {e}")
             return False
     
     async def test_call_status(self) -> bool:
         """Test getting call status"""
         if not self.session_data.get('session_id'):
-            print("❌ No session ID available for status test")
+            self.log("❌ No session ID available for status test")
+            return False
+            
+        try:
+            response = await self.request(
+                "GET", "call-status", f"/api/call-status/{self.session_data['session_id']}"
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                self.log("✅ Call status retrieval successful")
+                self.log(f"   Status: {data.get('status')}")
+                self.log(f"   Agent A: {data.get('agent_a')}")
+                self.log(f"   Agent B: {data.get('agent_b')}")
+                return True
+            else:
+                self.log(f"❌ Call status retrieval failed: {response.status_code}")
+                return False
+        except Exception as e:
+            self.log(f"❌ Call status retrieval error: {e}")
+            return False
+    
+    async def test_end_call(self) -> bool:
+        """Test ending the call and cleaning up its rooms"""
+        if not self.session_data.get('session_id'):
+            self.log("❌ No session ID available for end call test")
             return False
             
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{BASE_URL}/api/call-status/{self.session_data['session_id']}"
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    print("✅ Call status retrieval successful")
-                    print(f"   Status: {data.get('status')}")
-                    print(f"   Agent A: {data.get('agent_a')}")
-                    print(f"   Agent B: {data.get('agent_b')}")
-                    return True
-                else:
-                    print(f"❌ Call status retrieval failed: {response.status_code}")
-                    return False
+            response = await self.request(
+                "POST", "end-call", "/api/end-call",
+                json={"session_id": self.session_data['session_id']}
+            )
+            
+            if response.status_code == 200:
+                self.log("✅ Call ended successfully")
+                return True
+            else:
+                self.log(f"❌ Ending call failed: {response.status_code}")
+                return False
         except Exception as e:
-            print(f"❌ Call status retrieval error: {e}")
+            self.log(f"❌ End call error: {e}")
             return False
     
+    async def run_flow(self) -> bool:
+        """Run create-call → add-context → initiate-transfer → complete-transfer → end-call, stopping at the first failure"""
+        steps = [
+            self.test_create_call,
+            self.test_add_context,
+            self.test_initiate_transfer,
+            self.test_complete_transfer,
+            self.test_end_call,
+        ]
+        for step in steps:
+            if not await step():
+                return False
+        return True
+    
     async def run_all_tests(self):
         """Run all tests in sequence"""
         print("🚀 Starting Warm Transfer System Tests")
@@ -175,6 +238,7 @@ class WarmTransferTester:
             ("Initiate Transfer", self.test_initiate_transfer),
             ("Complete Transfer", self.test_complete_transfer),
             ("Call Status", self.test_call_status),
+            ("End Call", self.test_end_call),
         ]
         
         passed = 0
@@ -201,8 +265,9 @@ class WarmTransferTester:
         return passed == total
 
 async def main():
-    tester = WarmTransferTester()
-    await tester.run_all_tests()
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        tester = WarmTransferTester(client=client)
+        await tester.run_all_tests()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Compact, bounded storage for call transcripts.
+
+A transcript is a sequence of utterances (timestamp, speaker, text). Instead of
+one formatted "[HH:MM:SS] speaker: text" string per utterance, Transcript keeps
+timestamps, speaker ids and text offsets in typed arrays, speaker names once
+per transcript, and the text itself in a single UTF-8 buffer. Lines are
+formatted only when a prompt is rendered, and only for the newest window that
+fits the prompt budget.
+
+Utterances are passed around as (epoch_seconds, speaker, text) items so that
+shared state backends can store them as plain JSON.
+"""
+
+import sys
+import time
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+# Rough characters-per-token ratio used for prompt budgets
+CHARS_PER_TOKEN = 4
+# "[HH:MM:SS] " + ": " + newline
+LINE_OVERHEAD = 14
+
+
+@lru_cache(maxsize=1024)
+def _clock_minute(minute: int) -> str:
+    # UTC offsets are whole minutes, so seconds can be appended without another localtime()
+    return time.strftime("%H:%M", time.localtime(minute * 60))
+
+
+def format_line(timestamp: float, speaker: str, text: str) -> str:
+    second = int(timestamp)
+    return f"[{_clock_minute(second // 60)}:{second % 60:02d}] {speaker}: {text}"
+
+
+def render_items(items: Sequence[Sequence], max_tokens: Optional[int] = None) -> str:
+    """Render the newest utterances that fit in max_tokens, oldest first"""
+    if isinstance(items, Transcript):
+        return items.render(max_tokens)
+    start = _window_start(lambda index: len(items[index][1]) + len(items[index][2]), 0, len(items), max_tokens)
+    return "\n".join(format_line(*items[index]) for index in range(start, len(items)))
+
+
+def _window_start(size: Callable[[int], int], first: int, end: int, max_tokens: Optional[int]) -> int:
+    """Index of the oldest line in [first, end) that still fits the budget, counting back from the newest"""
+    if not max_tokens or end - first <= 1:
+        return first
+    budget = max_tokens * CHARS_PER_TOKEN
+    index = end
+    while index > first:
+        budget -= size(index - 1) + LINE_OVERHEAD
+        if budget < 0:
+            break
+        index -= 1
+    # Always include the newest line, even if it alone is over budget
+    return min(index, end - 1)
+
+
+class Transcript:
+    """Ring buffer of utterances for one call.
+
+    Behaves like a list of (epoch_seconds, speaker, text) items that only grows
+    at the end; `del transcript[:n]` drops the oldest n, which is how the state
+    store trims it. Text lives in one UTF-8 buffer with an end offset per line,
+    so no Python object is kept per utterance; timestamps keep whole seconds.
+    """
+
+    __slots__ = ("_times", "_speaker_ids", "_speakers", "_speaker_index", "_text", "_ends", "_start")
+
+    def __init__(self, items: Iterable[Sequence] = ()):
+        self._times = array("I")
+        self._speaker_ids = array("H")
+        self._speakers: List[str] = []
+        self._speaker_index: Dict[str, int] = {}
+        self._text = bytearray()
+        self._ends = array("I")
+        # Dropped lines stay in the buffers until enough accumulate to compact in one pass
+        self._start = 0
+        for item in items:
+            self.append(item)
+
+    def append(self, item: Sequence):
+        timestamp, speaker, text = item
+        speaker_id = self._speaker_index.get(speaker)
+        if speaker_id is None:
+            speaker_id = len(self._speakers)
+            self._speakers.append(sys.intern(speaker))
+            self._speaker_index[speaker] = speaker_id
+        self._times.append(int(timestamp))
+        self._speaker_ids.append(speaker_id)
+        self._text += text.encode()
+        self._ends.append(len(self._text))
+
+    def __len__(self) -> int:
+        return len(self._ends) - self._start
+
+    def __delitem__(self, index: slice):
+        if not isinstance(index, slice) or index.start not in (None, 0) or index.step not in (None, 1):
+            raise TypeError("Transcript only supports dropping its oldest lines")
+        self._start += max(0, min(index.stop if index.stop is not None else len(self), len(self)))
+        if self._start > len(self._ends) // 2:
+            self._compact()
+
+    def _compact(self):
+        start, self._start = self._start, 0
+        cut = self._ends[start - 1]
+        del self._times[:start]
+        del self._speaker_ids[:start]
+        del self._text[:cut]
+        self._ends = array("I", (end - cut for end in self._ends[start:]))
+
+    def _begin(self, position: int) -> int:
+        return self._ends[position - 1] if position else 0
+
+    def _item(self, position: int) -> tuple:
+        text = self._text[self._begin(position):self._ends[position]].decode()
+        return self._times[position], self._speakers[self._speaker_ids[position]], text
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[tuple, List[tuple]]:
+        if isinstance(index, slice):
+            return [self._item(self._start + position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript index out of range")
+        return self._item(self._start + index)
+
+    def __iter__(self) -> Iterator[tuple]:
+        for position in range(self._start, len(self._ends)):
+            yield self._item(position)
+
+    def render(self, max_tokens: Optional[int] = None) -> str:
+        """Format the newest lines that fit in max_tokens, oldest first"""
+        ends, speaker_ids, speakers = self._ends, self._speaker_ids, self._speakers
+        # Byte length stands in for character length; the budget is an estimate anyway
+        start = _window_start(
+            lambda position: ends[position] - self._begin(position) + len(speakers[speaker_ids[position]]),
+            self._start, len(ends), max_tokens,
+        )
+        times, text = self._times, self._text
+        lines = []
+        begin = self._begin(start)
+        for position in range(start, len(ends)):
+            end = ends[position]
+            lines.append(format_line(times[position], speakers[speaker_ids[position]], text[begin:end].decode()))
+            begin = end
+        return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""
+Shared, pooled HTTP connections to the upstream services.
+
+Each upstream (LiveKit, Groq, OpenAI) gets one long-lived connection pool with
+explicit limits, keep-alive and timeouts, and its SDK client is built on that
+pool. ClientRegistry ties the pools to the application lifecycle: start()
+opens them and pre-warms a few connections to each upstream, so the first
+transfers after a deploy or an idle spell do not pay for TCP and TLS setup,
+and close() closes every pool on shutdown.
+
+The OpenAI and Groq SDKs run on an httpx.AsyncClient. LiveKit's RoomService
+takes an aiohttp.ClientSession, which can only be created inside a running
+event loop, so that pool opens in start() or on first use. A pool closed by
+shutdown is reopened (and its SDK client rebuilt) if the app starts again.
+
+httpx and aiohttp are imported when the first pool of their kind opens, so a
+deployment without LiveKit never loads aiohttp, one without an LLM provider
+never loads httpx, and neither is loaded before the app starts.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("httpx", "aiohttp")
+
+
+class Upstream:
+    """Connection settings for one upstream service"""
+
+    def __init__(self, name: str, kind: str, url: str, build: Callable[[Any], Any], max_connections: int,
+                 max_keepalive: int, keepalive_seconds: float, connect_timeout: float, timeout: float,
+                 prewarm: int):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.name = name
+        self.kind = kind
+        # Requested when pre-warming; any HTTP response means the connection is up
+        self.url = url
+        # Builds the SDK client on top of an open pool
+        self.build = build
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_seconds = keepalive_seconds
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self.prewarm = prewarm
+
+    def open_pool(self):
+        if self.kind == "httpx":
+            import httpx
+            return httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_seconds,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            )
+        import aiohttp
+        # aiohttp keeps every released connection alive, up to the pool limit
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=self.keepalive_seconds),
+            timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=self.connect_timeout),
+        )
+
+
+def _is_closed(kind: str, pool) -> bool:
+    return pool.is_closed if kind == "httpx" else pool.closed
+
+
+class ClientRegistry:
+    def __init__(self):
+        self.upstreams: Dict[str, Upstream] = {}
+        self._pools: Dict[str, Any] = {}
+        self._clients: Dict[str, Any] = {}
+        self.warm: Dict[str, dict] = {}
+
+    def register(self, upstream: Upstream):
+        self.upstreams[upstream.name] = upstream
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.upstreams
+
+    def pool(self, name: str):
+        """The upstream's connection pool, opened if it is not open yet"""
+        pool = self._pools.get(name)
+        if pool is None or _is_closed(self.upstreams[name].kind, pool):
+            pool = self._pools[name] = self.upstreams[name].open_pool()
+            self._clients.pop(name, None)
+        return pool
+
+    def client(self, name: str) -> Optional[Any]:
+        """SDK client for the upstream on its shared pool, or None if it is not registered"""
+        if name not in self.upstreams:
+            return None
+        pool = self.pool(name)
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = self.upstreams[name].build(pool)
+        return client
+
+    async def start(self):
+        """Open every pool and pre-warm connections, without failing startup if an upstream is down"""
+        await asyncio.gather(*[self._prewarm(name) for name in self.upstreams])
+
+    async def _prewarm(self, name: str):
+        upstream = self.upstreams[name]
+        self.client(name)
+        pool = self.pool(name)
+        start = time.perf_counter()
+
+        async def connect():
+            # A GET is enough: the TCP and TLS handshakes are what we want out of the way
+            if upstream.kind == "httpx":
+                await pool.get(upstream.url)
+            else:
+                async with pool.get(upstream.url) as response:
+                    await response.read()
+
+        results = await asyncio.gather(
+            *[asyncio.wait_for(connect(), upstream.connect_timeout) for _ in range(upstream.prewarm)],
+            return_exceptions=True,
+        )
+        connected = sum(not isinstance(result, BaseException) for result in results)
+        if upstream.prewarm and not connected:
+            logger.warning(f"Could not pre-warm connections to {name} at {upstream.url}: {results[0]!r}")
+        self.warm[name] = {"connections": connected, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    async def close(self):
+        pools, self._pools = self._pools, {}
+        self._clients.clear()
+        for name, pool in pools.items():
+            try:
+                if self.upstreams[name].kind == "httpx":
+                    await pool.aclose()
+                else:
+                    await pool.close()
+            except Exception as e:
+                logger.warning(f"Failed to close connections to {name}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "open": name in self._pools and not _is_closed(upstream.kind, self._pools[name]),
+                "max_connections": upstream.max_connections,
+                "prewarmed": self.warm.get(name),
+            }
+            for name, upstream in self.upstreams.items()
+        }
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { Button } from "./ui/Button"
 import { Input } from "./ui/Input"
 import { Card } from "./ui/Card"
@@ -36,6 +36,11 @@ interface TransferNotification {
   message: string
   original_room?: string
   customer_token?: string
+  call_summary?: string
+  summary_streaming?: boolean
+  summary_draft?: string
+  text?: string
+  seq?: number
 }
 
 export function AgentBInterface({ onJoinTransfer, onJoinCustomerCall }: AgentBInterfaceProps) {
@@ -44,6 +49,10 @@ export function AgentBInterface({ onJoinTransfer, onJoinCustomerCall }: AgentBIn
   const [originalRoom, setOriginalRoom] = useState("")
   const [customerToken, setCustomerToken] = useState("")
   const [agentId, setAgentId] = useState("Random") // Default to "Random" to match your test
+  // Edited freely; only becomes the agent id (and is registered) when Update is clicked
+  const [agentIdInput, setAgentIdInput] = useState(agentId)
+  // The id this dashboard registered in the agent directory, if any
+  const registeredAgentId = useRef<string | null>(null)
   const [notifications, setNotifications] = useState<TransferNotification[]>([])
   const [isPolling, setIsPolling] = useState(true)
   const [connectionStatus, setConnectionStatus] = useState<"listening" | "in_transfer" | "with_customer">("listening")
@@ -73,172 +82,267 @@ export function AgentBInterface({ onJoinTransfer, onJoinCustomerCall }: AgentBIn
     }
   }, [connectionStatus])
 
+  // Stay registered in the agent directory so transfers can be routed here; busy while on a call
   useEffect(() => {
-    let interval: NodeJS.Timeout
-
-    const pollNotifications = async () => {
+    const status = connectionStatus === "listening" ? "available" : "busy"
+    const beat = async () => {
       try {
-        console.log("[v0] Polling notifications for agent:", agentId)
-        const response = await apiService.getNotifications(agentId)
-        console.log("[v0] Notification response:", response)
-
-        setLastPollTime(new Date())
-        setPollError(null)
-        setDebugInfo(`Polling ${agentId} - Found ${response.notifications?.length || 0} notifications`)
-
-        if (response.notifications && response.notifications.length > 0) {
-          console.log("[v0] New notifications received:", response.notifications.length)
-          setNotifications((prev) => {
-            const existingIds = prev.map((n) => n.session_id)
-            const newNotifications = response.notifications.filter(
-              (n: TransferNotification) => !existingIds.includes(n.session_id),
-            )
-            return [...prev, ...newNotifications]
-          })
-
-          const latestTransfer = response.notifications.find((n: TransferNotification) => n.type === "transfer_request")
-          if (latestTransfer) {
-            setTransferRoom(latestTransfer.transfer_room)
-            setAgentBToken(latestTransfer.agent_b_token)
-          }
+        if (!(await apiService.agentHeartbeat(agentId, status))) {
+          await apiService.registerAgent({ agent_id: agentId })
+          await apiService.agentHeartbeat(agentId, status)
+        }
+        registeredAgentId.current = agentId
+      } catch (error) {
+        console.warn("[v0] Agent heartbeat failed:", error)
+      }
+    }
+    beat()
+    const interval = setInterval(beat, 10000)
+    return () => clearInterval(interval)
+  }, [agentId, connectionStatus])
 
-          const completionNotification = response.notifications.find((n: any) => n.type === "transfer_completed")
-          if (completionNotification) {
-            console.log("[v0] Transfer completed notification received:", completionNotification)
-            // Fix: Check if notification has the required data before setting state
-            const roomName = completionNotification.original_room
-            const token = completionNotification.customer_token
-            
-            if (roomName && token) {
-              console.log("[v0] Starting automatic connection to customer room...")
-              setOriginalRoom(roomName)
-              setCustomerToken(token)
-              setConnectionStatus("with_customer")
-              
-              // Clear the processed notification immediately
-              setNotifications((prev) => prev.filter((n) => n.session_id !== completionNotification.session_id))
-              
-              // Automatically join the customer call with the received data
-              setTimeout(async () => {
-                try {
-                  console.log("[v0] Attempting to connect to customer room:", roomName)
-                  
-                  // Disconnect any existing room first
-                  if (customerRoom) {
-                    try {
-                      await customerRoom.disconnect()
-                      console.log("[v0] Disconnected existing room")
-                    } catch (e) {
-                      console.warn("[v0] Error disconnecting existing room:", e)
-                    }
-                  }
+  useEffect(() => {
+    return () => {
+      if (registeredAgentId.current !== agentId) return
+      registeredAgentId.current = null
+      apiService.unregisterAgent(agentId).catch(() => undefined)
+    }
+  }, [agentId])
 
-                  // Stop any existing audio track
-                  if (customerAudioTrack) {
-                    try {
-                      customerAudioTrack.stop()
-                      console.log("[v0] Stopped existing audio track")
-                    } catch (e) {
-                      console.warn("[v0] Error stopping existing track:", e)
-                    }
-                  }
+  useEffect(() => {
+    let polling: AbortController | undefined
+    let socket: WebSocket | null = null
+    let disposed = false
+    // Highest sequence number handled; queued notifications stay on the server until acknowledged
+    let cursor = 0
+
+    const handleNotifications = (batch: TransferNotification[]) => {
+      // Redelivered notifications (e.g. after a reconnect) are skipped by sequence number
+      const received = batch.filter((n) => n.seq === undefined || n.seq > cursor)
+      for (const n of received) {
+        if (n.seq !== undefined) cursor = Math.max(cursor, n.seq)
+      }
+      const incoming = received.filter((n) => n.type !== "summary_delta" && n.type !== "summary_complete")
+
+      if (incoming.length > 0) {
+        console.log("[v0] New notifications received:", incoming.length)
+        setNotifications((prev) => {
+          const existingIds = prev.map((n) => n.session_id)
+          const newNotifications = incoming.filter(
+            (n: TransferNotification) => !existingIds.includes(n.session_id),
+          )
+          return [...prev, ...newNotifications]
+        })
+
+        const latestTransfer = incoming.find((n: TransferNotification) => n.type === "transfer_request")
+        if (latestTransfer) {
+          setTransferRoom(latestTransfer.transfer_room)
+          setAgentBToken(latestTransfer.agent_b_token)
+        }
 
-                  const newRoom = new Room()
-                  
-                  // Set up room event listeners before connecting
-                  newRoom.on('connected', () => {
-                    console.log("[v0] Room connected successfully")
-                  })
-                  
-                  newRoom.on('disconnected', (reason) => {
-                    console.log("[v0] Room disconnected, reason:", reason)
-                    // Reset state when room is disconnected
-                    setConnectionStatus("listening")
-                    setCustomerRoom(null)
-                    if (customerAudioTrack) {
-                      customerAudioTrack.stop()
-                      setCustomerAudioTrack(null)
-                    }
-                  })
-
-                  // Create audio track
-                  const track = await createLocalAudioTrack({
-                    echoCancellation: true,
-                    noiseSuppression: true,
-                    autoGainControl: true,
-                  })
-                  console.log("[v0] Created audio track successfully")
-
-                  // Connect to room
-                  await newRoom.connect(process.env.NEXT_PUBLIC_LIVEKIT_URL || "ws://localhost:7880", token, {
-                    autoSubscribe: true,
-                  })
-                  console.log("[v0] Connected to LiveKit room successfully")
-
-                  // Wait for connection to stabilize before publishing
-                  await new Promise(resolve => setTimeout(resolve, 2000))
-
-                  // Publish audio track
-                  await newRoom.localParticipant.publishTrack(track, {
-                    name: "microphone",
-                    source: Track.Source.Microphone,
-                  })
-                  console.log("[v0] Published audio track successfully")
-
-                  setCustomerRoom(newRoom)
-                  setCustomerAudioTrack(track)
-                  setCallDuration(0)
-                  setIsMuted(false)
-
-                  console.log("[v0] Successfully connected to customer room:", roomName)
+        const completionNotification = incoming.find((n: any) => n.type === "transfer_completed")
+        if (completionNotification) {
+          console.log("[v0] Transfer completed notification received:", completionNotification)
+          // Fix: Check if notification has the required data before setting state
+          const roomName = completionNotification.original_room
+          const token = completionNotification.customer_token
+          
+          if (roomName && token) {
+            console.log("[v0] Starting automatic connection to customer room...")
+            setOriginalRoom(roomName)
+            setCustomerToken(token)
+            setConnectionStatus("with_customer")
+            
+            // Clear the processed notification immediately
+            setNotifications((prev) => prev.filter((n) => n.session_id !== completionNotification.session_id))
+            
+            // Automatically join the customer call with the received data
+            setTimeout(async () => {
+              try {
+                console.log("[v0] Attempting to connect to customer room:", roomName)
+                
+                // Disconnect any existing room first
+                if (customerRoom) {
+                  try {
+                    await customerRoom.disconnect()
+                    console.log("[v0] Disconnected existing room")
+                  } catch (e) {
+                    console.warn("[v0] Error disconnecting existing room:", e)
+                  }
+                }
 
+                // Stop any existing audio track
+                if (customerAudioTrack) {
                   try {
-                    await apiService.addContext(
-                      roomName,
-                      "Agent B has joined the call and is now handling the customer",
-                      "System",
-                    )
-                  } catch (contextError) {
-                    console.warn("[v0] Failed to add context:", contextError)
+                    customerAudioTrack.stop()
+                    console.log("[v0] Stopped existing audio track")
+                  } catch (e) {
+                    console.warn("[v0] Error stopping existing track:", e)
                   }
+                }
 
-                  onJoinCustomerCall(roomName, token)
-                } catch (error) {
-                  console.error("[v0] Failed to connect to customer room:", error)
+                const newRoom = new Room()
+                
+                // Set up room event listeners before connecting
+                newRoom.on('connected', () => {
+                  console.log("[v0] Room connected successfully")
+                })
+                
+                newRoom.on('disconnected', (reason) => {
+                  console.log("[v0] Room disconnected, reason:", reason)
+                  // Reset state when room is disconnected
                   setConnectionStatus("listening")
-                  setOriginalRoom("")
-                  setCustomerToken("")
+                  setCustomerRoom(null)
+                  if (customerAudioTrack) {
+                    customerAudioTrack.stop()
+                    setCustomerAudioTrack(null)
+                  }
+                })
+
+                // Create audio track
+                const track = await createLocalAudioTrack({
+                  echoCancellation: true,
+                  noiseSuppression: true,
+                  autoGainControl: true,
+                })
+                console.log("[v0] Created audio track successfully")
+
+                // Connect to room
+                await newRoom.connect(process.env.NEXT_PUBLIC_LIVEKIT_URL || "ws://localhost:7880", token, {
+                  autoSubscribe: true,
+                })
+                console.log("[v0] Connected to LiveKit room successfully")
+
+                // Wait for connection to stabilize before publishing
+                await new Promise(resolve => setTimeout(resolve, 2000))
+
+                // Publish audio track
+                await newRoom.localParticipant.publishTrack(track, {
+                  name: "microphone",
+                  source: Track.Source.Microphone,
+                })
+                console.log("[v0] Published audio track successfully")
+
+                setCustomerRoom(newRoom)
+                setCustomerAudioTrack(track)
+                setCallDuration(0)
+                setIsMuted(false)
+
+                console.log("[v0] Successfully connected to customer room:", roomName)
 
-                  const errorMessage = error instanceof Error ? error.message : "Unknown error"
-                  alert(
-                    `Failed to connect to customer room: ${errorMessage}\n\nRoom: ${roomName}\nThis may happen if the customer has already ended the call.`,
+                try {
+                  await apiService.addContext(
+                    roomName,
+                    "Agent B has joined the call and is now handling the customer",
+                    "System",
                   )
+                } catch (contextError) {
+                  console.warn("[v0] Failed to add context:", contextError)
                 }
-              }, 2000)
-            } else {
-              console.error("[v0] Completion notification missing required data:", {
-                has_original_room: !!roomName,
-                has_customer_token: !!token,
-                notification: completionNotification
-              })
-            }
+
+                onJoinCustomerCall(roomName, token)
+              } catch (error) {
+                console.error("[v0] Failed to connect to customer room:", error)
+                setConnectionStatus("listening")
+                setOriginalRoom("")
+                setCustomerToken("")
+
+                const errorMessage = error instanceof Error ? error.message : "Unknown error"
+                alert(
+                  `Failed to connect to customer room: ${errorMessage}\n\nRoom: ${roomName}\nThis may happen if the customer has already ended the call.`,
+                )
+              }
+            }, 2000)
+          } else {
+            console.error("[v0] Completion notification missing required data:", {
+              has_original_room: !!roomName,
+              has_customer_token: !!token,
+              notification: completionNotification
+            })
           }
         }
-      } catch (error) {
-        console.error("[v0] Failed to poll notifications:", error)
-        setPollError(error instanceof Error ? error.message : "Unknown error")
-        setLastPollTime(new Date())
-        setDebugInfo(`Error polling ${agentId}: ${error instanceof Error ? error.message : "Unknown error"}`)
+      }
+
+      // Fold streamed summary text into its transfer request; done last so a request in the same batch is already listed
+      const summaryUpdates = received.filter((n) => n.type === "summary_delta" || n.type === "summary_complete")
+      if (summaryUpdates.length > 0) {
+        setNotifications((prev) =>
+          prev.map((n) => {
+            let summary = n.call_summary ?? ""
+            for (const update of summaryUpdates) {
+              if (update.session_id !== n.session_id) continue
+              summary = update.type === "summary_delta" ? summary + (update.text ?? "") : update.call_summary ?? summary
+            }
+            return { ...n, call_summary: summary }
+          }),
+        )
       }
     }
 
+    const pollNotifications = async (controller: AbortController) => {
+      // Long-poll: each request is held by the server until a notification arrives or 25s pass
+      while (!controller.signal.aborted) {
+        try {
+          const response = await apiService.getNotifications(agentId, cursor, 25, controller.signal)
+
+          setLastPollTime(new Date())
+          setPollError(null)
+          setDebugInfo(`Polling ${agentId} - Found ${response.notifications?.length || 0} notifications`)
+
+          if (response.cursor < cursor) cursor = 0 // server state was reset
+          handleNotifications(response.notifications || [])
+          if (response.notifications?.length) await apiService.ackNotifications(agentId, cursor)
+        } catch (error) {
+          if (controller.signal.aborted) return
+          console.error("[v0] Failed to poll notifications:", error)
+          setPollError(error instanceof Error ? error.message : "Unknown error")
+          setLastPollTime(new Date())
+          setDebugInfo(`Error polling ${agentId}: ${error instanceof Error ? error.message : "Unknown error"}`)
+          await new Promise((resolve) => setTimeout(resolve, 2000))
+        }
+      }
+    }
+
+    const startPolling = () => {
+      if (polling) return
+      polling = new AbortController()
+      pollNotifications(polling)
+    }
+
+    const stopPolling = () => {
+      polling?.abort()
+      polling = undefined
+    }
+
     if (isPolling) {
-      interval = setInterval(pollNotifications, 2000)
-      pollNotifications()
+      // Prefer the push channel; fall back to polling whenever the socket is down
+      startPolling()
+      try {
+        socket = new WebSocket(apiService.notificationsSocketUrl(agentId, cursor))
+        socket.onopen = () => {
+          stopPolling()
+          setPollError(null)
+          setLastPollTime(new Date())
+          setDebugInfo(`Listening for ${agentId} over WebSocket`)
+        }
+        socket.onmessage = (event) => {
+          setLastPollTime(new Date())
+          const notification: TransferNotification = JSON.parse(event.data)
+          handleNotifications([notification])
+          if (notification.seq !== undefined) socket?.send(JSON.stringify({ ack: notification.seq }))
+        }
+        socket.onclose = () => {
+          if (!disposed) startPolling()
+        }
+      } catch (error) {
+        console.warn("[v0] WebSocket unavailable, polling notifications instead:", error)
+      }
     }
 
     return () => {
-      if (interval) clearInterval(interval)
+      disposed = true
+      stopPolling()
+      if (socket) socket.close()
     }
   }, [agentId, isPolling])
 
@@ -409,15 +513,18 @@ export function AgentBInterface({ onJoinTransfer, onJoinCustomerCall }: AgentBIn
         <div className="flex gap-2">
           <Input
             placeholder="Agent B ID (must match transfer request)"
-            value={agentId}
-            onChange={(e) => setAgentId(e.target.value)}
+            value={agentIdInput}
+            onChange={(e) => setAgentIdInput(e.target.value)}
             className="flex-1"
           />
           <Button
             onClick={() => {
+              const nextAgentId = agentIdInput.trim() || agentId
+              setAgentIdInput(nextAgentId)
+              setAgentId(nextAgentId)
               setNotifications([])
               setPollError(null)
-              setDebugInfo(`Switched to agent: ${agentId}`)
+              setDebugInfo(`Switched to agent: ${nextAgentId}`)
               // Reset connection state if stuck
               if (connectionStatus !== "with_customer") {
                 setConnectionStatus("listening")
@@ -459,6 +566,11 @@ export function AgentBInterface({ onJoinTransfer, onJoinCustomerCall }: AgentBIn
                       <PhoneCall className="w-4 h-4 text-orange-600" />
                       <p className="text-sm font-medium text-gray-900 dark:text-white">{notification.message}</p>
                     </div>
+                    {(notification.call_summary || notification.summary_streaming) && (
+                      <p className="text-sm text-gray-700 dark:text-gray-300 mb-2 whitespace-pre-line">
+                        {notification.call_summary || notification.summary_draft || "Generating call summary..."}
+                      </p>
+                    )}
                     <p className="text-xs text-gray-500 dark:text-gray-400 mb-2">Session: {notification.session_id}</p>
                     <p className="text-xs text-gray-500 dark:text-gray-400">
                       {new Date(notification.timestamp).toLocaleString()}
@@ -43,14 +43,34 @@ export function TransferPanel({ activeCall, transferState, onTransferStateChange
     try {
       await apiService.addContext(activeCall.session_id, `Customer requesting transfer to ${agentBName}`)
 
-      const response: TransferResponse = await apiService.initiateTransfer({
-        session_id: activeCall.session_id,
-        agent_b_id: agentBName.trim(),
-      })
-
-      setTransferData(response)
-      setCallSummary(response.call_summary ?? "")
-      onTransferStateChange("active")
+      // The transfer room is ready before the summary; show the extractive draft until the summary is written
+      setCallSummary("")
+      let showingDraft = false
+      await apiService.initiateTransferStream(
+        {
+          session_id: activeCall.session_id,
+          agent_b_id: agentBName.trim(),
+        },
+        (event) => {
+          if (event.event === "transfer") {
+            setTransferData(event as TransferResponse)
+            onTransferStateChange("active")
+            if (event.summary_draft) {
+              setCallSummary(event.summary_draft)
+              showingDraft = true
+            }
+          } else if (event.event === "summary_delta") {
+            if (showingDraft) {
+              showingDraft = false
+              setCallSummary(event.text)
+            } else {
+              setCallSummary((prev) => prev + event.text)
+            }
+          } else if (event.event === "summary_done") {
+            setCallSummary(event.call_summary ?? "")
+          }
+        },
+      )
     } catch (error) {
       console.error("Failed to initiate transfer:", error)
       alert("Failed to initiate transfer. Please try again.")
@@ -215,7 +235,7 @@ export function TransferPanel({ activeCall, transferState, onTransferStateChange
         <Card className="p-4">
           <h3 className="font-semibold text-gray-900 dark:text-white mb-3">AI-Generated Call Summary</h3>
           <div className="p-3 bg-gray-50 dark:bg-gray-700 rounded-lg">
-            <p className="text-sm text-gray-700 dark:text-gray-300">{callSummary}</p>
+            <p className="text-sm text-gray-700 dark:text-gray-300 whitespace-pre-line">{callSummary}</p>
           </div>
         </Card>
       )}
@@ -53,6 +53,39 @@ export const apiService = {
     return response.json()
   },
 
+  // Streams newline-delimited JSON events: "transfer" (with an extractive "summary_draft"), then "summary_delta" as text arrives, then "summary_done"
+  initiateTransferStream: async (
+    data: { session_id: string; agent_b_id: string },
+    onEvent: (event: { event: string; [key: string]: any }) => void,
+  ) => {
+    const response = await fetch(`${BACKEND_URL}/api/initiate-transfer/stream`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(data),
+    })
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to initiate transfer: ${response.statusText}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffered = ""
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffered += decoder.decode(value, { stream: true })
+      const lines = buffered.split("\n")
+      buffered = lines.pop() ?? ""
+      for (const line of lines) {
+        if (line.trim()) onEvent(JSON.parse(line))
+      }
+    }
+    if (buffered.trim()) onEvent(JSON.parse(buffered))
+  },
+
   completeTransfer: async (data: { session_id: string }) => {
     const response = await fetch(`${BACKEND_URL}/api/complete-transfer`, {
       method: "POST",
@@ -160,8 +193,47 @@ export const apiService = {
     return response.json()
   },
 
-  getNotifications: async (agentId: string) => {
-    const response = await fetch(`${BACKEND_URL}/api/notifications/${agentId}`)
+  registerAgent: async (data: { agent_id: string; skills?: string[]; capacity?: number }) => {
+    const response = await fetch(`${BACKEND_URL}/api/agents/register`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(data),
+    })
+
+    if (!response.ok) {
+      throw new Error(`Failed to register agent: ${response.statusText}`)
+    }
+
+    return response.json()
+  },
+
+  // Resolves false when the registration has expired and the agent must register again
+  agentHeartbeat: async (agentId: string, status?: "available" | "busy" | "away") => {
+    const response = await fetch(`${BACKEND_URL}/api/agents/${encodeURIComponent(agentId)}/heartbeat`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify(status ? { status } : {}),
+    })
+
+    if (response.status === 404) return false
+    if (!response.ok) {
+      throw new Error(`Failed to send heartbeat: ${response.statusText}`)
+    }
+
+    return true
+  },
+
+  unregisterAgent: async (agentId: string) => {
+    await fetch(`${BACKEND_URL}/api/agents/${encodeURIComponent(agentId)}`, { method: "DELETE" })
+  },
+
+  // Notifications after the `since` cursor; with `wait` the server holds the request until one arrives
+  getNotifications: async (agentId: string, since = 0, wait = 0, signal?: AbortSignal) => {
+    const response = await fetch(`${BACKEND_URL}/api/notifications/${agentId}?since=${since}&wait=${wait}`, { signal })
 
     if (!response.ok) {
       throw new Error(`Failed to get notifications: ${response.statusText}`)
@@ -169,4 +241,24 @@ export const apiService = {
 
     return response.json()
   },
+
+  ackNotifications: async (agentId: string, seq: number) => {
+    const response = await fetch(`${BACKEND_URL}/api/notifications/${agentId}/ack`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ seq }),
+    })
+
+    if (!response.ok) {
+      throw new Error(`Failed to acknowledge notifications: ${response.statusText}`)
+    }
+
+    return response.json()
+  },
+
+  notificationsSocketUrl: (agentId: string, since = 0) => {
+    return `${BACKEND_URL.replace(/^http/, "ws")}/ws/agents/${encodeURIComponent(agentId)}?since=${since}`
+  },
 }